@@ -1,11 +1,13 @@
 # app.py
 
+import logging
 from services.fetch_espn import parse_espn_games
-from services.fetch_nba import buscar_estatisticas_avancadas
+from services.fetch_nba import buscar_estatisticas_avancadas, montar_indice_descanso
 from services.strategy_handicap import gerar_payload_handicap
-from services.notifier_telegram import enviar_notificacao
+from services.notifier_telegram import enviar_notificacao, fila_telegram
+from services.instrumentacao import instrumentacao
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from dotenv import dotenv_values
 
 # ----------------------
@@ -24,15 +26,16 @@ DB_PORT = int(config.get("DB_PORT", 5432))
 # ----------------------
 def conectar_banco():
     try:
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-            port=DB_PORT,
-            options="-c client_encoding=UTF8",
-            cursor_factory=RealDictCursor
-        )
+        with instrumentacao.cronometrar("chamada_externa", tipo="postgres", operacao="conectar"):
+            conn = psycopg2.connect(
+                host=DB_HOST,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                database=DB_NAME,
+                port=DB_PORT,
+                options="-c client_encoding=UTF8",
+                cursor_factory=RealDictCursor
+            )
         return conn
     except Exception as e:
         print("❌ Erro ao conectar ao banco:", e)
@@ -62,6 +65,103 @@ def inserir_jogo(conn, payload):
         print(f"❌ Erro ao inserir jogo {payload.get('game_id')}:", e)
         conn.rollback()
 
+# Ordem das colunas usada na gravação em lote (mesma do INSERT unitário)
+COLUNAS_HANDCAP = (
+    "dt_report", "num_games", "context", "game_id", "league",
+    "principal", "visitor", "game_datetime", "hp_lines",
+    "hp_prob", "hp_risk", "hp_conf", "justification", "trend",
+)
+
+SQL_INSERT_LOTE = f"""
+    INSERT INTO handcap_list({", ".join(COLUNAS_HANDCAP)})
+    VALUES %s
+    ON CONFLICT (game_id) DO NOTHING
+    RETURNING game_id
+"""
+
+def _inserir_linha_a_linha(cur, lote, falhas):
+    """
+    Plano B de um lote que falhou: regrava linha por linha, cada uma no seu SAVEPOINT,
+    para descobrir exatamente quais jogos têm problema sem descartar os outros.
+    """
+    idx_game_id = COLUNAS_HANDCAP.index("game_id")
+    gravados = []
+
+    for linha in lote:
+        cur.execute("SAVEPOINT linha_handcap")
+        try:
+            gravados += execute_values(cur, SQL_INSERT_LOTE, [linha], fetch=True)
+            cur.execute("RELEASE SAVEPOINT linha_handcap")
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT linha_handcap")
+            print(f"❌ Erro ao inserir jogo {linha[idx_game_id]}:", e)
+            falhas.append((linha[idx_game_id], str(e)))
+
+    return gravados
+
+def inserir_jogos_em_lote(conn, payloads, tamanho_lote=1000):
+    """
+    Grava a rodada inteira (ou um backfill de vários dias) numa única transação.
+    Cada lote de até `tamanho_lote` jogos vira um único INSERT multi-linha.
+    Se um lote falhar, ele é refeito linha a linha para reportar a falha por jogo.
+
+    Retorna: {'inseridos': [game_id, ...], 'ignorados': [...], 'falhas': [(game_id, erro), ...]}
+    """
+    resultado = {"inseridos": [], "ignorados": [], "falhas": []}
+    idx_game_id = COLUNAS_HANDCAP.index("game_id")
+
+    # Monta as tuplas já na ordem das colunas (payload incompleto é falha daquela linha)
+    linhas = []
+    for payload in payloads:
+        try:
+            linhas.append(tuple(payload[coluna] for coluna in COLUNAS_HANDCAP))
+        except KeyError as e:
+            print(f"❌ Payload incompleto para o jogo {payload.get('game_id')}: campo {e} ausente")
+            resultado["falhas"].append((payload.get("game_id"), f"campo ausente: {e}"))
+
+    if not linhas:
+        return resultado
+
+    try:
+        with conn.cursor() as cur:
+            for inicio in range(0, len(linhas), tamanho_lote):
+                lote = linhas[inicio:inicio + tamanho_lote]
+
+                cur.execute("SAVEPOINT lote_handcap")
+                try:
+                    gravados = execute_values(cur, SQL_INSERT_LOTE, lote, page_size=len(lote), fetch=True)
+                    cur.execute("RELEASE SAVEPOINT lote_handcap")
+                except Exception as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT lote_handcap")
+                    print(f"⚠️ Lote de {len(lote)} jogos falhou ({e}). Reprocessando linha a linha...")
+                    gravados = _inserir_linha_a_linha(cur, lote, resultado["falhas"])
+
+                # O que não voltou no RETURNING já existia (ON CONFLICT DO NOTHING)
+                ids_gravados = {str(g["game_id"]) for g in gravados}
+                ids_com_falha = {str(f[0]) for f in resultado["falhas"]}
+                for linha in lote:
+                    game_id = str(linha[idx_game_id])
+                    if game_id in ids_gravados:
+                        resultado["inseridos"].append(linha[idx_game_id])
+                        ids_gravados.discard(game_id)
+                    elif game_id not in ids_com_falha:
+                        resultado["ignorados"].append(linha[idx_game_id])
+
+        conn.commit()
+
+    except Exception as e:
+        # Falha da transação inteira (ex: conexão caiu): nada foi gravado
+        print("❌ Erro na gravação em lote, transação desfeita:", e)
+        conn.rollback()
+        ids_com_falha = {str(f[0]) for f in resultado["falhas"]}
+        resultado["falhas"] += [
+            (linha[idx_game_id], str(e)) for linha in linhas
+            if str(linha[idx_game_id]) not in ids_com_falha
+        ]
+        resultado["inseridos"], resultado["ignorados"] = [], []
+
+    return resultado
+
 # ----------------------
 # 4. Main
 # ----------------------
@@ -74,6 +174,9 @@ def main():
     if not nba_stats:
         print("⚠️ Rodando sem estatísticas avançadas (precisão reduzida).")
 
+    # Descanso/B2B de todos os times numa única chamada (cache do dia)
+    indice_descanso = montar_indice_descanso()
+
     # Passo B: Jogos do Dia (ESPN)
     print("\n🏀 Buscando jogos do dia na ESPN...")
     jogos = parse_espn_games()
@@ -88,20 +191,46 @@ def main():
 
     # Passo C: Processamento
     for jogo in jogos:
-        payload = gerar_payload_handicap(jogo, nba_stats)
+        payload = gerar_payload_handicap(jogo, nba_stats, indice_descanso)
+        if payload is None:
+            print(f" > {jogo.get('mandante')} x {jogo.get('visitante')} | IGNORADO (time sem identificação/stats)")
+            continue
         
         # Exibe no terminal apenas o essencial
         print(f" > {payload['principal']} x {payload['visitor']} | {payload['trend']} ({payload['hp_prob']}%)")
         
-        inserir_jogo(conn, payload)
         relatorio_para_envio.append(payload)
 
+    # Passo C.2: Gravação da rodada inteira numa única transação
+    with instrumentacao.cronometrar("chamada_externa", tipo="postgres", operacao="insert_lote"):
+        resultado = inserir_jogos_em_lote(conn, relatorio_para_envio)
+    print(
+        f"💾 Banco: {len(resultado['inseridos'])} inseridos, "
+        f"{len(resultado['ignorados'])} já existentes, {len(resultado['falhas'])} falhas."
+    )
+
     # Passo D: Envio Telegram
     print("\n🚀 Enviando relatório para o Telegram...")
     enviar_notificacao(relatorio_para_envio)
 
     conn.close()
+
+    # O envio roda em segundo plano: espera a fila esvaziar antes de encerrar o processo
+    if not fila_telegram.aguardar_envios(timeout=120):
+        print("⚠️ [Telegram] Tempo esgotado aguardando a fila de envio.")
+    print(f"📬 [Telegram] {fila_telegram.metricas()}")
     print("✅ Processo finalizado!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Fila do Telegram, transporte gravado e métricas (módulos em comum com o tips_bot) usam logging:
+    # sem isto, as linhas INFO (ex: confirmação de entrega) sumiam. Mesmo formato dos prints.
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        with instrumentacao.cronometrar("job", tarefa="handcap_main"):
+            main()
+    finally:
+        # Execução única: o resumo vai para o terminal e, com METRICAS_ARQUIVO, para o
+        # textfile collector do node_exporter (formato Prometheus)
+        print(f"\n📈 [Métricas]\n{instrumentacao.resumo()}")
+        if config.get("METRICAS_ARQUIVO"):
+            instrumentacao.gravar(config["METRICAS_ARQUIVO"])
\ No newline at end of file
@@ -0,0 +1,103 @@
+# benchmarks/bench_e2e.py
+# Benchmark de ponta a ponta do handcap_bot (app.main) com ESPN, NBA API e Telegram falsos
+# (nba_comum/servicos_falsos.py) e um Postgres local.
+#
+# Uso (dentro de handcap_bot/):
+#   python -m benchmarks.bench_e2e --dsn postgresql://postgres@localhost/bench --jogos 5 15
+#   python -m benchmarks.bench_e2e --dsn ... --latencia-nba-ms 600 --salvar-baseline
+#
+# A handcap_list é criada no schema `bench_e2e` (recriado a cada cenário; search_path só com ele).
+# Snapshot da rodada, snapshot de stats e cache de descanso vão para uma pasta temporária.
+# Cada cenário roda num processo novo (spawn). Com baseline salvo, tempo acima da tolerância
+# ou contagem maior (queries, requisições) é regressão (exit 1). Cenário que morre sem resultado
+# (ex: --dsn inacessível) também dá exit 1, sem travar o processo pai.
+
+import os
+import tempfile
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from nba_comum.servicos_falsos import ServicosFalsos, contar_chamadas, main_benchmark
+
+SCHEMA = "bench_e2e"
+BASELINE_PADRAO = os.path.join(os.path.dirname(__file__), "baseline_e2e.json")
+
+SQL_TABELAS = f"""
+    DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+    CREATE SCHEMA {SCHEMA};
+    CREATE TABLE handcap_list (
+        dt_report DATE, num_games INT, context TEXT, game_id TEXT PRIMARY KEY, league TEXT,
+        principal TEXT, visitor TEXT, game_datetime TIMESTAMP, hp_lines TEXT,
+        hp_prob NUMERIC, hp_risk TEXT, hp_conf INT, justification TEXT, trend TEXT
+    );
+"""
+
+def _preparar_ambiente(args, servicos, pasta):
+    """Aponta o bot para os serviços falsos, o schema de benchmark e caches na pasta temporária."""
+    from nba_api.stats.library.http import NBAStatsHTTP
+    import app
+    import services.fetch_espn as fetch_espn
+    import services.fetch_nba as fetch_nba
+    import services.notifier_telegram as notifier_telegram
+    from nba_comum.fila_telegram import FilaTelegram
+    from services.instrumentacao import instrumentacao
+    from nba_comum.snapshot_rodada import SnapshotRodada
+    from services.snapshot_stats import SnapshotStats
+
+    base = servicos.url
+    NBAStatsHTTP.base_url = f"{base}/stats/{{endpoint}}"
+    fetch_espn.URL_SCOREBOARD = f"{base}/apis/site/v2/sports/basketball/nba/scoreboard"
+    fetch_espn.snapshot_rodada = SnapshotRodada(
+        lambda forcar: fetch_espn.fetch_espn_games(forcar=forcar), diretorio=os.path.join(pasta, "rodadas")
+    )
+    fetch_nba.CACHE_DIR = pasta
+    fetch_nba.snapshot_stats = SnapshotStats(os.path.join(pasta, "stats_nba.sqlite"))
+
+    fila = FilaTelegram("bench", chat_id_padrao="-1", msgs_por_minuto_chat=args.telegram_por_minuto,
+                        instrumentacao=instrumentacao)
+    fila.url = f"{base}/botbench/sendMessage"
+    notifier_telegram.TOKEN, notifier_telegram.CHAT_ID = "bench", "-1"
+    notifier_telegram.fila_telegram = app.fila_telegram = fila
+
+    def conectar_banco():
+        with instrumentacao.cronometrar("chamada_externa", tipo="postgres", operacao="conectar"):
+            return psycopg2.connect(args.dsn, options=f"-c search_path={SCHEMA}", cursor_factory=RealDictCursor)
+    app.conectar_banco = conectar_banco
+
+    conn = psycopg2.connect(args.dsn, options=f"-c search_path={SCHEMA}")
+    with conn, conn.cursor() as cur:
+        cur.execute(SQL_TABELAS)
+    conn.close()
+    return app, instrumentacao
+
+def _rodar_cenario(args, jogos, saida):
+    from nba_comum.registro_times import registro_times
+    latencias = {"espn": args.latencia_espn_ms, "nba_stats": args.latencia_nba_ms, "telegram": args.latencia_telegram_ms}
+    servicos = ServicosFalsos(registro_times.times, jogos=jogos, latencias_ms=latencias).iniciar()
+    with tempfile.TemporaryDirectory() as pasta:
+        app, instrumentacao = _preparar_ambiente(args, servicos, pasta)
+        servicos.zerar_contagens()
+        instrumentacao.zerar()
+        inicio = time.perf_counter()
+        app.main()
+        resultado = {"handcap_main": {"tempo_s": round(time.perf_counter() - inicio, 3),
+                                      "contagens": contar_chamadas(servicos, instrumentacao)}}
+    servicos.parar()
+    saida.put(resultado)
+
+def _argumentos(parser):
+    parser.add_argument("--latencia-espn-ms", type=int, default=40)
+    parser.add_argument("--latencia-nba-ms", type=int, default=300)
+    parser.add_argument("--latencia-telegram-ms", type=int, default=40)
+
+def _nome_cenario(args, jogos):
+    return f"jogos={jogos},lat={args.latencia_espn_ms}/{args.latencia_nba_ms}/{args.latencia_telegram_ms}"
+
+def main():
+    main_benchmark("Benchmark de ponta a ponta do handcap_bot (serviços falsos)", BASELINE_PADRAO,
+                   _rodar_cenario, _nome_cenario, _argumentos)
+
+if __name__ == "__main__":
+    main()
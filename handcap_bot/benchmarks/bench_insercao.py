@@ -0,0 +1,78 @@
+# benchmarks/bench_insercao.py
+# Compara a gravação jogo a jogo (inserir_jogo) com a gravação em lote (inserir_jogos_em_lote).
+# Uso (dentro de handcap_bot/): python -m benchmarks.bench_insercao --jogos 5000
+#
+# Os dados vão para uma tabela TEMPORÁRIA com o mesmo formato da handcap_list,
+# que "esconde" a tabela real durante a sessão. Nada fica gravado no banco.
+
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+from app import conectar_banco, inserir_jogo, inserir_jogos_em_lote
+
+def gerar_payloads_falsos(qtd):
+    base = datetime(2025, 1, 1, 0, 0, 0)
+    payloads = []
+    for i in range(qtd):
+        payloads.append({
+            "dt_report": date.today(),
+            "num_games": 1,
+            "context": "Benchmark",
+            "game_id": f"bench-{i}",
+            "league": "NBA",
+            "principal": f"Mandante {i % 30}",
+            "visitor": f"Visitante {i % 29}",
+            "game_datetime": (base + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "hp_lines": "LAL -5.5",
+            "hp_prob": 57.5,
+            "hp_risk": "MÉDIO",
+            "hp_conf": 57,
+            "justification": "Benchmark de gravação",
+            "trend": "mandante",
+        })
+    return payloads
+
+def preparar_tabela_temporaria(conn):
+    with conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS handcap_list (LIKE public.handcap_list INCLUDING ALL)")
+        cur.execute("TRUNCATE handcap_list")
+    conn.commit()
+
+def medir(nome, func, qtd):
+    inicio = time.perf_counter()
+    func()
+    duracao = time.perf_counter() - inicio
+    print(f"⏱️ {nome:<12} {duracao:8.3f}s | {qtd / duracao:10.1f} jogos/s")
+    return duracao
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de gravação na handcap_list")
+    parser.add_argument("--jogos", type=int, default=2000)
+    parser.add_argument("--tamanho-lote", type=int, default=1000)
+    args = parser.parse_args()
+
+    conn = conectar_banco()
+    if not conn:
+        return
+
+    payloads = gerar_payloads_falsos(args.jogos)
+    print(f"🏁 Benchmark de gravação com {args.jogos} jogos\n")
+
+    preparar_tabela_temporaria(conn)
+    t_linha = medir("por linha", lambda: [inserir_jogo(conn, p) for p in payloads], args.jogos)
+
+    preparar_tabela_temporaria(conn)
+    resultado = {}
+    t_lote = medir(
+        "em lote",
+        lambda: resultado.update(inserir_jogos_em_lote(conn, payloads, tamanho_lote=args.tamanho_lote)),
+        args.jogos,
+    )
+
+    print(f"\n🚀 Ganho: {t_linha / t_lote:.1f}x "
+          f"({len(resultado['inseridos'])} inseridos, {len(resultado['falhas'])} falhas)")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
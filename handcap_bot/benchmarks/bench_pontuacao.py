@@ -0,0 +1,85 @@
+# benchmarks/bench_pontuacao.py
+# Compara a pontuação jogo a jogo (regra escalar original, em dicts) com a pontuação em lote (pontuar_jogos).
+# Uso (dentro de handcap_bot/): python -m benchmarks.bench_pontuacao --jogos 100000
+#
+# Os jogos são sintéticos (nenhuma chamada de rede ou banco). Antes de medir, confere se
+# os dois caminhos dão exatamente o mesmo resultado para todos os jogos.
+
+import argparse
+import time
+
+import numpy as np
+
+from services.strategy_handicap import PARAMETROS_PADRAO, pontuar_jogos
+
+def gerar_jogos_falsos(qtd, semente=42):
+    rng = np.random.default_rng(semente)
+    return {
+        'net_m': rng.normal(0, 6, qtd).round(1),
+        'net_v': rng.normal(0, 6, qtd).round(1),
+        'pace_m': rng.normal(99, 2.5, qtd).round(1),
+        'pace_v': rng.normal(99, 2.5, qtd).round(1),
+        'linha': (rng.integers(-30, 31, qtd) / 2.0),
+        'b2b_m': rng.random(qtd) < 0.15,
+        'b2b_v': rng.random(qtd) < 0.15,
+        'tres_em_quatro_m': rng.random(qtd) < 0.10,
+        'tres_em_quatro_v': rng.random(qtd) < 0.10,
+    }
+
+def pontuar_um_jogo(net_m, net_v, pace_m, pace_v, linha, b2b_m, b2b_v, tres_m, tres_v):
+    """Regra por jogo como era antes do motor em lote (referência), com as constantes do modelo atual."""
+    p = PARAMETROS_PADRAO
+    margem = (net_m - net_v) * (((pace_m + pace_v) / 2) / 100.0)
+    ajuste = 0
+    if b2b_m: ajuste -= p['penalidade_b2b']
+    if b2b_v: ajuste += p['penalidade_b2b']
+    if tres_m: ajuste -= p['penalidade_3em4']
+    if tres_v: ajuste += p['penalidade_3em4']
+    margem = margem + p['home_court'] + ajuste
+
+    edge = margem + linha
+    prob = max(1.0, min(99.0, 50.0 + (edge * p['prob_por_ponto'])))
+    trend = "equilibrado"
+    if prob >= 55:
+        trend = "mandante"
+    elif prob <= 45:
+        trend = "visitante"
+        prob = 100.0 - prob
+    if prob >= 60: risco = "BAIXO"
+    elif prob >= 53: risco = "MÉDIO"
+    else: risco = "ALTO"
+    return margem, edge, prob, trend, risco
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da pontuação de handicap")
+    parser.add_argument("--jogos", type=int, default=100_000)
+    args = parser.parse_args()
+
+    jogos = gerar_jogos_falsos(args.jogos)
+    linhas = [tuple(v.item() for v in valores) for valores in zip(*jogos.values())]
+
+    print(f"🏀 Pontuando {args.jogos} jogos...")
+
+    inicio = time.perf_counter()
+    por_jogo = [pontuar_um_jogo(*linha) for linha in linhas]
+    t_por_jogo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    lote = pontuar_jogos(**jogos)
+    t_lote = time.perf_counter() - inicio
+
+    # Conferência: os dois caminhos têm que concordar em todos os jogos
+    margem, edge, prob, trend, risco = zip(*por_jogo)
+    iguais = (
+        np.array_equal(lote['margem'], margem) and np.array_equal(lote['edge'], edge)
+        and np.array_equal(lote['hp_prob'], prob)
+        and list(lote['trend']) == list(trend) and list(lote['hp_risk']) == list(risco)
+    )
+
+    print(f"   Jogo a jogo : {t_por_jogo:.3f}s ({args.jogos / t_por_jogo:,.0f} jogos/s)")
+    print(f"   Em lote     : {t_lote:.3f}s ({args.jogos / t_lote:,.0f} jogos/s)")
+    print(f"   Ganho       : {t_por_jogo / t_lote:.1f}x")
+    print(f"{'✅' if iguais else '❌'} Resultados {'idênticos' if iguais else 'DIFERENTES'} nos dois caminhos.")
+
+if __name__ == "__main__":
+    main()
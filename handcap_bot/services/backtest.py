@@ -0,0 +1,220 @@
+# services/backtest.py
+# Backtest offline do modelo de handicap: reexecuta jogos históricos (linhas + placares) de arquivos locais,
+# sem rede, e mede acerto, ROI, Brier e calibração por temporada. Aceita varredura de parâmetros em paralelo.
+#
+# Uso (dentro de handcap_bot/):
+#   python -m services.backtest --fixtures dados/historico/ --saida backtest_report.json
+#   python -m services.backtest --fixtures dados/historico/ --home-court 1.5:3.5:0.25 --penalidade-b2b 0:3:0.5
+#
+# Formato das fixtures (CSV, um jogo por linha; colunas de fadiga são opcionais):
+#   season, game_date, home, away, net_m, net_v, pace_m, pace_v, linha, pts_m, pts_v,
+#   b2b_m, b2b_v, tres_em_quatro_m, tres_em_quatro_v
+# `linha` é o handicap do MANDANTE (ex: -5.5 quando o mandante é favorito por 5.5).
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from services.strategy_handicap import PARAMETROS_PADRAO, pontuar_jogos
+
+COLUNAS_OBRIGATORIAS = ("season", "net_m", "net_v", "pace_m", "pace_v", "linha", "pts_m", "pts_v")
+COLUNAS_FADIGA = ("b2b_m", "b2b_v", "tres_em_quatro_m", "tres_em_quatro_v")
+FAIXAS_CALIBRACAO = np.linspace(0.0, 1.0, 11)
+
+def carregar_fixtures(caminho):
+    """Lê um CSV ou todos os CSVs de um diretório e devolve um DataFrame ordenado por temporada."""
+    arquivos = sorted(glob.glob(os.path.join(caminho, "*.csv"))) if os.path.isdir(caminho) else [caminho]
+    if not arquivos:
+        raise FileNotFoundError(f"Nenhuma fixture .csv encontrada em {caminho}")
+
+    df = pd.concat([pd.read_csv(a) for a in arquivos], ignore_index=True)
+    faltando = [c for c in COLUNAS_OBRIGATORIAS if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Fixtures sem as colunas obrigatórias: {', '.join(faltando)}")
+
+    for coluna in COLUNAS_FADIGA:
+        df[coluna] = df[coluna].fillna(False).astype(bool) if coluna in df.columns else False
+    df["season"] = df["season"].astype(str)
+    return df.sort_values("season", kind="stable").reset_index(drop=True)
+
+def _colunas(df):
+    """Converte o DataFrame em arrays NumPy (o que cada processo da varredura recebe)."""
+    temporadas, codigos = np.unique(df["season"].to_numpy(), return_inverse=True)
+    dados = {c: df[c].to_numpy(dtype=float) for c in COLUNAS_OBRIGATORIAS if c != "season"}
+    dados.update({c: df[c].to_numpy(dtype=bool) for c in COLUNAS_FADIGA})
+    dados["temporada"] = codigos
+    return list(temporadas), dados
+
+# ------------------------------------------------------------------------------
+# Métricas
+# ------------------------------------------------------------------------------
+
+def avaliar(dados, temporadas, parametros, odd=1.91, com_calibracao=False):
+    """
+    Roda o modelo com `parametros` sobre todos os jogos e agrega por temporada.
+    Aposta = lado da tendência (mandante/visitante); 'equilibrado' não aposta; empate na linha (push) devolve a aposta.
+    """
+    r = pontuar_jogos(
+        dados["net_m"], dados["net_v"], dados["pace_m"], dados["pace_v"], dados["linha"],
+        dados["b2b_m"], dados["b2b_v"], dados["tres_em_quatro_m"], dados["tres_em_quatro_v"],
+        parametros=parametros,
+    )
+
+    # Resultado contra a linha, do ponto de vista do mandante
+    cobertura = dados["pts_m"] - dados["pts_v"] + dados["linha"]
+    push = cobertura == 0
+    mandante_cobriu = cobertura > 0
+
+    aposta_m = r["trend"] == "mandante"
+    aposta_v = r["trend"] == "visitante"
+    apostou = (aposta_m | aposta_v) & ~push
+    ganhou = apostou & ((aposta_m & mandante_cobriu) | (aposta_v & ~mandante_cobriu))
+    lucro = np.where(ganhou, odd - 1.0, np.where(apostou, -1.0, 0.0))
+
+    # Probabilidade do mandante cobrir (antes da inversão para o lado do visitante)
+    p_mandante = np.where(aposta_v, 100.0 - r["hp_prob"], r["hp_prob"]) / 100.0
+    erro_quadratico = np.where(push, 0.0, (p_mandante - mandante_cobriu) ** 2)
+
+    n = len(temporadas)
+    t = dados["temporada"]
+    jogos = np.bincount(t, minlength=n)
+    validos = np.bincount(t, weights=~push, minlength=n)
+    apostas = np.bincount(t, weights=apostou, minlength=n)
+    vitorias = np.bincount(t, weights=ganhou, minlength=n)
+    lucros = np.bincount(t, weights=lucro, minlength=n)
+    brier = np.bincount(t, weights=erro_quadratico, minlength=n)
+
+    def _metricas(jogos, validos, apostas, vitorias, lucros, brier):
+        return {
+            "jogos": int(jogos),
+            "apostas": int(apostas),
+            "acerto": round(vitorias / apostas, 4) if apostas else None,
+            "roi": round(lucros / apostas, 4) if apostas else None,
+            "lucro_unidades": round(float(lucros), 2),
+            "brier": round(brier / validos, 4) if validos else None,
+        }
+
+    relatorio = {
+        "parametros": dict(parametros),
+        "geral": _metricas(jogos.sum(), validos.sum(), apostas.sum(), vitorias.sum(), lucros.sum(), brier.sum()),
+        "por_temporada": {
+            temporada: _metricas(jogos[i], validos[i], apostas[i], vitorias[i], lucros[i], brier[i])
+            for i, temporada in enumerate(temporadas)
+        },
+    }
+    if com_calibracao:
+        relatorio["calibracao"] = {
+            temporada: curva_calibracao(p_mandante[(t == i) & ~push], mandante_cobriu[(t == i) & ~push])
+            for i, temporada in enumerate(temporadas)
+        }
+    return relatorio
+
+def curva_calibracao(previsto, observado):
+    """Por faixa de 10% de probabilidade prevista: média prevista, frequência observada e nº de jogos."""
+    faixa = np.clip(np.digitize(previsto, FAIXAS_CALIBRACAO) - 1, 0, len(FAIXAS_CALIBRACAO) - 2)
+    curva = []
+    for i in range(len(FAIXAS_CALIBRACAO) - 1):
+        mascara = faixa == i
+        if mascara.any():
+            curva.append({
+                "faixa": f"{FAIXAS_CALIBRACAO[i]:.1f}-{FAIXAS_CALIBRACAO[i + 1]:.1f}",
+                "previsto": round(float(previsto[mascara].mean()), 4),
+                "observado": round(float(observado[mascara].mean()), 4),
+                "jogos": int(mascara.sum()),
+            })
+    return curva
+
+# ------------------------------------------------------------------------------
+# Varredura de parâmetros (ProcessPool: cada processo recebe os arrays uma única vez)
+# ------------------------------------------------------------------------------
+
+_DADOS_PROCESSO = {}
+
+def _iniciar_processo(temporadas, dados, odd):
+    _DADOS_PROCESSO.update(temporadas=temporadas, dados=dados, odd=odd)
+
+def _avaliar_bloco(bloco):
+    d = _DADOS_PROCESSO
+    return [avaliar(d["dados"], d["temporadas"], parametros, d["odd"]) for parametros in bloco]
+
+def varrer_parametros(df, grade, odd=1.91, processos=None, tamanho_bloco=64):
+    """
+    `grade`: { nome_parametro: [valores] }. Avalia todas as combinações (produto cartesiano)
+    e devolve a lista de relatórios, na ordem das combinações.
+    """
+    temporadas, dados = _colunas(df)
+    nomes = list(grade)
+    combinacoes = [{**PARAMETROS_PADRAO, **dict(zip(nomes, valores))} for valores in itertools.product(*grade.values())]
+    blocos = [combinacoes[i:i + tamanho_bloco] for i in range(0, len(combinacoes), tamanho_bloco)]
+
+    if processos == 1 or len(blocos) == 1:
+        _iniciar_processo(temporadas, dados, odd)
+        return [r for bloco in blocos for r in _avaliar_bloco(bloco)]
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                             initargs=(temporadas, dados, odd)) as executor:
+        return [r for resultado in executor.map(_avaliar_bloco, blocos) for r in resultado]
+
+# ------------------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------------------
+
+def _faixa(texto):
+    """'1.5:3.5:0.25' -> [1.5, 1.75, ..., 3.5]; '2.5' -> [2.5]."""
+    partes = [float(p) for p in texto.split(":")]
+    if len(partes) == 1:
+        return partes
+    inicio, fim, passo = partes
+    return [round(float(v), 6) for v in np.arange(inicio, fim + passo / 2, passo)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest offline do modelo de handicap")
+    parser.add_argument("--fixtures", required=True, help="CSV ou diretório com CSVs de jogos históricos")
+    parser.add_argument("--saida", default="backtest_report.json")
+    parser.add_argument("--odd", type=float, default=1.91, help="Odd decimal das apostas (padrão: -110)")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10, help="Quantas combinações entram no relatório")
+    for nome in PARAMETROS_PADRAO:
+        parser.add_argument(f"--{nome.replace('_', '-')}", type=_faixa, default=None,
+                            help=f"Valor ou faixa início:fim:passo (padrão: {PARAMETROS_PADRAO[nome]})")
+    args = parser.parse_args()
+
+    df = carregar_fixtures(args.fixtures)
+    grade = {nome: getattr(args, nome) or [valor] for nome, valor in PARAMETROS_PADRAO.items()}
+    total = int(np.prod([len(v) for v in grade.values()]))
+    print(f"📚 {len(df)} jogos carregados ({df['season'].nunique()} temporadas). Avaliando {total} combinações...")
+
+    inicio = time.perf_counter()
+    resultados = varrer_parametros(df, grade, odd=args.odd, processos=args.processos)
+    duracao = time.perf_counter() - inicio
+
+    # Ordena por ROI geral (combinações sem nenhuma aposta vão para o fim)
+    resultados.sort(key=lambda r: r["geral"]["roi"] if r["geral"]["roi"] is not None else float("-inf"), reverse=True)
+
+    temporadas, dados = _colunas(df)
+    relatorio = {
+        "jogos": len(df),
+        "combinacoes": total,
+        "duracao_s": round(duracao, 2),
+        "odd": args.odd,
+        "padrao": avaliar(dados, temporadas, PARAMETROS_PADRAO, args.odd, com_calibracao=True),
+        "melhores": resultados[:args.top],
+    }
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=1)
+
+    padrao, melhor = relatorio["padrao"]["geral"], resultados[0]
+    print(f"✅ Varredura concluída em {duracao:.1f}s ({total / duracao:,.0f} combinações/s).")
+    print(f"   Parâmetros atuais : acerto {padrao['acerto']} | ROI {padrao['roi']} | Brier {padrao['brier']}")
+    print(f"   Melhor combinação : acerto {melhor['geral']['acerto']} | ROI {melhor['geral']['roi']} | {melhor['parametros']}")
+    print(f"📄 Relatório salvo em {args.saida}")
+
+if __name__ == "__main__":
+    main()
@@ -1,73 +1,72 @@
 # services/fetch_espn.py
 
 import requests
-from datetime import date, datetime
+from datetime import date
+from dotenv import dotenv_values
+from nba_comum.cache_http import CacheHTTP
+from nba_comum.snapshot_rodada import SnapshotRodada
+from nba_comum.transporte_gravado import transporte_do_ambiente
+from services.instrumentacao import instrumentacao
 
-def fetch_espn_games():
+config = dotenv_values(".env")
+
+URL_SCOREBOARD = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
+
+# Sessão única (keep-alive) + cache com TTL/ETag. Com CACHE_HTTP_DIR o cache sobrevive entre execuções.
+sessao = requests.Session()
+
+# HTTP_TRANSPORTE=gravar|reproduzir|misto: grava/reproduz as respostas em HTTP_FIXTURES_DIR (roda sem rede)
+transporte = transporte_do_ambiente(config.get("HTTP_TRANSPORTE"), config.get("HTTP_FIXTURES_DIR"))
+if transporte:
+    sessao.mount("https://", transporte)
+    sessao.mount("http://", transporte)
+
+cache_espn = CacheHTTP(
+    [("/scoreboard", int(config.get("CACHE_TTL_SCOREBOARD", 60)))],
+    diretorio=config.get("CACHE_HTTP_DIR") or None,
+)
+
+def _get_espn(url, **kwargs):
+    with instrumentacao.cronometrar("chamada_externa", tipo="http", destino="site.api.espn.com"):
+        return sessao.get(url, **kwargs)
+
+def fetch_espn_games(forcar=False):
     print("🔄 Buscando dados da ESPN...")
 
-    url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
-    resposta = requests.get(url)
+    resposta = cache_espn.buscar(_get_espn, URL_SCOREBOARD, forcar=forcar, timeout=15)
+    instrumentacao.incrementar("http_cache_total", origem=getattr(resposta, "origem", "rede"))
     dados = resposta.json()
 
-    print("✅ Dados recebidos com sucesso!")
+    origem = getattr(resposta, "origem", "rede")
+    print(f"✅ Dados recebidos com sucesso! (origem: {origem})")
     return dados
 
+# Rodada do dia já interpretada e gravada por data (mesma pasta do tips_bot para compartilhar)
+snapshot_rodada = SnapshotRodada(
+    lambda forcar: fetch_espn_games(forcar=forcar),
+    diretorio=config.get("RODADA_DIR", "rodadas"),
+    ttl_s=int(config.get("RODADA_TTL_S", 60)),
+)
 
-def parse_espn_games():
-    dados = fetch_espn_games()
+def parse_espn_games(forcar=False):
+    """Jogos do dia a partir do snapshot da rodada (compartilhado com o tips_bot via RODADA_DIR)."""
+    rodada = snapshot_rodada.carregar(forcar=forcar)
 
     jogos_extraidos = []
 
-    events = dados.get("events", [])
-    total_jogos = len(events)
+    total_jogos = len(rodada["jogos"])
 
-    print(f"🎮 Total de jogos encontrados: {total_jogos}")
+    print(f"🎮 Total de jogos encontrados: {total_jogos} (rodada {rodada['data']}, origem: {rodada['origem']})")
 
-    for jogo in events:
-
-        info_competicao = jogo["competitions"][0]
-        competidores = info_competicao["competitors"]
-
-        # Descobrir quem é mandante e visitante
-        mandante = next(t for t in competidores if t["homeAway"] == "home")
-        visitante = next(t for t in competidores if t["homeAway"] == "away")
+    for jogo in rodada["jogos"]:
 
         # -----------------------------
         # 🛠️ Tratamento de Odds/Spread
         # -----------------------------
-        spread = "0.0" 
-        if "odds" in info_competicao and info_competicao["odds"]:
-            try:
-                # Tenta pegar o valor 'details' (ex: "LAL -5.5", "-5.5" ou "EVEN")
-                raw_spread = info_competicao["odds"][0].get("details", "0.0")
-                
-                # Se for "EVEN", considera 0.0
-                if "EVEN" in str(raw_spread).upper():
-                    spread = "0.0"
-                else:
-                    # Tenta limpar a string para pegar só o número
-                    # Ex: "LAL -5.5" -> pega o "-5.5" (último elemento)
-                    spread = str(raw_spread).split(" ")[-1]
-            except Exception as e:
-                print(f"⚠️ Erro ao processar spread: {e}")
-                spread = "0.0"
-
-        # -----------------------------
-        # ✔️ Conversão correta da data
-        # -----------------------------
-        data_bruta = jogo.get("date")  # ex: "2025-12-11T03:00Z"
-        data_formatada = None
-
-        if data_bruta:
-            try:
-                # Remover o "Z" e converter
-                data_limpa = data_bruta.replace("Z", "+00:00")
-                data_dt = datetime.fromisoformat(data_limpa)
-                data_formatada = data_dt.strftime("%Y-%m-%d %H:%M:%S")  # Formato postgres
-            except Exception as e:
-                print(f"⚠️ Erro convertendo data: {data_bruta} -> {e}")
-                data_formatada = data_bruta
+        # Linha completa (ex: "LAL -5.5"): a sigla diz a qual time o número pertence
+        spread = jogo["linha"] or "0.0"
+        if "EVEN" in str(spread).upper():
+            spread = "0.0"
 
         # Dicionário com chaves em Português (padrão interno do fetch)
         jogo_formatado = {
@@ -75,13 +74,13 @@ def parse_espn_games():
             "numero_jogos": total_jogos,
             "contexto": "Relatório diário NBA",
 
-            "jogo_id": jogo.get("id"),
-            "liga": jogo.get("league", {}).get("name", "NBA"),
+            "jogo_id": jogo["jogo_id"],
+            "liga": jogo["liga"],
 
-            "mandante": mandante["team"]["displayName"],
-            "visitante": visitante["team"]["displayName"],
+            "mandante": jogo["mandante"]["nome"],
+            "visitante": jogo["visitante"]["nome"],
 
-            "data_jogo": data_formatada,
+            "data_jogo": jogo["data_jogo"],  # UTC, formato postgres
             "handicap_linha": spread, # Valor tratado
 
             # Campos placeholder (serão preenchidos na strategy)
@@ -1,71 +1,182 @@
 # services/fetch_nba.py
+import json
+import os
+import sqlite3
 import pandas as pd
-from datetime import datetime, timedelta
-from nba_api.stats.endpoints import leaguedashteamstats, teamgamelog
+from datetime import date, timedelta
+from dotenv import dotenv_values
+from nba_api.stats.endpoints import leaguedashteamstats, leaguegamelog
+from nba_api.stats.library.http import NBAStatsHTTP
+from nba_comum.transporte_gravado import transporte_do_ambiente
+from services.snapshot_stats import SnapshotStats
+from services.instrumentacao import instrumentacao
 
-def buscar_estatisticas_avancadas():
-    """
-    Busca estatísticas avançadas (Net Rating, Pace, eFG%) de todos os times na NBA API.
-    Retorna um dicionário indexado pelo nome do time.
-    """
-    try:
-        print("📊 [NBA API] Buscando Net Rating, Pace e eFG% da temporada 2024-25...")
-        
-        # measure_type_nullable='Advanced' traz NetRating, Pace, etc.
+config = dotenv_values(".env")
+CACHE_DIR = config.get("CACHE_DIR", "cache")
+STATS_TTL_HORAS = float(config.get("STATS_TTL_HORAS", 12))
+
+# Mesmo modo de gravação/reprodução do fetch_espn, na sessão que a nba_api usa para o stats.nba.com
+transporte = transporte_do_ambiente(config.get("HTTP_TRANSPORTE"), config.get("HTTP_FIXTURES_DIR"))
+if transporte:
+    NBAStatsHTTP.get_session().mount("https://", transporte)
+    NBAStatsHTTP.get_session().mount("http://", transporte)
+
+# Criado no primeiro uso (obter_snapshot_stats): importar o módulo não cria pasta nem arquivo SQLite
+snapshot_stats = None
+
+def obter_snapshot_stats():
+    global snapshot_stats
+    if snapshot_stats is None:
+        snapshot_stats = SnapshotStats(config.get("STATS_SNAPSHOT_DB") or os.path.join(CACHE_DIR, "stats_nba.sqlite"))
+    return snapshot_stats
+
+# Índice de descanso já montado nesta execução: { data: { TEAM_ID: {...} } }
+_indices_descanso = {}
+
+def temporada_atual(hoje=None):
+    """Temporada da NBA para a data (ex: outubro/2024 a setembro/2025 -> '2024-25')."""
+    hoje = hoje or date.today()
+    inicio = hoje.year if hoje.month >= 10 else hoje.year - 1
+    return f"{inicio}-{str(inicio + 1)[2:]}"
+
+def temporada_anterior(temporada):
+    """'2025-26' -> '2024-25'."""
+    inicio = int(temporada[:4]) - 1
+    return f"{inicio}-{str(inicio + 1)[2:]}"
+
+def _baixar_estatisticas_avancadas(temporada):
+    # measure_type_nullable='Advanced' traz NetRating, Pace, etc.
+    with instrumentacao.cronometrar("chamada_externa", tipo="nba_stats", operacao="leaguedashteamstats"):
         stats = leaguedashteamstats.LeagueDashTeamStats(
             measure_type_nullable='Advanced',
-            season='2024-25',
+            season=temporada,
             per_mode_detailed='Per100Possessions' 
         )
-        df = stats.get_data_frames()[0]
-        
-        # Cria um dicionário facilitador: { 'Los Angeles Lakers': { 'NET_RATING': 2.5, ... }, ... }
-        stats_dict = {}
-        for _, row in df.iterrows():
-            team_name = row['TEAM_NAME']
-            stats_dict[team_name] = {
-                'NET_RATING': float(row['NET_RATING']), # Saldo de pontos a cada 100 posses
-                'PACE': float(row['PACE']),             # Ritmo de jogo
-                'EFG_PCT': float(row['EFG_PCT']),       # Aproveitamento de arremesso real
-                'TEAM_ID': int(row['TEAM_ID'])
-            }
-        
-        print(f"✅ [NBA API] Estatísticas de {len(stats_dict)} times carregadas.")
-        return stats_dict
+    df = stats.get_data_frames()[0]
+
+    # Conversão vetorizada: { 'Los Angeles Lakers': { 'NET_RATING': 2.5, ... }, ... }
+    # NET_RATING = saldo de pontos a cada 100 posses | PACE = ritmo | EFG_PCT = aproveitamento real
+    df = df.astype({'NET_RATING': float, 'PACE': float, 'EFG_PCT': float, 'TEAM_ID': int})
+    return df.set_index('TEAM_NAME')[['NET_RATING', 'PACE', 'EFG_PCT', 'TEAM_ID']].to_dict('index')
+
+def buscar_estatisticas_avancadas(temporada=None, forcar=False, recuar=True):
+    """
+    Busca estatísticas avançadas (Net Rating, Pace, eFG%) de todos os times.
+    Retorna um dicionário indexado pelo nome do time.
 
+    Usa o snapshot local (SQLite) enquanto ele tiver menos de STATS_TTL_HORAS;
+    se a NBA API falhar (ou responder sem times), segue com o último snapshot bom da temporada.
+    Sem snapshot, com `recuar=True`, usa a temporada anterior (ex: outubro, temporada recém-virada).
+    """
+    temporada = temporada or temporada_atual()
+    snapshots = obter_snapshot_stats()
+    idade, snapshot = snapshots.ultimo(temporada)
+
+    if snapshot and not forcar and idade < STATS_TTL_HORAS * 3600:
+        print(f"📦 [NBA API] Stats {temporada} do snapshot local ({idade / 3600:.1f}h atrás, {len(snapshot)} times).")
+        return snapshot
+
+    try:
+        print(f"📊 [NBA API] Buscando Net Rating, Pace e eFG% da temporada {temporada}...")
+        stats_dict = _baixar_estatisticas_avancadas(temporada)
+        if not stats_dict:
+            # Resposta válida, mas sem times: para o relatório é o mesmo que a API fora do ar
+            raise ValueError(f"nenhum time retornado para {temporada}")
     except Exception as e:
+        if snapshot:
+            print(f"⚠️ [NBA API] Erro ao buscar stats: {e}. Usando snapshot de {idade / 3600:.1f}h atrás.")
+            return snapshot
         print(f"⚠️ [NBA API] Erro ao buscar stats: {e}")
+        if recuar:
+            anterior = temporada_anterior(temporada)
+            print(f"↩️ [NBA API] Sem snapshot de {temporada}. Usando a temporada {anterior}.")
+            return buscar_estatisticas_avancadas(anterior, recuar=False)
         return {}
 
-def verificar_back_to_back(team_name, stats_dict):
+    try:
+        snapshots.salvar(temporada, date.today(), stats_dict)
+    except sqlite3.Error as e:
+        print(f"⚠️ Não foi possível salvar o snapshot de stats: {e}")
+
+    print(f"✅ [NBA API] Estatísticas de {len(stats_dict)} times carregadas.")
+    return stats_dict
+
+def _calcular_fadiga(datas_jogos, hoje):
+    """Descanso/B2B/3-em-4 de um time para o jogo de `hoje`, a partir das datas dos jogos anteriores."""
+    anteriores = sorted(d for d in datas_jogos if d < hoje)
+    if not anteriores:
+        return {'ultimo_jogo': None, 'dias_descanso': None, 'b2b': False, 'tres_em_quatro': False}
+
+    ultimo = anteriores[-1]
+    # 3-em-4: o jogo de hoje seria o 3º em 4 noites (2+ jogos nas 3 noites anteriores)
+    jogos_3_noites = sum(1 for d in anteriores if d >= hoje - timedelta(days=3))
+    return {
+        'ultimo_jogo': ultimo.isoformat(),
+        'dias_descanso': (hoje - ultimo).days - 1,
+        'b2b': ultimo == hoje - timedelta(days=1),
+        'tres_em_quatro': jogos_3_noites >= 2,
+    }
+
+def montar_indice_descanso(hoje=None, temporada=None):
     """
-    Verifica se o time jogou ontem (B2B) consultando o log de jogos oficial.
+    Monta { TEAM_ID: {'ultimo_jogo', 'dias_descanso', 'b2b', 'tres_em_quatro'} } para a liga inteira
+    com UMA chamada (LeagueGameLog), em vez de um TeamGameLog por time.
+    O resultado fica em cache (memória + arquivo do dia em CACHE_DIR).
     """
+    hoje = hoje or date.today()
+    temporada = temporada or temporada_atual(hoje)
+    if hoje in _indices_descanso:
+        return _indices_descanso[hoje]
+
+    arquivo = os.path.join(CACHE_DIR, f"descanso_{temporada}_{hoje.isoformat()}.json")
+    if os.path.exists(arquivo):
+        try:
+            with open(arquivo, encoding="utf-8") as f:
+                indice = {int(k): v for k, v in json.load(f).items()}
+            _indices_descanso[hoje] = indice
+            print(f"😴 [NBA API] Índice de descanso do dia carregado do cache ({len(indice)} times).")
+            return indice
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cache de descanso inválido ({e}). Buscando de novo...")
+
     try:
-        if team_name not in stats_dict:
-            return False
-            
-        team_id = stats_dict[team_name]['TEAM_ID']
-        
-        # Busca os últimos jogos do time
-        gamelog = teamgamelog.TeamGameLog(team_id=team_id, season='2024-25')
-        df_log = gamelog.get_data_frames()[0]
-        
-        if df_log.empty:
-            return False
-
-        # Pega a data do último jogo registrado
-        # A NBA API retorna strings como "OCT 25, 2024" ou ISO, pandas resolve.
-        last_game_str = df_log.iloc[0]['GAME_DATE']
-        last_game_date = pd.to_datetime(last_game_str).date()
-
-        hoje = datetime.now().date()
-        ontem = hoje - timedelta(days=1)
-        
-        # Se o último jogo foi ontem, é Back-to-Back
-        return last_game_date == ontem
+        print("😴 [NBA API] Buscando log de jogos da liga (B2B / descanso)...")
+        with instrumentacao.cronometrar("chamada_externa", tipo="nba_stats", operacao="leaguegamelog"):
+            gamelog = leaguegamelog.LeagueGameLog(season=temporada, player_or_team_abbreviation='T')
+        df = gamelog.get_data_frames()[0]
+
+        # Conversão vetorizada das datas; depois agrupa por time
+        df['DATA'] = pd.to_datetime(df['GAME_DATE']).dt.date
+        datas_por_time = df.groupby('TEAM_ID')['DATA'].agg(list)
+
+        indice = {int(team_id): _calcular_fadiga(datas, hoje) for team_id, datas in datas_por_time.items()}
 
     except Exception as e:
-        # Em caso de erro, assume False para não bloquear o bot
-        print(f"⚠️ Erro B2B ({team_name}): {e}")
-        return False
\ No newline at end of file
+        # Em caso de erro, segue sem fadiga (mesmo comportamento de antes)
+        print(f"⚠️ [NBA API] Erro ao montar índice de descanso: {e}")
+        return {}
+
+    _indices_descanso[hoje] = indice
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(arquivo, "w", encoding="utf-8") as f:
+            json.dump(indice, f)
+    except OSError as e:
+        print(f"⚠️ Não foi possível salvar o cache de descanso: {e}")
+
+    total_b2b = sum(1 for v in indice.values() if v['b2b'])
+    print(f"✅ [NBA API] Índice de descanso pronto: {len(indice)} times, {total_b2b} em back-to-back hoje.")
+    return indice
+
+def verificar_back_to_back(team_name, stats_dict, indice_descanso=None):
+    """
+    Verifica se o time jogou ontem (B2B) consultando o índice de descanso da liga.
+    """
+    if team_name not in stats_dict:
+        return False
+
+    if indice_descanso is None:
+        indice_descanso = montar_indice_descanso()
+
+    team_id = stats_dict[team_name]['TEAM_ID']
+    return indice_descanso.get(team_id, {}).get('b2b', False)
@@ -0,0 +1,5 @@
+# services/instrumentacao.py
+from nba_comum.instrumentacao import Instrumentacao
+
+# Instância única do processo: todos os módulos registram aqui
+instrumentacao = Instrumentacao(prefixo="handcap_bot_")
@@ -1,12 +1,22 @@
 # services/notifier_telegram.py
-import requests
+from concurrent.futures import Future
 from dotenv import dotenv_values
+from nba_comum.fila_telegram import FilaTelegram
+from services.instrumentacao import instrumentacao
 
 # Carrega configurações
 config = dotenv_values(".env")
 TOKEN = config.get("TELEGRAM_BOT_TOKEN")
 CHAT_ID = config.get("TELEGRAM_CHAT_ID")
 
+# Fila de saída com limite de envio, retry no 429 e sessão persistente
+fila_telegram = FilaTelegram(
+    TOKEN,
+    chat_id_padrao=CHAT_ID,
+    msgs_por_minuto_chat=int(config.get("TELEGRAM_MSGS_POR_MINUTO_CHAT", 20)),
+    instrumentacao=instrumentacao,
+)
+
 def formatar_relatorio(lista_payloads):
     if not lista_payloads:
         return "Nenhum jogo analisado hoje."
@@ -65,21 +75,14 @@ def formatar_relatorio(lista_payloads):
     return relatorio
 
 def enviar_notificacao(lista_payloads):
+    """Enfileira o relatório e retorna na hora (Future[bool]); use fila_telegram.aguardar_envios() antes de sair."""
     if not TOKEN or not CHAT_ID:
         print("❌ [Telegram] Token ou Chat ID ausentes.")
-        return
+        futuro = Future()
+        futuro.set_result(False)
+        return futuro
     
     msg = formatar_relatorio(lista_payloads)
-    
-    url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
-    payload = {
-        "chat_id": CHAT_ID, 
-        "text": msg, 
-        "parse_mode": "Markdown"
-    }
-    
-    try:
-        requests.post(url, json=payload)
-        print("✅ Relatório enviado para o Telegram.")
-    except Exception as e:
-        print(f"❌ Erro ao enviar Telegram: {e}")
\ No newline at end of file
+    futuro = fila_telegram.enfileirar(msg, parse_mode="Markdown")
+    print("📤 Relatório enfileirado para o Telegram.")
+    return futuro
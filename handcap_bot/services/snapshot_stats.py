@@ -0,0 +1,55 @@
+# services/snapshot_stats.py
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+class SnapshotStats:
+    """
+    Guarda em SQLite as estatísticas avançadas de cada temporada, uma linha por (temporada, data).
+    Permite pular a NBA API quando já existe um snapshot recente e seguir com o último
+    snapshot bom quando a API estiver fora do ar.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with closing(self._conectar()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats_avancadas (
+                    temporada TEXT NOT NULL,
+                    data_ref TEXT NOT NULL,
+                    salvo_em REAL NOT NULL,
+                    dados TEXT NOT NULL,
+                    PRIMARY KEY (temporada, data_ref)
+                )
+            """)
+
+    def _conectar(self):
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    def salvar(self, temporada, data_ref, stats_dict):
+        with closing(self._conectar()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stats_avancadas (temporada, data_ref, salvo_em, dados) VALUES (?, ?, ?, ?)",
+                (temporada, str(data_ref), time.time(), json.dumps(stats_dict)),
+            )
+
+    def ultimo(self, temporada):
+        """Retorna (idade_em_segundos, stats_dict) do snapshot mais recente da temporada, ou (None, None)."""
+        try:
+            with closing(self._conectar()) as conn, conn:
+                linha = conn.execute(
+                    "SELECT salvo_em, dados FROM stats_avancadas WHERE temporada = ? ORDER BY salvo_em DESC LIMIT 1",
+                    (temporada,),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao ler snapshot de stats: {e}")
+            return None, None
+
+        if not linha:
+            return None, None
+        return time.time() - linha[0], json.loads(linha[1])
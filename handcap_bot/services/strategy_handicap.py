@@ -1,32 +1,80 @@
 # services/strategy_handicap.py
 
 from datetime import date
-from services.utils import normalizar_nome_time
+import numpy as np
+from nba_comum.registro_times import registro_times
 
-def calcular_margem_projetada(m_stats, v_stats, b2b_m, b2b_v):
+# Constantes do modelo (sobrescrevíveis por chamada, ex: varredura de parâmetros no backtest)
+PARAMETROS_PADRAO = {
+    'home_court': 2.5,        # Vantagem de Casa
+    'penalidade_b2b': 2.0,    # Back-to-Back
+    # 3º jogo em 4 noites (acumula com o B2B). Desligado até o backtest sustentar um valor:
+    # python -m services.backtest ... --penalidade-3em4 0:1.5:0.5
+    'penalidade_3em4': 0.0,
+    'prob_por_ponto': 3.0,    # Modelo Linear: 0 edge = 50%, 1 ponto edge = +3%
+}
+
+def calcular_margens(net_m, net_v, pace_m, pace_v, b2b_m=False, b2b_v=False,
+                     tres_em_quatro_m=False, tres_em_quatro_v=False, parametros=None):
     """
-    Calcula a margem de vitória esperada do MANDANTE baseada em eficiência.
+    Versão vetorizada de calcular_margem_projetada: recebe colunas (listas/arrays) e
+    devolve um array com a margem de vitória esperada do MANDANTE de cada jogo.
     """
+    p = {**PARAMETROS_PADRAO, **(parametros or {})}
+    net_m, net_v = np.asarray(net_m, dtype=float), np.asarray(net_v, dtype=float)
+    pace_m, pace_v = np.asarray(pace_m, dtype=float), np.asarray(pace_v, dtype=float)
+
     # 1. Diferença de Net Rating (A métrica mais importante)
-    diff_net_rating = m_stats['NET_RATING'] - v_stats['NET_RATING']
+    diff_net_rating = net_m - net_v
     
     # 2. Ajuste de Pace (Ritmo)
-    media_pace = (m_stats['PACE'] + v_stats['PACE']) / 2
-    fator_pace = media_pace / 100.0
+    fator_pace = ((pace_m + pace_v) / 2) / 100.0
     
     margem_base = diff_net_rating * fator_pace
     
-    # 3. Vantagem de Casa (Home Court)
-    home_court = 2.5
+    # 3 e 4. Cansaço (B2B e 3-em-4): penaliza o mandante, favorece contra o visitante
+    ajuste_cansaco = (
+        (np.asarray(b2b_v, dtype=float) - np.asarray(b2b_m, dtype=float)) * p['penalidade_b2b']
+        + (np.asarray(tres_em_quatro_v, dtype=float) - np.asarray(tres_em_quatro_m, dtype=float)) * p['penalidade_3em4']
+    )
     
-    # 4. Penalidade de Cansaço (Back-to-Back)
-    penalidade_b2b = 2.0
+    return margem_base + p['home_court'] + ajuste_cansaco
+
+def pontuar_jogos(net_m, net_v, pace_m, pace_v, linha, b2b_m=False, b2b_v=False,
+                  tres_em_quatro_m=False, tres_em_quatro_v=False, parametros=None):
+    """
+    Pontua uma rodada inteira (ou várias) de uma vez com NumPy.
+    Cada argumento é uma coluna com um valor por jogo; `linha` já é o handicap do mandante (float).
+    Retorna um dict de arrays: margem, edge, hp_prob, trend e hp_risk (mesma regra de gerar_payload_handicap).
+    """
+    p = {**PARAMETROS_PADRAO, **(parametros or {})}
+    margem = calcular_margens(net_m, net_v, pace_m, pace_v, b2b_m, b2b_v,
+                              tres_em_quatro_m, tres_em_quatro_v, p)
     
-    ajuste_cansaco = 0
-    if b2b_m: ajuste_cansaco -= penalidade_b2b
-    if b2b_v: ajuste_cansaco += penalidade_b2b
+    # Edge = Margem Justa + Linha Mercado
+    edge = margem + np.asarray(linha, dtype=float)
     
-    return margem_base + home_court + ajuste_cansaco
+    prob = np.clip(50.0 + (edge * p['prob_por_ponto']), 1.0, 99.0)
+    
+    # Tendência (para o visitante, mostra a chance dele)
+    mandante = prob >= 55
+    visitante = prob <= 45
+    trend = np.where(mandante, "mandante", np.where(visitante, "visitante", "equilibrado"))
+    hp_prob = np.where(visitante, 100.0 - prob, prob)
+    
+    # Risco
+    hp_risk = np.where(hp_prob >= 60, "BAIXO", np.where(hp_prob >= 53, "MÉDIO", "ALTO"))
+    
+    return {'margem': margem, 'edge': edge, 'hp_prob': hp_prob, 'trend': trend, 'hp_risk': hp_risk}
+
+def calcular_margem_projetada(m_stats, v_stats, b2b_m, b2b_v, tres_em_quatro_m=False, tres_em_quatro_v=False):
+    """
+    Calcula a margem de vitória esperada do MANDANTE baseada em eficiência.
+    """
+    return float(calcular_margens(
+        m_stats['NET_RATING'], v_stats['NET_RATING'], m_stats['PACE'], v_stats['PACE'],
+        b2b_m, b2b_v, tres_em_quatro_m, tres_em_quatro_v
+    ))
 
 def extrair_linha_handicap(spread_str, mandante_nome):
     """
@@ -43,73 +91,85 @@ def extrair_linha_handicap(spread_str, mandante_nome):
             
         valor = float(parts[-1])
         
-        # Se a sigla (ex: LAL) está no nome do mandante, o valor é dele.
+        # Se a sigla (ex: LAL, GS, UTAH) é do mandante, o valor é dele.
         # Caso contrário, inverte o sinal.
-        if parts[0][:3].upper() in mandante_nome.upper():
+        time_linha = registro_times.resolver(parts[0])
+        if time_linha is not None:
+            e_mandante = time_linha == registro_times.resolver(mandante_nome)
+        else:
+            e_mandante = parts[0][:3].upper() in mandante_nome.upper()
+        
+        if e_mandante:
             return valor
         else:
             return -valor
     except:
         return 0.0
 
-def gerar_payload_handicap(jogo, nba_stats_dict):
+def _stats_do_time(time, nome_espn, nba_stats_dict):
+    """Stats do time pelo registro; time desconhecido ou ausente da NBA API é reportado e retorna None."""
+    if time is None:
+        print(f"❌ Time não reconhecido no registro: '{nome_espn}'. Verifique 'nba_comum/registro_times.py'.")
+        return None
+    
+    stats = next((nba_stats_dict[nome] for nome in time.nomes if nome in nba_stats_dict), None)
+    if stats is None:
+        print(f"❌ Stats não encontradas na NBA API para {time.nome} ({time.sigla}).")
+    return stats
+
+def _rotulo_fadiga(fadiga):
+    if fadiga.get('b2b'):
+        return "B2B"
+    if fadiga.get('tres_em_quatro'):
+        return "3em4"
+    if fadiga.get('dias_descanso') is not None:
+        return f"{fadiga['dias_descanso']}d descanso"
+    return "-"
+
+def gerar_payload_handicap(jogo, nba_stats_dict, indice_descanso=None):
     """
     Gera a análise completa cruzando ESPN (jogo) e NBA API (stats).
+    `indice_descanso` vem de fetch_nba.montar_indice_descanso() (uma chamada por execução).
     """
     mandante = jogo.get("mandante")
     visitante = jogo.get("visitante")
     spread_str = jogo.get("handicap_linha")
     
-    # --- CORREÇÃO DE NOMES ---
-    nome_m_nba = normalizar_nome_time(mandante)
-    nome_v_nba = normalizar_nome_time(visitante)
+    # --- IDENTIDADE DOS TIMES (registro canônico, O(1)) ---
+    time_m = registro_times.resolver(mandante)
+    time_v = registro_times.resolver(visitante)
     
-    # Recupera stats (padrao zerado se falhar)
+    # Recupera stats (padrao zerado só quando a NBA API não trouxe nada)
     padrao = {'NET_RATING': 0.0, 'PACE': 100.0}
     
-    # Busca stats do mandante
-    if nome_m_nba in nba_stats_dict:
-        m_stats = nba_stats_dict[nome_m_nba]
-    else:
-        # Tentativa de busca aproximada (contém string)
-        m_stats = next((v for k, v in nba_stats_dict.items() if mandante in k), padrao)
-
-    # Busca stats do visitante
-    if nome_v_nba in nba_stats_dict:
-        v_stats = nba_stats_dict[nome_v_nba]
+    if not nba_stats_dict:
+        m_stats, v_stats = padrao, padrao
     else:
-        v_stats = next((v for k, v in nba_stats_dict.items() if visitante in k), padrao)
-    
-    # Aviso no terminal se os dados estiverem zerados (ajuda a debugar nomes errados)
-    if m_stats['NET_RATING'] == 0.0 and v_stats['NET_RATING'] == 0.0:
-        print(f"⚠️ AVISO: Stats não encontradas para {mandante} ou {visitante}. Verifique 'services/utils.py'.")
+        m_stats = _stats_do_time(time_m, mandante, nba_stats_dict)
+        v_stats = _stats_do_time(time_v, visitante, nba_stats_dict)
+        if m_stats is None or v_stats is None:
+            # Sem stats, a análise sairia com números inventados: o jogo fica fora do relatório
+            return None
 
     # --- CÁLCULOS ---
-    is_b2b_m = False # Futuramente integrar verificação real
-    is_b2b_v = False
+    indice_descanso = indice_descanso or {}
+    fadiga_m = indice_descanso.get(time_m.nba_id, {}) if time_m else {}
+    fadiga_v = indice_descanso.get(time_v.nba_id, {}) if time_v else {}
+    is_b2b_m = fadiga_m.get('b2b', False)
+    is_b2b_v = fadiga_v.get('b2b', False)
     
-    margem_justa = calcular_margem_projetada(m_stats, v_stats, is_b2b_m, is_b2b_v)
     linha_mercado = extrair_linha_handicap(spread_str, mandante)
     
-    # Edge = Margem Justa + Linha Mercado
-    edge = margem_justa + linha_mercado 
-    
-    # Probabilidade (Modelo Linear: 0 edge = 50%, 1 ponto edge = +3%)
-    hp_prob = 50.0 + (edge * 3.0)
-    hp_prob = max(1.0, min(99.0, hp_prob))
-    
-    # Tendência
-    trend = "equilibrado"
-    if hp_prob >= 55:
-        trend = "mandante"
-    elif hp_prob <= 45:
-        trend = "visitante"
-        hp_prob = 100.0 - hp_prob # Inverte para mostrar a chance do visitante
-    
-    # Risco
-    if hp_prob >= 60: hp_risk = "BAIXO"
-    elif hp_prob >= 53: hp_risk = "MÉDIO"
-    else: hp_risk = "ALTO"
+    # Mesmo motor da pontuação em lote, com uma rodada de 1 jogo
+    r = pontuar_jogos(
+        [m_stats['NET_RATING']], [v_stats['NET_RATING']], [m_stats['PACE']], [v_stats['PACE']], [linha_mercado],
+        [is_b2b_m], [is_b2b_v], [fadiga_m.get('tres_em_quatro', False)], [fadiga_v.get('tres_em_quatro', False)]
+    )
+    margem_justa = float(r['margem'][0])
+    edge = float(r['edge'][0])
+    hp_prob = float(r['hp_prob'][0])
+    trend = str(r['trend'][0])
+    hp_risk = str(r['hp_risk'][0])
     
     hp_conf = int(hp_prob)
 
@@ -119,6 +179,8 @@ def gerar_payload_handicap(jogo, nba_stats_dict):
         f"Projeção: {margem_justa:.1f}. Linha: {linha_mercado}. "
         f"Edge: {abs(edge):.1f}."
     )
+    if any(f.get(k) for f in (fadiga_m, fadiga_v) for k in ('b2b', 'tres_em_quatro')):
+        justification += f" Fadiga: {_rotulo_fadiga(fadiga_m)} vs {_rotulo_fadiga(fadiga_v)}."
 
     payload = {
         "dt_report": date.today(),
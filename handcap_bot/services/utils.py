@@ -1,16 +1,12 @@
 # services/utils.py
+from nba_comum.registro_times import registro_times
 
 def normalizar_nome_time(nome_espn):
     """
     Traduz nomes da ESPN para o padrão da NBA API.
     """
-    # Mapa de tradução (ESPN -> NBA API)
-    mapa_nomes = {
-        "LA Clippers": "L.A. Clippers",
-        "Los Angeles Clippers": "L.A. Clippers",
-        "Philadelphia 76ers": "Philadelphia 76ers",
-        # Adicione outros se notar erro, mas geralmente esses são os principais diferentes
-    }
+    # Qualquer variante conhecida (nome, apelido, sigla, id) vira o TEAM_NAME da NBA API
+    time = registro_times.resolver(nome_espn)
     
-    # Retorna o nome traduzido ou o original se não estiver no mapa
-    return mapa_nomes.get(nome_espn, nome_espn)
\ No newline at end of file
+    # Retorna o nome traduzido ou o original se não estiver no registro
+    return time.nome if time else nome_espn
@@ -0,0 +1,5 @@
+"""
+Código comum ao tips_bot e ao handcap_bot: cache HTTP, gravação/reprodução de respostas,
+snapshot da rodada da ESPN, registro de times, fila do Telegram, instrumentação e os
+serviços falsos dos benchmarks. Cada bot instala este pacote a partir desta pasta.
+"""
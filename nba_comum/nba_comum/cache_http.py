@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+
+class RespostaCache:
+    """Resposta servida do cache, com a mesma interface de requests.Response usada pelos endpoints."""
+
+    def __init__(self, url, status_code, conteudo, headers, origem):
+        self.url = url
+        self.status_code = status_code
+        self.content = conteudo
+        self.headers = headers
+        self.origem = origem  # "memoria", "disco", "revalidado" ou "obsoleto"
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} (cache) para {self.url}")
+
+class CacheHTTP:
+    """
+    Cache de respostas GET com TTL por endpoint e requisições condicionais (ETag / If-Modified-Since).
+
+    - Dentro do TTL: responde da memória (ou do disco, se `diretorio` foi informado) sem ir à rede.
+    - TTL vencido: pergunta ao servidor se mudou; 304 renova a entrada sem baixar o corpo de novo.
+    - Falha de rede com entrada antiga disponível: devolve a versão obsoleta em vez de nada.
+    - `forcar=True` ignora o cache e baixa tudo de novo.
+    """
+
+    CABECALHOS_GUARDADOS = ("Content-Type", "ETag", "Last-Modified")
+
+    def __init__(self, ttls, diretorio=None):
+        self.ttls = list(ttls)  # [(trecho_da_url, segundos)], a primeira regra que casar vale
+        self.diretorio = diretorio
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memoria = {}
+        self._contadores = {"hits": 0, "hits_disco": 0, "misses": 0, "revalidados": 0, "obsoletos_servidos": 0}
+
+    # ------------------------------------------------------------------
+    def ttl_para(self, url):
+        return next((segundos for trecho, segundos in self.ttls if trecho in url), 0)
+
+    @staticmethod
+    def chave(url, params=None):
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return url
+
+    def _contar(self, nome):
+        with self._lock:
+            self._contadores[nome] += 1
+
+    # ------------------------------------------------------------------
+    # Camada em disco (opcional): sobrevive a reinícios do processo
+    # ------------------------------------------------------------------
+    def _arquivo(self, chave):
+        return os.path.join(self.diretorio, hashlib.sha1(chave.encode("utf-8")).hexdigest() + ".gz")
+
+    def _ler_disco(self, chave):
+        if not self.diretorio:
+            return None
+        try:
+            with gzip.open(self._arquivo(chave), "rb") as f:
+                meta, conteudo = f.read().split(b"\n", 1)
+            entrada = json.loads(meta)
+            entrada["conteudo"] = conteudo
+            return entrada
+        except (OSError, ValueError):
+            return None
+
+    def _gravar_disco(self, chave, entrada):
+        if not self.diretorio:
+            return
+        meta = {k: v for k, v in entrada.items() if k != "conteudo"}
+        temporario = self._arquivo(chave) + ".tmp"
+        try:
+            with gzip.open(temporario, "wb") as f:
+                f.write(json.dumps(meta).encode("utf-8") + b"\n" + entrada["conteudo"])
+            os.replace(temporario, self._arquivo(chave))
+        except OSError:
+            pass
+
+    def _guardar(self, chave, entrada):
+        with self._lock:
+            self._memoria[chave] = entrada
+        self._gravar_disco(chave, entrada)
+
+    # ------------------------------------------------------------------
+    def buscar(self, obter, url, forcar=False, headers=None, params=None, **kwargs):
+        """
+        `obter(url, headers=..., params=..., **kwargs)` faz a requisição real (ex: sessao.get).
+        Retorna um requests.Response (vindo da rede) ou um RespostaCache.
+        """
+        ttl = self.ttl_para(url)
+        if ttl <= 0:
+            return obter(url, headers=headers, params=params, **kwargs)
+
+        chave = self.chave(url, params)
+        with self._lock:
+            entrada = self._memoria.get(chave)
+        origem = "memoria"
+        if entrada is None:
+            entrada = self._ler_disco(chave)
+            origem = "disco"
+            if entrada is not None:
+                with self._lock:
+                    self._memoria[chave] = entrada
+
+        agora = time.time()
+        if entrada and not forcar and agora - entrada["salvo_em"] < ttl:
+            self._contar("hits" if origem == "memoria" else "hits_disco")
+            return RespostaCache(url, entrada["status"], entrada["conteudo"], entrada["headers"], origem)
+
+        headers_req = dict(headers or {})
+        if entrada and not forcar:
+            if entrada["headers"].get("ETag"):
+                headers_req["If-None-Match"] = entrada["headers"]["ETag"]
+            if entrada["headers"].get("Last-Modified"):
+                headers_req["If-Modified-Since"] = entrada["headers"]["Last-Modified"]
+
+        try:
+            resposta = obter(url, headers=headers_req, params=params, **kwargs)
+        except requests.RequestException:
+            if entrada:
+                self._contar("obsoletos_servidos")
+                return RespostaCache(url, entrada["status"], entrada["conteudo"], entrada["headers"], "obsoleto")
+            raise
+
+        if resposta.status_code == 304 and entrada:
+            self._contar("revalidados")
+            entrada = dict(entrada, salvo_em=agora)
+            self._guardar(chave, entrada)
+            return RespostaCache(url, entrada["status"], entrada["conteudo"], entrada["headers"], "revalidado")
+
+        self._contar("misses")
+        if resposta.status_code == 200:
+            self._guardar(chave, {
+                "chave": chave,
+                "status": 200,
+                "conteudo": resposta.content,
+                "headers": {h: resposta.headers[h] for h in self.CABECALHOS_GUARDADOS if h in resposta.headers},
+                "salvo_em": agora,
+            })
+        return resposta
+
+    def invalidar(self, trecho_url=None):
+        """Descarta as entradas (todas, ou só as cujas URLs contêm `trecho_url`) da memória e do disco."""
+        with self._lock:
+            for chave in [c for c in self._memoria if trecho_url is None or trecho_url in c]:
+                del self._memoria[chave]
+
+        if not self.diretorio:
+            return
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith(".gz"):
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                if trecho_url is not None:
+                    with gzip.open(caminho, "rb") as f:
+                        if trecho_url not in json.loads(f.readline()).get("chave", ""):
+                            continue
+                os.remove(caminho)
+            except (OSError, ValueError):
+                pass
+
+    def metricas(self):
+        with self._lock:
+            dados = dict(self._contadores)
+            dados["entradas"] = len(self._memoria)
+        return dados
@@ -0,0 +1,186 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+
+import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
+
+class BaldeTokens:
+    """Token bucket: até `capacidade` envios de rajada, repostos a `taxa` tokens por segundo."""
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = capacidade
+        self._atualizado = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reservar(self):
+        """Consome um token e devolve quantos segundos é preciso esperar até ele valer (0 = já)."""
+        with self._lock:
+            agora = time.monotonic()
+            self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado) * self.taxa)
+            self._atualizado = agora
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.taxa
+
+class FilaTelegram:
+    """
+    Fila de saída para a API do Telegram, consumida por uma thread em segundo plano.
+
+    - `enfileirar()` retorna na hora (um Future que vira True/False quando a mensagem sai ou desiste).
+    - Respeita o limite global do bot e o limite por chat (token bucket), na ordem de chegada.
+    - 429: espera o `retry_after` informado pelo Telegram e tenta de novo; erro de rede/5xx: backoff curto.
+    - Uma única requests.Session (keep-alive) para todos os envios.
+    - Com `instrumentacao`, registra a latência de cada POST, os status recebidos e o tempo na fila.
+    """
+
+    def __init__(self, token, chat_id_padrao=None, msgs_por_segundo=30, msgs_por_minuto_chat=20,
+                 max_tentativas=5, timeout=15, instrumentacao=None):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage" if token else None
+        self.chat_id_padrao = chat_id_padrao
+        self.max_tentativas = max_tentativas
+        self.timeout = timeout
+        self.instrumentacao = instrumentacao
+        self._msgs_por_minuto_chat = msgs_por_minuto_chat
+
+        self.sessao = requests.Session()
+        self.sessao.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        self._global = BaldeTokens(msgs_por_segundo, msgs_por_segundo)
+        self._por_chat = {}
+        self._fila = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._metricas = {
+            "enfileiradas": 0, "enviadas": 0, "falhas": 0, "retries_429": 0, "retries_rede": 0,
+            "latencia_total_s": 0.0, "latencia_max_s": 0.0, "envio_total_s": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    def _balde_chat(self, chat_id):
+        with self._lock:
+            if chat_id not in self._por_chat:
+                # Rajada de 1: mensagens do mesmo chat saem espaçadas (grupos: 20/min)
+                self._por_chat[chat_id] = BaldeTokens(self._msgs_por_minuto_chat / 60.0, 1)
+            return self._por_chat[chat_id]
+
+    def _cronometrar(self):
+        if self.instrumentacao is None:
+            return nullcontext()
+        return self.instrumentacao.cronometrar("chamada_externa", tipo="telegram", operacao="sendMessage")
+
+    def _somar(self, **valores):
+        with self._lock:
+            for nome, valor in valores.items():
+                self._metricas[nome] += valor
+
+    def _garantir_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._consumir, name="fila-telegram", daemon=True)
+                self._worker.start()
+
+    # ------------------------------------------------------------------
+    def enfileirar(self, texto, chat_id=None, parse_mode="HTML", **extras):
+        """Coloca a mensagem na fila e retorna um Future[bool] imediatamente."""
+        futuro = Future()
+        chat_id = chat_id or self.chat_id_padrao
+        if not self.url or not chat_id:
+            log.error("❌ Telegram sem token ou chat_id configurado. Mensagem descartada.")
+            futuro.set_result(False)
+            return futuro
+
+        payload = {"chat_id": chat_id, "text": texto, "parse_mode": parse_mode, **extras}
+        self._somar(enfileiradas=1)
+        self._fila.put((payload, time.monotonic(), futuro))
+        self._garantir_worker()
+        return futuro
+
+    def aguardar_envios(self, timeout=None):
+        """Bloqueia até a fila esvaziar (ou o timeout). Retorna True se tudo foi processado."""
+        limite = None if timeout is None else time.monotonic() + timeout
+        while self._fila.unfinished_tasks:
+            if limite is not None and time.monotonic() >= limite:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def metricas(self):
+        with self._lock:
+            dados = dict(self._metricas)
+        processadas = dados["enviadas"] + dados["falhas"]
+        dados["profundidade"] = self._fila.qsize()
+        dados["latencia_media_s"] = round(dados["latencia_total_s"] / processadas, 3) if processadas else 0.0
+        dados["envio_medio_s"] = round(dados["envio_total_s"] / processadas, 3) if processadas else 0.0
+        return dados
+
+    # ------------------------------------------------------------------
+    def _consumir(self):
+        while True:
+            payload, enfileirada_em, futuro = self._fila.get()
+            try:
+                ok = self._enviar(payload)
+                latencia = time.monotonic() - enfileirada_em
+                if self.instrumentacao:
+                    self.instrumentacao.observar("telegram_fila_segundos", latencia)
+                with self._lock:
+                    self._metricas["enviadas" if ok else "falhas"] += 1
+                    self._metricas["latencia_total_s"] += latencia
+                    self._metricas["latencia_max_s"] = max(self._metricas["latencia_max_s"], latencia)
+                futuro.set_result(ok)
+            except Exception as e:
+                log.error(f"❌ Erro inesperado na fila do Telegram: {e}")
+                self._somar(falhas=1)
+                futuro.set_result(False)
+            finally:
+                self._fila.task_done()
+
+    def _enviar(self, payload):
+        balde_chat = self._balde_chat(payload["chat_id"])
+        for tentativa in range(1, self.max_tentativas + 1):
+            time.sleep(max(self._global.reservar(), balde_chat.reservar()))
+
+            inicio = time.monotonic()
+            try:
+                with self._cronometrar():
+                    response = self.sessao.post(self.url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                self._somar(retries_rede=1, envio_total_s=time.monotonic() - inicio)
+                log.warning(f"⚠️ Erro de conexão com o Telegram ({e}). Tentativa {tentativa}/{self.max_tentativas}.")
+                time.sleep(min(2 ** tentativa, 30))
+                continue
+            self._somar(envio_total_s=time.monotonic() - inicio)
+            if self.instrumentacao:
+                self.instrumentacao.incrementar("telegram_respostas_total", status=str(response.status_code))
+
+            if response.status_code == 200:
+                log.info("✅ Mensagem entregue ao grupo com sucesso!")
+                return True
+
+            if response.status_code == 429:
+                try:
+                    espera = response.json().get("parameters", {}).get("retry_after", 5)
+                except ValueError:
+                    espera = int(response.headers.get("Retry-After", 5))
+                self._somar(retries_429=1)
+                log.warning(f"⏳ Telegram pediu para aguardar {espera}s (429). Tentativa {tentativa}/{self.max_tentativas}.")
+                time.sleep(espera)
+                continue
+
+            if response.status_code >= 500:
+                log.warning(f"⚠️ Telegram instável (Status {response.status_code}). Tentativa {tentativa}/{self.max_tentativas}.")
+                time.sleep(min(2 ** tentativa, 30))
+                continue
+
+            # 4xx que não é rate limit (HTML inválido, chat errado...): tentar de novo não resolve
+            log.error(f"❌ Falha no Telegram (Status {response.status_code}): {response.text}")
+            return False
+
+        log.error(f"❌ Mensagem descartada após {self.max_tentativas} tentativas.")
+        return False
@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger(__name__)
+
+# Limites (segundos) dos histogramas: de uma query rápida (5 ms) até um job inteiro (5 min)
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+class _Histograma:
+    __slots__ = ("contagens", "soma", "total", "maximo")
+
+    def __init__(self, n_buckets):
+        self.contagens = [0] * (n_buckets + 1)  # o último é o +Inf
+        self.soma = 0.0
+        self.total = 0
+        self.maximo = 0.0
+
+def _chave(nome, rotulos):
+    return nome, tuple(sorted(rotulos.items()))
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _formatar_rotulos(rotulos, extra=None):
+    pares = list(rotulos) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+class Instrumentacao:
+    """
+    Contadores e histogramas de latência em memória, com rótulos (ex: tipo="postgres", tarefa="...").
+
+    - `cronometrar(nome, **rotulos)`: bloco `with` que registra `{nome}_segundos` e, se levantar
+      exceção, soma 1 em `{nome}_erros_total` (a exceção continua subindo).
+    - `medir(nome, **rotulos)`: o mesmo, como decorator.
+    - `exportar_prometheus()` / `instantaneo()`: texto no formato do Prometheus ou dict (JSON).
+    - `servir(porta)`: expõe /metrics e /metrics.json numa thread daemon.
+
+    Cada registro custa um lock e um bisect (poucos microssegundos), dá para deixar ligado em produção.
+    """
+
+    def __init__(self, prefixo="", buckets=BUCKETS_PADRAO):
+        self.prefixo = prefixo
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._histogramas = {}
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = _chave(nome, rotulos)
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def observar(self, nome, valor, **rotulos):
+        chave = _chave(nome, rotulos)
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = _Histograma(len(self.buckets))
+            histograma.contagens[indice] += 1
+            histograma.soma += valor
+            histograma.total += 1
+            if valor > histograma.maximo:
+                histograma.maximo = valor
+
+    @contextmanager
+    def cronometrar(self, nome, **rotulos):
+        inicio = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.incrementar(f"{nome}_erros_total", **rotulos)
+            raise
+        finally:
+            self.observar(f"{nome}_segundos", time.perf_counter() - inicio, **rotulos)
+
+    def medir(self, nome, **rotulos):
+        def decorator(funcao):
+            @wraps(funcao)
+            def envolvida(*args, **kwargs):
+                with self.cronometrar(nome, **rotulos):
+                    return funcao(*args, **kwargs)
+            return envolvida
+        return decorator
+
+    def zerar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    # ------------------------------------------------------------------
+    # Leitura / exportação
+    # ------------------------------------------------------------------
+    def _copiar(self):
+        with self._lock:
+            contadores = dict(self._contadores)
+            histogramas = {
+                chave: (list(h.contagens), h.soma, h.total, h.maximo) for chave, h in self._histogramas.items()
+            }
+        return contadores, histogramas
+
+    def _percentil(self, contagens, total, maximo, fracao):
+        """Estimativa pelo limite superior do bucket (o +Inf usa o máximo observado)."""
+        alvo = fracao * total
+        acumulado = 0
+        for indice, contagem in enumerate(contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(self.buckets[indice], maximo) if indice < len(self.buckets) else maximo
+        return maximo
+
+    def instantaneo(self):
+        """Estado atual em estrutura serializável (JSON)."""
+        contadores, histogramas = self._copiar()
+        return {
+            "contadores": [
+                {"nome": self.prefixo + nome, "rotulos": dict(rotulos), "valor": valor}
+                for (nome, rotulos), valor in sorted(contadores.items())
+            ],
+            "histogramas": [
+                {
+                    "nome": self.prefixo + nome,
+                    "rotulos": dict(rotulos),
+                    "contagem": total,
+                    "soma_s": round(soma, 6),
+                    "media_s": round(soma / total, 6) if total else 0.0,
+                    "max_s": round(maximo, 6),
+                    "p50_s": round(self._percentil(contagens, total, maximo, 0.50), 6),
+                    "p95_s": round(self._percentil(contagens, total, maximo, 0.95), 6),
+                    "p99_s": round(self._percentil(contagens, total, maximo, 0.99), 6),
+                }
+                for (nome, rotulos), (contagens, soma, total, maximo) in sorted(histogramas.items())
+            ],
+        }
+
+    def exportar_prometheus(self):
+        """Texto no formato de exposição do Prometheus (0.0.4)."""
+        contadores, histogramas = self._copiar()
+        linhas = []
+        vistos = set()
+        for (nome, rotulos), valor in sorted(contadores.items()):
+            nome = self.prefixo + nome
+            if nome not in vistos:
+                vistos.add(nome)
+                linhas.append(f"# TYPE {nome} counter")
+            linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {valor}")
+
+        for (nome, rotulos), (contagens, soma, total, _) in sorted(histogramas.items()):
+            nome = self.prefixo + nome
+            if nome not in vistos:
+                vistos.add(nome)
+                linhas.append(f"# TYPE {nome} histogram")
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + ("+Inf",), contagens):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos, ('le', limite))} {acumulado}")
+            linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {soma}")
+            linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {total}")
+        return "\n".join(linhas) + "\n"
+
+    def resumo(self):
+        """Uma linha por histograma, para log no fim de um job."""
+        linhas = []
+        for h in self.instantaneo()["histogramas"]:
+            rotulos = ",".join(f"{k}={v}" for k, v in h["rotulos"].items())
+            linhas.append(
+                f"{h['nome']}[{rotulos}] n={h['contagem']} total={h['soma_s']:.3f}s "
+                f"média={h['media_s'] * 1000:.1f}ms p95≤{h['p95_s'] * 1000:.0f}ms máx={h['max_s'] * 1000:.1f}ms"
+            )
+        return "\n".join(linhas)
+
+    def gravar(self, caminho):
+        """Grava o texto do Prometheus em arquivo (ex: textfile collector do node_exporter)."""
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(self.exportar_prometheus())
+        os.replace(temporario, caminho)
+
+    def servir(self, porta, host="127.0.0.1"):
+        """
+        Sobe um servidor HTTP (thread daemon) com /metrics (Prometheus) e /metrics.json.
+        Sem autenticação: por padrão só escuta na própria máquina; abrir para a rede é explícito (host).
+        """
+        instrumentacao = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    corpo = json.dumps(instrumentacao.instantaneo(), ensure_ascii=False).encode("utf-8")
+                    tipo = "application/json; charset=utf-8"
+                elif self.path.startswith("/metrics"):
+                    corpo = instrumentacao.exportar_prometheus().encode("utf-8")
+                    tipo = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass  # sem uma linha de log por scrape
+
+        servidor = ThreadingHTTPServer((host, porta), _Handler)
+        servidor.daemon_threads = True
+        threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+        log.info(f"📈 Métricas em http://{host}:{servidor.server_address[1]}/metrics (e /metrics.json)")
+        return servidor
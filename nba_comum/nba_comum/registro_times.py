@@ -0,0 +1,84 @@
+import re
+from typing import NamedTuple
+
+class Time(NamedTuple):
+    nba_id: int          # TEAM_ID da NBA API (stats.nba.com)
+    espn_id: str         # id do time na ESPN
+    sigla: str           # sigla da NBA (canônica)
+    sigla_espn: str
+    nome: str            # TEAM_NAME da NBA API
+    apelido: str         # shortDisplayName da ESPN
+    nomes: tuple         # todas as variantes de nome conhecidas (inclui nome, apelido e displayName da ESPN)
+
+# (nba_id, espn_id, sigla, sigla_espn, nome NBA API, apelido, outras variantes)
+_TIMES = [
+    (1610612737, "1", "ATL", "ATL", "Atlanta Hawks", "Hawks", ()),
+    (1610612738, "2", "BOS", "BOS", "Boston Celtics", "Celtics", ()),
+    (1610612740, "3", "NOP", "NO", "New Orleans Pelicans", "Pelicans", ()),
+    (1610612741, "4", "CHI", "CHI", "Chicago Bulls", "Bulls", ()),
+    (1610612739, "5", "CLE", "CLE", "Cleveland Cavaliers", "Cavaliers", ("Cavs",)),
+    (1610612742, "6", "DAL", "DAL", "Dallas Mavericks", "Mavericks", ("Mavs",)),
+    (1610612743, "7", "DEN", "DEN", "Denver Nuggets", "Nuggets", ()),
+    (1610612765, "8", "DET", "DET", "Detroit Pistons", "Pistons", ()),
+    (1610612744, "9", "GSW", "GS", "Golden State Warriors", "Warriors", ()),
+    (1610612745, "10", "HOU", "HOU", "Houston Rockets", "Rockets", ()),
+    (1610612754, "11", "IND", "IND", "Indiana Pacers", "Pacers", ()),
+    (1610612746, "12", "LAC", "LAC", "LA Clippers", "Clippers", ("L.A. Clippers", "Los Angeles Clippers")),
+    (1610612747, "13", "LAL", "LAL", "Los Angeles Lakers", "Lakers", ("LA Lakers", "L.A. Lakers")),
+    (1610612748, "14", "MIA", "MIA", "Miami Heat", "Heat", ()),
+    (1610612749, "15", "MIL", "MIL", "Milwaukee Bucks", "Bucks", ()),
+    (1610612750, "16", "MIN", "MIN", "Minnesota Timberwolves", "Timberwolves", ("Wolves",)),
+    (1610612751, "17", "BKN", "BKN", "Brooklyn Nets", "Nets", ()),
+    (1610612752, "18", "NYK", "NY", "New York Knicks", "Knicks", ()),
+    (1610612753, "19", "ORL", "ORL", "Orlando Magic", "Magic", ()),
+    (1610612755, "20", "PHI", "PHI", "Philadelphia 76ers", "76ers", ("Sixers", "Philadelphia Sixers")),
+    (1610612756, "21", "PHX", "PHX", "Phoenix Suns", "Suns", ()),
+    (1610612757, "22", "POR", "POR", "Portland Trail Blazers", "Trail Blazers", ("Blazers",)),
+    (1610612758, "23", "SAC", "SAC", "Sacramento Kings", "Kings", ()),
+    (1610612759, "24", "SAS", "SA", "San Antonio Spurs", "Spurs", ()),
+    (1610612760, "25", "OKC", "OKC", "Oklahoma City Thunder", "Thunder", ()),
+    (1610612762, "26", "UTA", "UTAH", "Utah Jazz", "Jazz", ()),
+    (1610612764, "27", "WAS", "WSH", "Washington Wizards", "Wizards", ()),
+    (1610612761, "28", "TOR", "TOR", "Toronto Raptors", "Raptors", ()),
+    (1610612763, "29", "MEM", "MEM", "Memphis Grizzlies", "Grizzlies", ()),
+    (1610612766, "30", "CHA", "CHA", "Charlotte Hornets", "Hornets", ()),
+]
+
+def _normalizar(chave):
+    # "L.A. Clippers" / "la  clippers" / "LA Clippers" -> "la clippers" (pontos caem, espaços colapsam)
+    return re.sub(r"\s+", " ", str(chave).replace(".", "")).strip().casefold()
+
+class RegistroTimes:
+    """
+    Identidade canônica dos 30 times, resolvida em O(1) a partir de qualquer chave conhecida:
+    id da ESPN, id da NBA API, siglas (NBA/ESPN) e todas as variantes de nome.
+    Chave desconhecida retorna None; quem chama decide como reportar.
+    """
+
+    def __init__(self, linhas):
+        self.times = []
+        self._por_chave = {}
+        for nba_id, espn_id, sigla, sigla_espn, nome, apelido, extras in linhas:
+            nomes = tuple(dict.fromkeys((nome, apelido) + tuple(extras)))
+            time = Time(nba_id, espn_id, sigla, sigla_espn, nome, apelido, nomes)
+            self.times.append(time)
+            for chave in (nba_id, espn_id, sigla, sigla_espn) + nomes:
+                self._por_chave[_normalizar(chave)] = time
+
+    def resolver(self, chave):
+        if chave is None:
+            return None
+        return self._por_chave.get(_normalizar(chave))
+
+    def resolver_varios(self, chaves):
+        """Retorna ({chave: Time}, [chaves não resolvidas])."""
+        resolvidos, faltando = {}, []
+        for chave in chaves:
+            time = self.resolver(chave)
+            if time is None:
+                faltando.append(chave)
+            else:
+                resolvidos[chave] = time
+        return resolvidos, faltando
+
+registro_times = RegistroTimes(_TIMES)
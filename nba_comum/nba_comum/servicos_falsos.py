@@ -0,0 +1,376 @@
+# Servidores locais no lugar da ESPN, da NBA API (stats.nba.com) e do Telegram, e um modelo
+# Gemini falso, para os benchmarks de ponta a ponta (bench_e2e). Nada aqui toca serviço real.
+#
+# Cada grupo de rotas tem a sua latência injetada (ms) e as requisições são contadas por rota.
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# ----------------------------------------------------------------------
+# Dados sintéticos
+# ----------------------------------------------------------------------
+def gerar_rodada(times, jogos):
+    """Scoreboard no formato da ESPN com `jogos` partidas (times repetem se passar de 15)."""
+    eventos = []
+    inicio = datetime.now(timezone.utc).replace(hour=23, minute=0, second=0, microsecond=0)
+    for i in range(jogos):
+        casa, fora = times[(2 * i) % len(times)], times[(2 * i + 1) % len(times)]
+        eventos.append({
+            "id": str(401700000 + i),
+            "date": (inicio + timedelta(minutes=30 * (i % 6))).strftime("%Y-%m-%dT%H:%MZ"),
+            "league": {"name": "NBA"},
+            "status": {"type": {"name": "STATUS_SCHEDULED"}},
+            "competitions": [{
+                "competitors": [
+                    {"homeAway": "home", "team": _time_espn(casa)},
+                    {"homeAway": "away", "team": _time_espn(fora)},
+                ],
+                "odds": [{"details": f"{casa.sigla_espn} -{1.5 + i % 8}"}],
+            }],
+        })
+    return {"day": {"date": str(date.today())}, "events": eventos}
+
+def _time_espn(time_):
+    return {"id": time_.espn_id, "displayName": time_.nome, "shortDisplayName": time_.apelido,
+            "abbreviation": time_.sigla_espn}
+
+def gerar_calendario(espn_id, jogos=10, semente=0):
+    """Últimos `jogos` jogos encerrados de um time (só os campos que os bots leem)."""
+    aleatorio = random.Random(f"{espn_id}-{semente}")
+    return {"events": [{
+        "status": {"type": {"completed": True}},
+        "competitions": [{"competitors": [
+            {"team": {"id": espn_id}, "score": {"value": float(aleatorio.randint(95, 130))}},
+            {"team": {"id": "0"}, "score": {"value": float(aleatorio.randint(95, 130))}},
+        ]}],
+    } for _ in range(jogos)]}
+
+def gerar_atletas(times, quantidade, semente=0):
+    """Atletas qualificados no formato do endpoint byathlete (ordenados por pontos)."""
+    aleatorio = random.Random(semente)
+    atletas = []
+    for i in range(quantidade):
+        time_ = times[i % len(times)]
+        atletas.append({
+            "athlete": {"id": str(3000000 + i), "displayName": f"Atleta {i:03d}",
+                        "teamName": time_.apelido, "teamShortName": time_.sigla_espn},
+            "categories": [
+                {"name": "offensive", "totals": [f"{aleatorio.uniform(4, 33):.1f}"] + ["0"] * 5 + [f"{aleatorio.uniform(25, 45):.1f}"]},
+                {"name": "defensive", "totals": [f"{aleatorio.uniform(0, 2.2):.1f}", f"{aleatorio.uniform(0, 3.5):.1f}"]},
+            ],
+        })
+    atletas.sort(key=lambda a: float(a["categories"][0]["totals"][0]), reverse=True)
+    return atletas
+
+def gerar_pagina_lesoes(times, nomes, semente=0):
+    """Página de lesões no formato da ESPN (uma tabela por time) com os jogadores `nomes`."""
+    aleatorio = random.Random(semente)
+    partes = ["<html><head><script>" + "var x=1;" * 5000 + "</script></head><body>"]
+    for t, time_ in enumerate(times):
+        partes.append(f'<div class="Table__Title">{time_.nome}</div><table class="Table"><thead><tr>'
+                      '<th>NAME</th><th>POS</th><th>EST. RETURN DATE</th><th>STATUS</th><th>COMMENT</th>'
+                      '</tr></thead><tbody>')
+        for nome in nomes[t::len(times)]:
+            status = aleatorio.choice(("Out", "Day-To-Day"))
+            partes.append(f'<tr><td><a href="#">{nome}</a></td><td>F</td><td>Dec {aleatorio.randint(1, 28)}</td>'
+                          f'<td><span>{status}</span></td><td>Comentário sobre a lesão.</td></tr>')
+        partes.append("</tbody></table>")
+    partes.append("</body></html>")
+    return "".join(partes)
+
+def gerar_stats_nba(times, semente=0):
+    """Resposta do LeagueDashTeamStats (Advanced) no formato resultSets da NBA API."""
+    aleatorio = random.Random(semente)
+    linhas = [[t.nba_id, t.nome, round(aleatorio.uniform(-10, 10), 1), round(aleatorio.uniform(96, 104), 1),
+               round(aleatorio.uniform(0.5, 0.6), 3)] for t in times]
+    return {"resultSets": [{"name": "LeagueDashTeamStats",
+                            "headers": ["TEAM_ID", "TEAM_NAME", "NET_RATING", "PACE", "EFG_PCT"], "rowSet": linhas}]}
+
+def gerar_gamelog_nba(times, dias=20, semente=0):
+    """Resposta do LeagueGameLog (um jogo a cada 1-3 dias por time) no formato resultSets."""
+    aleatorio = random.Random(semente)
+    linhas = []
+    for t in times:
+        dia = date.today()
+        for _ in range(dias // 2):
+            dia -= timedelta(days=aleatorio.randint(1, 3))
+            linhas.append([t.nba_id, t.sigla, dia.isoformat()])
+    return {"resultSets": [{"name": "LeagueGameLog", "headers": ["TEAM_ID", "TEAM_ABBREVIATION", "GAME_DATE"],
+                            "rowSet": linhas}]}
+
+# ----------------------------------------------------------------------
+# Servidor HTTP falso
+# ----------------------------------------------------------------------
+class ServicosFalsos:
+    """
+    Um ThreadingHTTPServer local que responde como ESPN, NBA API e Telegram.
+
+    `latencias_ms`: {'espn': 30, 'nba_stats': 200, 'telegram': 40} (atraso antes de cada resposta).
+    `contagens()`: requisições atendidas por rota desde o início (ou desde `zerar_contagens()`).
+    """
+
+    def __init__(self, times, jogos=15, atletas=460, lesionados=120, latencias_ms=None, por_pagina_max=50):
+        self.times = list(times)
+        self.latencias_ms = dict(latencias_ms or {})
+        self.por_pagina_max = por_pagina_max
+        self.rodada = gerar_rodada(self.times, jogos)
+        self.atletas = gerar_atletas(self.times, atletas)
+        nomes_lesionados = [a["athlete"]["displayName"] for a in self.atletas[::max(1, atletas // max(lesionados, 1))]][:lesionados]
+        self.pagina_lesoes = gerar_pagina_lesoes(self.times, nomes_lesionados).encode("utf-8")
+        self.stats_nba = gerar_stats_nba(self.times)
+        self.gamelog_nba = gerar_gamelog_nba(self.times)
+        self.mensagens_telegram = []
+        self._lock = threading.Lock()
+        self._contagens = {}
+        self._servidor = None
+
+    # --------------------------------------------------------------
+    def _contar(self, rota):
+        with self._lock:
+            self._contagens[rota] = self._contagens.get(rota, 0) + 1
+
+    def contagens(self):
+        with self._lock:
+            return dict(self._contagens)
+
+    def zerar_contagens(self):
+        with self._lock:
+            self._contagens.clear()
+            self.mensagens_telegram.clear()
+
+    def _responder(self, caminho, consulta, corpo):
+        """Retorna (grupo de latência, rota, status, content-type, bytes)."""
+        if caminho.endswith("/scoreboard"):
+            return "espn", "espn_scoreboard", 200, "application/json", json.dumps(self.rodada).encode()
+        if caminho.endswith("/schedule"):
+            espn_id = caminho.rstrip("/").split("/")[-2]
+            return "espn", "espn_schedule", 200, "application/json", json.dumps(gerar_calendario(espn_id)).encode()
+        if caminho.endswith("/statistics/byathlete"):
+            limite = min(int(consulta.get("limit", ["50"])[0]), self.por_pagina_max)
+            pagina = int(consulta.get("page", ["1"])[0])
+            total_paginas = -(-len(self.atletas) // limite)
+            dados = {"pagination": {"count": len(self.atletas), "limit": limite, "page": pagina, "pages": total_paginas},
+                     "athletes": self.atletas[(pagina - 1) * limite:pagina * limite]}
+            return "espn", "espn_byathlete", 200, "application/json", json.dumps(dados).encode()
+        if caminho.endswith("/nba/injuries"):
+            return "espn", "espn_injuries", 200, "text/html; charset=utf-8", self.pagina_lesoes
+        if caminho.endswith("/leaguedashteamstats"):
+            return "nba_stats", "nba_leaguedashteamstats", 200, "application/json", json.dumps(self.stats_nba).encode()
+        if caminho.endswith("/leaguegamelog"):
+            return "nba_stats", "nba_leaguegamelog", 200, "application/json", json.dumps(self.gamelog_nba).encode()
+        if caminho.endswith("/sendMessage"):
+            with self._lock:
+                self.mensagens_telegram.append(json.loads(corpo or b"{}").get("text", ""))
+            return "telegram", "telegram_sendMessage", 200, "application/json", b'{"ok": true, "result": {}}'
+        return None, "desconhecida", 404, "text/plain", b"not found"
+
+    def _handler(self):
+        servicos = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, como os servidores reais
+
+            def _atender(self, corpo=None):
+                partes = urlsplit(self.path)
+                grupo, rota, status, tipo, dados = servicos._responder(partes.path, parse_qs(partes.query), corpo)
+                atraso = servicos.latencias_ms.get(grupo, 0) / 1000
+                if atraso:
+                    time.sleep(atraso)
+                servicos._contar(rota)
+                self.send_response(status)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def do_GET(self):
+                self._atender()
+
+            def do_POST(self):
+                self._atender(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
+
+    def iniciar(self):
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, name="servicos-falsos", daemon=True).start()
+        return self
+
+    def parar(self):
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}"
+
+# ----------------------------------------------------------------------
+# Gemini falso
+# ----------------------------------------------------------------------
+class _RespostaGemini:
+    def __init__(self, texto):
+        self.text = texto
+
+class ModeloGeminiFalso:
+    """Mesmo `generate_content(prompt).text` do google.generativeai, com latência fixa (ms)."""
+
+    def __init__(self, latencia_ms=400):
+        self.latencia_ms = latencia_ms
+        self._lock = threading.Lock()
+        self.chamadas = 0
+
+    def generate_content(self, prompt):
+        time.sleep(self.latencia_ms / 1000)
+        with self._lock:
+            self.chamadas += 1
+        return _RespostaGemini(f"Texto gerado para: {str(prompt)[:40]}")
+
+# ----------------------------------------------------------------------
+# Baselines
+# ----------------------------------------------------------------------
+def comparar_com_baseline(arquivo, cenario, resultado, tolerancia=0.2):
+    """
+    Compara `resultado` ({etapa: {'tempo_s', 'contagens': {...}}}) com o baseline salvo do `cenario`.
+    Tempo acima de (1 + tolerancia) x baseline e qualquer contagem maior contam como regressão.
+    Retorna a lista de regressões (texto); lista vazia se não houver baseline ou tudo estiver ok.
+    """
+    try:
+        with open(arquivo, encoding="utf-8") as f:
+            baseline = json.load(f).get(cenario)
+    except (OSError, ValueError):
+        baseline = None
+    if not baseline:
+        print(f"ℹ️ Sem baseline para '{cenario}' em {arquivo} (use --salvar-baseline).")
+        return []
+
+    regressoes = []
+    for etapa, atual in resultado.items():
+        anterior = baseline["etapas"].get(etapa)
+        if not anterior:
+            continue
+        variacao = atual["tempo_s"] / anterior["tempo_s"] - 1 if anterior["tempo_s"] else 0.0
+        marcador = "⚠️" if variacao > tolerancia else "✅"
+        print(f"   {marcador} {etapa:22s} {anterior['tempo_s']:7.2f}s -> {atual['tempo_s']:7.2f}s ({variacao:+.0%})")
+        if variacao > tolerancia:
+            regressoes.append(f"{etapa}: tempo {variacao:+.0%}")
+        for nome, valor in atual["contagens"].items():
+            valor_anterior = anterior["contagens"].get(nome, 0)
+            if valor > valor_anterior:
+                print(f"   ⚠️ {etapa:22s} {nome}: {valor_anterior} -> {valor}")
+                regressoes.append(f"{etapa}: {nome} {valor_anterior} -> {valor}")
+    return regressoes
+
+def salvar_baseline(arquivo, cenario, resultado):
+    try:
+        with open(arquivo, encoding="utf-8") as f:
+            baselines = json.load(f)
+    except (OSError, ValueError):
+        baselines = {}
+    baselines[cenario] = {"salvo_em": datetime.now().isoformat(timespec="seconds"), "etapas": resultado}
+    os.makedirs(os.path.dirname(arquivo) or ".", exist_ok=True)
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"💾 Baseline '{cenario}' salvo em {arquivo}")
+
+# ----------------------------------------------------------------------
+# Execução dos cenários (mesmo fluxo nos bench_e2e dos dois bots)
+# ----------------------------------------------------------------------
+def contar_chamadas(servicos, instrumentacao, tipos=("postgres",)):
+    """Requisições por rota nos serviços falsos + chamadas externas cronometradas dos `tipos` pedidos."""
+    contagens = {f"http:{rota}": n for rota, n in servicos.contagens().items()}
+    for h in instrumentacao.instantaneo()["histogramas"]:
+        if h["nome"].endswith("chamada_externa_segundos") and h["rotulos"].get("tipo") in tipos:
+            chave = h["rotulos"]["tipo"]
+            contagens[chave] = contagens.get(chave, 0) + h["contagem"]
+    return dict(sorted(contagens.items()))
+
+class FalhaCenario(RuntimeError):
+    """O processo do cenário morreu (ou estourou o tempo) sem devolver resultado."""
+
+def rodar_em_processo(alvo, *argumentos, timeout_s=None):
+    """
+    Roda `alvo(*argumentos, saida)` num processo novo (spawn) e devolve o que ele puser em `saida`.
+    Se o processo morrer antes (exceção no cenário, DSN errado...) ou passar de `timeout_s`, levanta FalhaCenario
+    em vez de ficar esperando a fila para sempre.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    saida = contexto.Queue()
+    processo = contexto.Process(target=alvo, args=(*argumentos, saida))
+    processo.start()
+    limite = None if timeout_s is None else time.monotonic() + timeout_s
+    try:
+        while True:
+            try:
+                resultado = saida.get(timeout=1.0)
+                break
+            except queue.Empty:
+                if not processo.is_alive():
+                    raise FalhaCenario(f"o processo do cenário terminou sem resultado (exit code {processo.exitcode})")
+                if limite is not None and time.monotonic() >= limite:
+                    processo.terminate()
+                    raise FalhaCenario(f"o cenário passou de {timeout_s:.0f}s")
+    finally:
+        processo.join(timeout=10)
+    return resultado
+
+def main_benchmark(descricao, baseline_padrao, rodar_cenario, nome_cenario, adicionar_argumentos):
+    """
+    CLI comum dos bench_e2e: `adicionar_argumentos(parser)` põe as opções do bot, `nome_cenario(args, jogos)`
+    identifica o cenário no baseline e `rodar_cenario(args, jogos, saida)` roda num processo próprio.
+    Sai com código 1 se algum cenário falhar ou regredir em relação ao baseline.
+    """
+    parser = argparse.ArgumentParser(description=descricao)
+    parser.add_argument("--dsn", default=os.getenv("BENCH_DSN"), help="Postgres de benchmark (ou BENCH_DSN)")
+    parser.add_argument("--jogos", type=int, nargs="+", default=[5, 15], help="Tamanhos de rodada")
+    adicionar_argumentos(parser)
+    parser.add_argument("--telegram-por-minuto", type=int, default=6000,
+                        help="Limite por chat da fila (20 = ritmo de produção)")
+    parser.add_argument("--baseline", default=baseline_padrao)
+    parser.add_argument("--salvar-baseline", action="store_true")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--timeout-cenario-s", type=float, default=900, help="Tempo máximo de cada cenário")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("informe --dsn (ou BENCH_DSN) apontando para um Postgres de benchmark")
+
+    regressoes, falhas = [], []
+    for jogos in args.jogos:
+        cenario = nome_cenario(args, jogos)
+        print(f"\n🏁 Cenário {cenario}")
+        try:
+            resultado = rodar_em_processo(rodar_cenario, args, jogos, timeout_s=args.timeout_cenario_s)
+        except FalhaCenario as e:
+            print(f"   ❌ {e}")
+            falhas.append(f"[{cenario}] {e}")
+            continue
+
+        for etapa, r in resultado.items():
+            contagens = " ".join(f"{k}={v}" for k, v in r["contagens"].items())
+            print(f"   {etapa:22s} {r['tempo_s']:7.2f}s | {contagens}")
+
+        regressoes += [f"[{cenario}] {r}" for r in comparar_com_baseline(args.baseline, cenario, resultado, args.tolerancia)]
+        if args.salvar_baseline:
+            salvar_baseline(args.baseline, cenario, resultado)
+
+    if falhas:
+        print("\n❌ Cenários que falharam:\n   " + "\n   ".join(falhas))
+    if regressoes:
+        print("\n❌ Regressões em relação ao baseline:\n   " + "\n   ".join(regressoes))
+    if falhas or regressoes:
+        sys.exit(1)
+    print("\n✅ Benchmark concluído.")
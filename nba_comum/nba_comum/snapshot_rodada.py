@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+
+# Horário de Brasília (sem horário de verão desde 2019)
+FUSO_BRASILIA = timezone(timedelta(hours=-3))
+# A ESPN data a rodada pelo dia nos EUA (Leste): às 00:12 de Brasília ela ainda é a "de ontem"
+FUSO_ESPN = timezone(timedelta(hours=-5))
+
+def _time(competidor):
+    time_espn = competidor.get("team", {})
+    return {
+        "id": str(time_espn.get("id", "")),
+        "nome": time_espn.get("displayName"),
+        "apelido": time_espn.get("shortDisplayName"),
+        "sigla": time_espn.get("abbreviation"),
+    }
+
+def _converter_data(data_bruta):
+    """'2025-12-11T03:00Z' (com ou sem segundos/milissegundos) -> datetime em UTC, ou None."""
+    if not data_bruta:
+        return None
+    try:
+        return datetime.fromisoformat(data_bruta.replace("Z", "+00:00")).astimezone(timezone.utc)
+    except ValueError:
+        return None
+
+def montar_rodada(dados):
+    """Converte o JSON cru do scoreboard da ESPN na estrutura da rodada (uma vez só, para os dois bots)."""
+    jogos = []
+    for evento in dados.get("events", []):
+        competicao = evento["competitions"][0]
+        competidores = competicao["competitors"]
+        mandante = next((c for c in competidores if c.get("homeAway") == "home"), competidores[0])
+        visitante = next((c for c in competidores if c.get("homeAway") == "away"), competidores[-1])
+
+        # Linha completa como a ESPN manda (ex: "LAL -5.5" ou "EVEN"); None se ainda não saiu
+        odds = competicao.get("odds") or [{}]
+        linha = odds[0].get("details")
+
+        data_utc = _converter_data(evento.get("date") or competicao.get("date"))
+        jogos.append({
+            "jogo_id": evento.get("id"),
+            "liga": evento.get("league", {}).get("name", "NBA"),
+            "status": evento.get("status", {}).get("type", {}).get("name"),
+            "data_utc": data_utc.isoformat() if data_utc else evento.get("date"),
+            "data_jogo": data_utc.strftime("%Y-%m-%d %H:%M:%S") if data_utc else evento.get("date"),
+            "horario_brasilia": data_utc.astimezone(FUSO_BRASILIA).strftime("%H:%M") if data_utc else "--:--",
+            "mandante": _time(mandante),
+            "visitante": _time(visitante),
+            "linha": linha,
+        })
+
+    dia = dados.get("day", {}).get("date") or str(date.today())
+    return {"data": dia, "jogos": jogos}
+
+def datas_de_hoje():
+    """Datas que contam como a rodada de hoje: o dia local e o dia da ESPN (podem diferir de madrugada)."""
+    return {str(date.today()), str(datetime.now(FUSO_ESPN).date())}
+
+def _assinatura(rodada):
+    return hashlib.sha1(json.dumps(rodada["jogos"], sort_keys=True).encode("utf-8")).hexdigest()
+
+class SnapshotRodada:
+    """
+    Rodada do dia (jogos, times, ids, horários e linhas) já interpretada e gravada em disco por data.
+
+    `obter_scoreboard(forcar)` baixa o JSON cru (cada bot passa o seu cliente HTTP com cache).
+    Enquanto o snapshot tiver menos de `ttl_s` segundos, nem o scoreboard é consultado.
+    Depois disso, o scoreboard é conferido e o arquivo só é regravado se a rodada mudou.
+    Os dois bots podem apontar para o mesmo `diretorio` e compartilhar a mesma rodada.
+    """
+
+    def __init__(self, obter_scoreboard, diretorio, ttl_s=60):
+        self.obter_scoreboard = obter_scoreboard
+        self.diretorio = diretorio
+        self.ttl_s = ttl_s
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def _ler(self, nome):
+        try:
+            with open(self._caminho(nome), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _gravar(self, nome, conteudo):
+        os.makedirs(self.diretorio, exist_ok=True)
+        temporario = self._caminho(nome) + f".{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(conteudo, f, ensure_ascii=False)
+        os.replace(temporario, self._caminho(nome))
+
+    def carregar(self, forcar=False):
+        """Retorna {'data', 'assinatura', 'atualizado_em', 'origem', 'jogos': [...]}."""
+        atual = self._ler("rodada_atual.json")
+        if atual and not forcar and time.time() - atual.get("conferido_em", 0) < self.ttl_s:
+            return dict(atual, origem="snapshot")
+
+        try:
+            rodada = montar_rodada(self.obter_scoreboard(forcar))
+        except Exception:
+            if atual and atual.get("data") in datas_de_hoje():
+                # Sem ESPN: segue com a última rodada gravada, desde que seja a de hoje
+                return dict(atual, origem="snapshot_antigo")
+            # A rodada gravada é de outro dia: publicar ela como a de hoje seria pior que falhar
+            raise
+
+        agora = time.time()
+        rodada["assinatura"] = _assinatura(rodada)
+        mudou = not atual or atual.get("assinatura") != rodada["assinatura"] or atual.get("data") != rodada["data"]
+        if mudou:
+            rodada["atualizado_em"] = agora
+            self._gravar(f"rodada_{rodada['data']}.json", rodada)
+        else:
+            rodada["atualizado_em"] = atual.get("atualizado_em", agora)
+
+        # O ponteiro da rodada atual guarda também quando o scoreboard foi conferido pela última vez
+        rodada["conferido_em"] = agora
+        self._gravar("rodada_atual.json", rodada)
+        return dict(rodada, origem="atualizado" if mudou else "sem_mudancas")
+
+    def por_data(self, data):
+        """Rodada gravada de uma data específica (AAAA-MM-DD), ou None."""
+        return self._ler(f"rodada_{data}.json")
@@ -0,0 +1,148 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+log = logging.getLogger(__name__)
+
+GRAVAR = "gravar"            # vai à rede e grava cada resposta
+REPRODUZIR = "reproduzir"    # só usa o que foi gravado; requisição sem gravação falha na hora
+MISTO = "misto"              # usa a gravação se houver, senão vai à rede e grava (warm start)
+MODOS = (GRAVAR, REPRODUZIR, MISTO)
+
+# O corpo gravado já vem descomprimido: estes cabeçalhos não valem mais para ele
+_CABECALHOS_DESCARTADOS = {"content-encoding", "transfer-encoding", "content-length", "connection", "set-cookie"}
+# Condicionais não entram na chave: indo à rede para gravar, saem da requisição (senão volta um 304 sem corpo)
+_CABECALHOS_CONDICIONAIS = ("If-None-Match", "If-Modified-Since")
+
+def _gravavel(status):
+    """Só 2xx e 404 (recurso que não existe) viram fixture; 403/429/5xx são do momento e não se repetem."""
+    return 200 <= status < 300 or status == 404
+
+class RespostaNaoGravada(LookupError):
+    """Modo `reproduzir` e não há gravação para a requisição (não cai para a rede nem para cache obsoleto)."""
+
+def chave_requisicao(metodo, url, corpo=None):
+    """'GET https://host/caminho?a=1&b=2' com os parâmetros em ordem (a ordem na URL não importa)."""
+    partes = urlsplit(url)
+    consulta = urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True)))
+    chave = f"{metodo.upper()} {partes.scheme}://{partes.netloc}{partes.path}" + (f"?{consulta}" if consulta else "")
+    if corpo:
+        corpo = corpo if isinstance(corpo, bytes) else str(corpo).encode("utf-8")
+        chave += f" #{hashlib.sha1(corpo).hexdigest()[:12]}"
+    return chave
+
+class TransporteGravado(HTTPAdapter):
+    """
+    Adaptador do requests que grava e reproduz respostas HTTP (montado na Session com `sessao.mount`).
+
+    Cada resposta vira um arquivo gzip em `diretorio` (uma linha JSON com status/cabeçalhos + o corpo),
+    identificado pelo método, URL e parâmetros ordenados (cabeçalhos como ETag não entram na chave).
+    Reproduzir não abre conexão nenhuma: lê o arquivo (uma vez; depois fica em memória) e monta a Response.
+    Aceita os mesmos argumentos do HTTPAdapter (pool, max_retries) para o caminho que vai à rede.
+    """
+
+    def __init__(self, diretorio, modo=REPRODUZIR, **kwargs):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de transporte inválido: {modo!r} (use {', '.join(MODOS)})")
+        super().__init__(**kwargs)
+        self.diretorio = diretorio
+        self.modo = modo
+        os.makedirs(diretorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._memoria = {}
+        self._contadores = {"reproduzidas": 0, "gravadas": 0, "faltando": 0, "nao_gravadas": 0}
+
+    def _arquivo(self, chave):
+        host = urlsplit(chave.split(" ", 1)[1]).netloc.replace(":", "_")
+        return os.path.join(self.diretorio, f"{host}_{hashlib.sha1(chave.encode('utf-8')).hexdigest()}.json.gz")
+
+    def _contar(self, nome):
+        with self._lock:
+            self._contadores[nome] += 1
+
+    def _ler(self, chave):
+        with self._lock:
+            if chave in self._memoria:
+                return self._memoria[chave]
+        try:
+            with gzip.open(self._arquivo(chave), "rb") as f:
+                meta, corpo = f.read().split(b"\n", 1)
+        except OSError:
+            return None
+        gravacao = dict(json.loads(meta), corpo=corpo)
+        with self._lock:
+            self._memoria[chave] = gravacao
+        return gravacao
+
+    def _gravar(self, chave, resposta):
+        gravacao = {
+            "chave": chave,
+            "status": resposta.status_code,
+            "motivo": resposta.reason,
+            "headers": {k: v for k, v in resposta.headers.items() if k.lower() not in _CABECALHOS_DESCARTADOS},
+        }
+        arquivo = self._arquivo(chave)
+        temporario = f"{arquivo}.{os.getpid()}.tmp"
+        with gzip.open(temporario, "wb") as f:
+            f.write(json.dumps(gravacao).encode("utf-8") + b"\n" + resposta.content)
+        os.replace(temporario, arquivo)
+        with self._lock:
+            self._memoria[chave] = dict(gravacao, corpo=resposta.content)
+        self._contar("gravadas")
+
+    @staticmethod
+    def _montar_resposta(requisicao, gravacao):
+        resposta = requests.Response()
+        resposta.status_code = gravacao["status"]
+        resposta.reason = gravacao.get("motivo")
+        resposta.headers = CaseInsensitiveDict(gravacao["headers"])
+        resposta.encoding = get_encoding_from_headers(resposta.headers)
+        resposta._content = gravacao["corpo"]
+        resposta.url = requisicao.url
+        resposta.request = requisicao
+        resposta.origem = "gravacao"
+        return resposta
+
+    def send(self, request, **kwargs):
+        chave = chave_requisicao(request.method, request.url, request.body)
+
+        if self.modo != GRAVAR:
+            gravacao = self._ler(chave)
+            if gravacao is not None:
+                self._contar("reproduzidas")
+                return self._montar_resposta(request, gravacao)
+            if self.modo == REPRODUZIR:
+                self._contar("faltando")
+                raise RespostaNaoGravada(f"Sem gravação para {chave} em {self.diretorio}")
+
+        if any(c in request.headers for c in _CABECALHOS_CONDICIONAIS):
+            request = request.copy()
+            for cabecalho in _CABECALHOS_CONDICIONAIS:
+                request.headers.pop(cabecalho, None)
+        resposta = super().send(request, **kwargs)
+        if _gravavel(resposta.status_code):
+            self._gravar(chave, resposta)
+        else:
+            self._contar("nao_gravadas")
+        return resposta
+
+    def metricas(self):
+        with self._lock:
+            return dict(self._contadores, em_memoria=len(self._memoria))
+
+def transporte_do_ambiente(modo, diretorio, **kwargs):
+    """TransporteGravado se `modo` foi configurado (HTTP_TRANSPORTE), senão None (rede normal)."""
+    if not modo:
+        return None
+    diretorio = diretorio or "fixtures_http"
+    log.info(f"📼 Transporte HTTP em modo '{modo}' (fixtures em {diretorio}).")
+    return TransporteGravado(diretorio, modo, **kwargs)
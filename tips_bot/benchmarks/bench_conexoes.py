@@ -0,0 +1,80 @@
+# Conta conexões abertas numa carga de banco equivalente à Fase 2 (choques + blacklist).
+# Uso (dentro de tips_bot/): python -m benchmarks.bench_conexoes --jogos 15
+#
+# Compara o caminho antigo (um psycopg2.connect por query) com o pool compartilhado.
+# Só faz SELECTs: pode rodar contra o banco de produção sem alterar nada.
+
+import argparse
+import time
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from database.database_manager import DB_CONFIG, buscar_dados, metricas_pool
+
+# Mesmo mix de queries que job_fase_2_final dispara por jogo
+QUERIES_POR_TIME = [
+    ("SELECT COUNT(*) as total FROM league_defensive_rankings WHERE team = %s AND rank_position <= 8", "time"),
+    ("SELECT COUNT(*) as total FROM league_offensive_rankings WHERE team = %s AND rank_position <= 5", "time"),
+    ("SELECT player_name, avg_points FROM league_offensive_rankings WHERE team = %s ORDER BY rank_position ASC LIMIT 10", "time"),
+    ("SELECT player_name, avg_steals, avg_blocks FROM league_defensive_rankings WHERE team = %s ORDER BY rank_position ASC LIMIT 10", "time"),
+    ("SELECT 1 FROM injuries WHERE player_name ILIKE %s LIMIT 1", "jogador"),
+]
+
+def buscar_dados_sem_pool(sql, params=None):
+    """Réplica do buscar_dados antigo: abre uma conexão nova a cada chamada."""
+    with psycopg2.connect(**DB_CONFIG) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(sql, params)
+            resultado = cur.fetchall()
+    conn.close()
+    return resultado
+
+def simular_fase_2(buscar, times, jogadores):
+    consultas = 0
+    for time_nome in times:
+        for sql, tipo in QUERIES_POR_TIME:
+            if tipo == "time":
+                buscar(sql, (time_nome,))
+                consultas += 1
+            else:
+                for jogador in jogadores.get(time_nome, []):
+                    buscar(sql, (jogador,))
+                    consultas += 1
+    return consultas
+
+def main():
+    parser = argparse.ArgumentParser(description="Conexões abertas por job (com e sem pool)")
+    parser.add_argument("--jogos", type=int, default=15)
+    args = parser.parse_args()
+
+    linhas = buscar_dados(
+        "SELECT team, player_name FROM league_offensive_rankings ORDER BY team, rank_position"
+    )
+    jogadores = {}
+    for linha in linhas:
+        jogadores.setdefault(linha["team"], []).append(linha["player_name"])
+    times = list(jogadores)[: args.jogos * 2]
+    if not times:
+        print("⚠️ league_offensive_rankings vazia: rode o refresh antes do benchmark.")
+        return
+
+    print(f"🏁 Simulando a carga de banco da Fase 2 para {len(times) // 2} jogos...\n")
+
+    inicio = time.perf_counter()
+    consultas = simular_fase_2(buscar_dados_sem_pool, times, jogadores)
+    t_sem_pool = time.perf_counter() - inicio
+    print(f"❌ Sem pool: {consultas} queries | {consultas} conexões abertas | {t_sem_pool:.3f}s")
+
+    inicio = time.perf_counter()
+    consultas = simular_fase_2(buscar_dados, times, jogadores)
+    t_com_pool = time.perf_counter() - inicio
+    depois = metricas_pool()
+    # O pool já estava aquecido pela consulta inicial: conta todas as conexões do processo
+    print(f"✅ Com pool: {consultas} queries | {depois['conexoes_abertas']} conexões abertas | {t_com_pool:.3f}s")
+
+    print(f"\n📊 Métricas do pool: {depois}")
+    print(f"🚀 Ganho: {t_sem_pool / t_com_pool:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# Benchmark de ponta a ponta do tips_bot com ESPN, Telegram e Gemini falsos (nba_comum/servicos_falsos.py)
+# e um Postgres local. Roda realizar_upsert_nba, job_fase_1_tarde e job_fase_2_final como em produção.
+#
+# Uso (dentro de tips_bot/):
+#   python -m benchmarks.bench_e2e --dsn postgresql://postgres@localhost/bench --jogos 5 15
+#   python -m benchmarks.bench_e2e --dsn ... --latencia-espn-ms 80 --latencia-gemini-ms 900 --salvar-baseline
+#
+# As tabelas são criadas no schema `bench_e2e` (recriado a cada cenário; search_path só com ele),
+# então o banco pode ser o mesmo de desenvolvimento sem tocar nas tabelas reais.
+# Cada cenário roda num processo novo (spawn): caches, pool e métricas começam do zero.
+# Com baseline salvo, tempo acima da tolerância ou contagem maior (queries, requisições) é regressão (exit 1).
+# Cenário que morre sem resultado (ex: --dsn inacessível) também dá exit 1, sem travar o processo pai.
+
+import os
+import tempfile
+import time
+
+from nba_comum.servicos_falsos import ServicosFalsos, ModeloGeminiFalso, contar_chamadas, main_benchmark
+
+SCHEMA = "bench_e2e"
+BASELINE_PADRAO = os.path.join(os.path.dirname(__file__), "baseline_e2e.json")
+
+SQL_TABELAS = f"""
+    DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+    CREATE SCHEMA {SCHEMA};
+    CREATE TABLE injuries (player_name TEXT PRIMARY KEY, status TEXT, details TEXT);
+    CREATE TABLE league_offensive_rankings (
+        player_id TEXT, player_name TEXT PRIMARY KEY, team TEXT, team_abbreviation TEXT,
+        avg_points NUMERIC, three_point_pct NUMERIC, rank_position INT, last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE league_defensive_rankings (
+        player_id TEXT, player_name TEXT PRIMARY KEY, team TEXT, team_abbreviation TEXT,
+        avg_steals NUMERIC, avg_blocks NUMERIC, rank_position INT, last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE team_top_scorers (team_id TEXT, player_name TEXT, last_3_avg NUMERIC);
+"""
+
+def _preparar_ambiente(args, servicos, pasta):
+    """Aponta o bot para os serviços falsos e o schema de benchmark. Roda ANTES de importar o bot."""
+    os.environ.update({
+        "RODADA_DIR": os.path.join(pasta, "rodadas"),
+        "CACHE_HTTP_DIR": "",
+        "TELEGRAM_BOT_TOKEN": "bench",
+        "TELEGRAM_CHAT_ID": "-1",
+        "TELEGRAM_MSGS_POR_MINUTO_CHAT": str(args.telegram_por_minuto),
+    })
+
+    from psycopg2.extensions import parse_dsn
+    from database.database_manager import DB_CONFIG
+    DB_CONFIG.clear()
+    DB_CONFIG.update(parse_dsn(args.dsn), options=f"-c search_path={SCHEMA}")
+
+    import endpoints.api_handler as api
+    base = servicos.url
+    api.URL_SCOREBOARD = f"{base}/apis/site/v2/sports/basketball/nba/scoreboard"
+    api.URL_TEAM_BASE = f"{base}/apis/site/v2/sports/basketball/nba/teams"
+    api.URL_SCRAPE_INJURIES = f"{base}/nba/injuries"
+    api.URL_BY_ATHLETE = (f"{base}/apis/common/v3/sports/basketball/nba/statistics/byathlete"
+                          "?isqualified=true&limit={limite}&page={pagina}&sort=offensive.avgPoints:desc")
+
+    import notifier_telegram
+    notifier_telegram.fila_telegram.url = f"{base}/botbench/sendMessage"
+
+    import tips.content_creator as content_creator
+    content_creator.model = ModeloGeminiFalso(args.latencia_gemini_ms)
+
+def _criar_tabelas(servicos):
+    from database.database_manager import executar_query, carregar_via_staging
+    if not executar_query(SQL_TABELAS):
+        raise RuntimeError("Não foi possível criar o schema de benchmark (confira o --dsn).")
+    # Cestinha de cada time (tabela alimentada fora do bot em produção)
+    cestinhas = {}
+    for atleta in servicos.atletas:
+        sigla = atleta["athlete"]["teamShortName"]
+        cestinhas.setdefault(sigla, atleta)
+    linhas = [
+        (next(t.espn_id for t in servicos.times if t.sigla_espn == sigla), a["athlete"]["displayName"],
+         float(a["categories"][0]["totals"][0]))
+        for sigla, a in cestinhas.items()
+    ]
+    carregar_via_staging("team_top_scorers", ("team_id", "player_name", "last_3_avg"), linhas,
+                         ["INSERT INTO team_top_scorers SELECT * FROM {staging}"])
+
+def _rodar_cenario(args, jogos, saida):
+    from nba_comum.registro_times import registro_times
+    latencias = {"espn": args.latencia_espn_ms, "telegram": args.latencia_telegram_ms}
+    servicos = ServicosFalsos(registro_times.times, jogos=jogos, atletas=args.atletas,
+                              lesionados=args.lesionados, latencias_ms=latencias).iniciar()
+    with tempfile.TemporaryDirectory() as pasta:
+        _preparar_ambiente(args, servicos, pasta)
+        _criar_tabelas(servicos)
+
+        import main
+        from endpoints.instrumentacao import instrumentacao
+        from notifier_telegram import fila_telegram
+
+        def fase_1():
+            main.job_fase_1_tarde()
+            fila_telegram.aguardar_envios(timeout=300)
+
+        etapas = [("realizar_upsert_nba", main.realizar_upsert_nba),
+                  ("job_fase_1_tarde", fase_1),
+                  ("job_fase_2_final", main.job_fase_2_final)]
+        resultado = {}
+        for nome, etapa in etapas:
+            servicos.zerar_contagens()
+            instrumentacao.zerar()
+            inicio = time.perf_counter()
+            etapa()
+            resultado[nome] = {"tempo_s": round(time.perf_counter() - inicio, 3),
+                               "contagens": contar_chamadas(servicos, instrumentacao, ("postgres", "gemini"))}
+    servicos.parar()
+    saida.put(resultado)
+
+def _argumentos(parser):
+    parser.add_argument("--atletas", type=int, default=460)
+    parser.add_argument("--lesionados", type=int, default=120)
+    parser.add_argument("--latencia-espn-ms", type=int, default=40)
+    parser.add_argument("--latencia-gemini-ms", type=int, default=400)
+    parser.add_argument("--latencia-telegram-ms", type=int, default=40)
+
+def _nome_cenario(args, jogos):
+    return (f"jogos={jogos},atletas={args.atletas},lesionados={args.lesionados},"
+            f"lat={args.latencia_espn_ms}/{args.latencia_gemini_ms}/{args.latencia_telegram_ms}")
+
+def main():
+    main_benchmark("Benchmark de ponta a ponta do tips_bot (serviços falsos)", BASELINE_PADRAO,
+                   _rodar_cenario, _nome_cenario, _argumentos)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Tempo de inicialização de cada comando do cli.py (processo novo até o comando estar pronto para rodar),
+# comparado com o import antigo (main + SDK do Gemini) que qualquer script avulso pagava.
+#
+# Uso (dentro de tips_bot/):
+#   python -m benchmarks.bench_inicio --repeticoes 7
+#
+# Cada medição é um processo novo com `--apenas-carregar` (nada vai para a rede, banco ou Telegram).
+# "parede" inclui subir o interpretador; "cli" é o que o próprio comando mede (imports + configuração).
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PASTA_BOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMANDOS = ("selftest", "refresh", "phase1", "phase2", "loop")
+
+def _rodar(argv):
+    inicio = time.perf_counter()
+    saida = subprocess.run([sys.executable, *argv], cwd=PASTA_BOT, capture_output=True, text=True, check=True)
+    parede = time.perf_counter() - inicio
+    linha = saida.stdout.strip().splitlines()[-1] if saida.stdout.strip() else "{}"
+    return parede, json.loads(linha)
+
+def _medir(argv, repeticoes):
+    _rodar(argv)  # aquece o cache de disco e os .pyc
+    paredes, internos, modulos = [], [], 0
+    for _ in range(repeticoes):
+        parede, dados = _rodar(argv)
+        paredes.append(parede * 1000)
+        if "inicializacao_ms" in dados:
+            internos.append(dados["inicializacao_ms"])
+        modulos = dados.get("modulos", modulos)
+    return statistics.median(paredes), (statistics.median(internos) if internos else None), modulos
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização dos comandos do tips_bot")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--comandos", nargs="+", default=list(COMANDOS), choices=COMANDOS)
+    args = parser.parse_args()
+
+    # Antes, importar content_creator (via main) já importava o SDK do Gemini e configurava o modelo
+    referencia = ("import main + Gemini", ["-c", "import sys, json, main, google.generativeai; "
+                                                 "print(json.dumps({'modulos': len(sys.modules)}))"])
+    casos = [referencia] + [(f"cli.py {c}", ["cli.py", c, "--apenas-carregar"]) for c in args.comandos]
+
+    print(f"{'caso':24s} {'parede':>10s} {'cli':>10s} {'módulos':>8s}")
+    for nome, argv in casos:
+        parede, interno, modulos = _medir(argv, args.repeticoes)
+        cli = f"{interno:8.0f}ms" if interno is not None else f"{'-':>10s}"
+        print(f"{nome:24s} {parede:8.0f}ms {cli} {modulos:8d}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Compara o parser de lesões antigo (pd.read_html + iterrows) com o parser por eventos (extrair_lesoes).
+# Uso (dentro de tips_bot/): python -m benchmarks.bench_lesoes --paginas salvas/injuries_*.html
+#
+# Sem --paginas, usa uma página sintética no formato da ESPN (30 tabelas, ~4 lesões por time).
+# Cada caminho roda num processo novo (spawn), então a memória medida inclui o import do pandas
+# no caminho antigo. Pico de memória: tracemalloc (objetos Python, por rodada) e RSS máximo do processo.
+
+import argparse
+import glob
+import multiprocessing
+import resource
+import time
+import tracemalloc
+
+def pagina_sintetica(times=30, por_time=4):
+    partes = ["<html><head><script>" + "var x=1;" * 20000 + "</script></head><body>"]
+    for t in range(times):
+        partes.append(f'<div class="Table__Title">Time {t}</div><table class="Table"><thead><tr class="Table__TR">'
+                      '<th class="Table__TH">NAME</th><th class="Table__TH">POS</th>'
+                      '<th class="Table__TH">EST. RETURN DATE</th><th class="Table__TH">STATUS</th>'
+                      '<th class="Table__TH">COMMENT</th></tr></thead><tbody class="Table__TBODY">')
+        for j in range(por_time):
+            partes.append(f'<tr class="Table__TR"><td class="col-name Table__TD"><a href="/nba/player/{t}{j}">'
+                          f'Jogador {t}-{j}</a></td><td class="col-pos Table__TD">F</td>'
+                          f'<td class="col-date Table__TD">Dec {j + 1}</td><td class="col-stat Table__TD">'
+                          f'<span class="TextStatus">{"Out" if j % 2 else "Day-To-Day"}</span></td>'
+                          f'<td class="col-desc Table__TD">' + "Comentário longo sobre a lesão. " * 8 + '</td></tr>')
+        partes.append("</tbody></table>")
+    partes.append("</body></html>")
+    return "".join(partes)
+
+def _via_pandas(html):
+    """Réplica do caminho antigo de get_all_injured_players."""
+    from io import StringIO
+    import pandas as pd
+    lista = []
+    for df in pd.read_html(StringIO(html)):
+        df.columns = [str(c).upper() for c in df.columns]
+        if 'NAME' in df.columns and 'STATUS' in df.columns:
+            for _, row in df.iterrows():
+                lista.append({
+                    "player_name": str(row['NAME']).strip(),
+                    "status": str(row['STATUS']).strip(),
+                    "details": (str(row['DATE']) if 'DATE' in df.columns else '').strip(),
+                })
+    return lista
+
+def _via_eventos(html):
+    from endpoints.parser_lesoes import extrair_lesoes
+    return list(extrair_lesoes(html[i:i + 65536] for i in range(0, len(html), 65536)))
+
+def _medir(caminho, paginas, repeticoes, saida):
+    funcao = _via_pandas if caminho == "pandas" else _via_eventos
+    funcao(paginas[0])  # aquecimento (inclui os imports)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        registros = [funcao(p) for p in paginas]
+    tempo = (time.perf_counter() - inicio) / repeticoes
+
+    # Memória medida numa rodada à parte (o tracemalloc deixa tudo mais lento)
+    tracemalloc.start()
+    for p in paginas:
+        funcao(p)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    saida.put({
+        "tempo_ms": tempo * 1000,
+        "pico_python_mb": pico / 1e6,
+        "rss_max_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "registros": sum(len(r) for r in registros),
+        "nomes": [x["player_name"] for r in registros for x in r],
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do parser de lesões")
+    parser.add_argument("--paginas", nargs="*", help="Arquivos HTML salvos de https://www.espn.com/nba/injuries")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    arquivos = [a for padrao in (args.paginas or []) for a in glob.glob(padrao)]
+    paginas = [open(a, encoding="utf-8").read() for a in arquivos] or [pagina_sintetica()]
+    print(f"🕵️ {len(paginas)} página(s), {sum(len(p) for p in paginas) / 1e3:.0f} KB no total, {args.repeticoes} repetições")
+
+    contexto = multiprocessing.get_context("spawn")
+    resultados = {}
+    for caminho in ("pandas", "eventos"):
+        fila = contexto.Queue()
+        processo = contexto.Process(target=_medir, args=(caminho, paginas, args.repeticoes, fila))
+        processo.start()
+        resultados[caminho] = fila.get()
+        processo.join()
+
+    for caminho, r in resultados.items():
+        print(f"   {caminho:8s}: {r['tempo_ms']:7.1f} ms/rodada | pico Python {r['pico_python_mb']:6.1f} MB | "
+              f"RSS máx {r['rss_max_mb']:6.1f} MB | {r['registros']} registros")
+
+    p, e = resultados["pandas"], resultados["eventos"]
+    print(f"   Ganho: {p['tempo_ms'] / e['tempo_ms']:.1f}x mais rápido, RSS {p['rss_max_mb'] - e['rss_max_mb']:.0f} MB menor")
+    iguais = p["nomes"] == e["nomes"]
+    print(f"{'✅' if iguais else '❌'} Mesmos jogadores nos dois caminhos: {'sim' if iguais else 'NÃO'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Custo de log.info para quem loga (a thread do job), no log síncrono antigo (basicConfig com FileHandler +
+# StreamHandler) e no assíncrono (endpoints/logs_bot.py), com e sem o limitador por linha.
+#
+# Uso (dentro de tips_bot/):
+#   python -m benchmarks.bench_logs --registros 20000
+#   python -m benchmarks.bench_logs --atraso-escrita-ms 2    # simula disco/console lento
+#
+# Cada caso roda num processo novo (spawn), com o console redirecionado para um arquivo temporário.
+# "produtor" é o tempo do laço que loga; "até gravar" inclui esperar a fila esvaziar.
+
+import argparse
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+CASOS = ("sincrono", "fila", "fila+limitador")
+
+class _ArquivoLento(logging.FileHandler):
+    atraso_s = 0.0
+
+    def emit(self, record):
+        if self.atraso_s:
+            time.sleep(self.atraso_s)
+        super().emit(record)
+
+def _medir(caso, args, pasta, saida):
+    sys.stderr = open(os.path.join(pasta, f"console_{caso}.txt"), "w", encoding="utf-8")
+    _ArquivoLento.atraso_s = args.atraso_escrita_ms / 1000
+    arquivo = os.path.join(pasta, f"{caso}.log")
+
+    if caso == "sincrono":
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                            handlers=[_ArquivoLento(arquivo, encoding="utf-8"), logging.StreamHandler()])
+    else:
+        from endpoints import logs_bot
+        # Mesma config do bot, com o arquivo trocado pelo lento (o listener só é criado depois)
+        original = logging.handlers.TimedRotatingFileHandler
+        logs_bot.TimedRotatingFileHandler = lambda caminho, **kw: _ArquivoLento(arquivo, encoding="utf-8")
+        logs_bot.configurar_logs(pasta, limite_por_linha=20 if caso == "fila+limitador" else 0)
+        logs_bot.TimedRotatingFileHandler = original
+    log = logging.getLogger("TipsBot")
+
+    inicio = time.perf_counter()
+    for i in range(args.registros):
+        log.info(f"📤 Notificação enfileirada para o Telegram... ({i})")
+    produtor = time.perf_counter() - inicio
+    if caso != "sincrono":
+        logs_bot._listener.stop()
+    total = time.perf_counter() - inicio
+    with open(arquivo, encoding="utf-8") as f:
+        linhas = sum(1 for _ in f)
+    saida.put({"produtor_s": produtor, "total_s": total, "linhas": linhas})
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo do log para o produtor: síncrono x fila")
+    parser.add_argument("--registros", type=int, default=20000)
+    parser.add_argument("--atraso-escrita-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    if args.atraso_escrita_ms:
+        args.registros = min(args.registros, 2000)
+
+    contexto = multiprocessing.get_context("spawn")
+    print(f"{args.registros} registros, atraso de escrita {args.atraso_escrita_ms} ms\n")
+    print(f"{'caso':16s} {'produtor':>10s} {'µs/log':>8s} {'até gravar':>11s} {'linhas':>7s}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for caso in CASOS:
+            fila = contexto.Queue()
+            processo = contexto.Process(target=_medir, args=(caso, args, pasta, fila))
+            processo.start()
+            r = fila.get()
+            processo.join()
+            print(f"{caso:16s} {r['produtor_s']:9.3f}s {r['produtor_s'] / args.registros * 1e6:8.1f} "
+                  f"{r['total_s']:10.3f}s {r['linhas']:7d}")
+
+if __name__ == "__main__":
+    main()
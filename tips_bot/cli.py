@@ -0,0 +1,164 @@
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+
+# Marcado antes de qualquer import do bot: o tempo de inicialização de cada comando conta daqui
+_INICIO = time.perf_counter()
+
+# Cada comando importa só o que usa, dentro da própria função. O SDK do Gemini só é importado
+# no primeiro prompt (content_creator.obter_modelo), então refresh e selftest nunca pagam por ele.
+#
+# Uso (dentro de tips_bot/):
+#   python cli.py refresh       -> atualização de dados (lesões + rankings) e sai
+#   python cli.py phase1        -> FASE 1 (agenda + status news) e sai quando o Telegram entregar tudo
+#   python cli.py phase2        -> FASE 2 (choques + bilhetes) e sai
+#   python cli.py loop          -> agendador 24/7 (o mesmo que `python main.py`)
+#   python cli.py selftest      -> confere .env, banco e dependências sem enviar nada
+#   python cli.py <comando> --apenas-carregar   -> só importa/configura, mostra o tempo (JSON) e sai
+
+TIMEOUT_ENTREGA_S = 300
+
+def _pronto(args, comando):
+    """Registra o tempo desde o início do processo até o comando estar pronto para rodar."""
+    from database.database_manager import log
+    from endpoints.instrumentacao import instrumentacao
+
+    segundos = time.perf_counter() - _INICIO
+    instrumentacao.observar("inicializacao_segundos", segundos, comando=comando)
+    if args.apenas_carregar:
+        print(json.dumps({"comando": comando, "inicializacao_ms": round(segundos * 1000, 1),
+                          "modulos": len(sys.modules)}))
+        return False
+    log.info(f"⏱️ [CLI] '{comando}' pronto em {segundos * 1000:.0f} ms ({len(sys.modules)} módulos carregados)")
+    return True
+
+def _finalizar(fila_telegram=None):
+    from database.database_manager import log
+    from endpoints.instrumentacao import instrumentacao
+
+    if fila_telegram is not None and not fila_telegram.aguardar_envios(timeout=TIMEOUT_ENTREGA_S):
+        log.warning(f"⚠️ Fila do Telegram não esvaziou em {TIMEOUT_ENTREGA_S}s: {fila_telegram.metricas()}")
+    log.info(f"📈 [MÉTRICAS]\n{instrumentacao.resumo()}")
+
+# ==============================================================================
+# COMANDOS
+# ==============================================================================
+
+def cmd_refresh(args):
+    from tips.data_refresher import realizar_upsert_nba
+    if not _pronto(args, "refresh"):
+        return 0
+    realizar_upsert_nba()
+    _finalizar()
+    return 0
+
+def cmd_phase1(args):
+    import main
+    from notifier_telegram import fila_telegram
+    if not _pronto(args, "phase1"):
+        return 0
+    main.job_fase_1_tarde()
+    _finalizar(fila_telegram)
+    return 0
+
+def cmd_phase2(args):
+    import main
+    from notifier_telegram import fila_telegram
+    if not _pronto(args, "phase2"):
+        return 0
+    main.job_fase_2_final()
+    _finalizar(fila_telegram)
+    return 0
+
+def cmd_loop(args):
+    import main
+    if not _pronto(args, "loop"):
+        return 0
+    main.main_loop_control()
+    return 0
+
+def _checar(nome, funcao):
+    from database.database_manager import log
+    inicio = time.perf_counter()
+    try:
+        ok, detalhe = funcao()
+    except Exception as e:
+        ok, detalhe = False, f"{type(e).__name__}: {e}"
+    ms = (time.perf_counter() - inicio) * 1000
+    (log.info if ok else log.error)(f"{'✅' if ok else '❌'} [SELFTEST] {nome}: {detalhe} ({ms:.0f} ms)")
+    return ok
+
+def cmd_selftest(args):
+    from database.database_manager import DB_CONFIG, buscar_dados
+    if not _pronto(args, "selftest"):
+        return 0
+
+    def configuracao():
+        chaves = ("DB_HOST", "DB_NAME", "DB_USER", "TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID", "GEMINI_API_KEY")
+        faltando = [c for c in chaves if not os.getenv(c)]
+        return not faltando, f"faltando no .env: {', '.join(faltando)}" if faltando else "variáveis presentes"
+
+    def banco():
+        linhas = buscar_dados("SELECT current_database() AS banco, version() AS versao")
+        if not linhas:
+            return False, f"sem conexão com {DB_CONFIG.get('host')}/{DB_CONFIG.get('database')}"
+        return True, f"{linhas[0]['banco']} | {linhas[0]['versao'].split(',')[0]}"
+
+    def tabelas():
+        esperadas = ("injuries", "league_offensive_rankings", "league_defensive_rankings", "team_top_scorers")
+        linhas = buscar_dados("SELECT to_regclass(t) IS NOT NULL AS existe, t AS tabela FROM unnest(%s) AS t",
+                              (list(esperadas),))
+        faltando = [l["tabela"] for l in linhas if not l["existe"]]
+        if not linhas or faltando:
+            return False, f"tabelas ausentes: {', '.join(faltando or esperadas)}"
+        return True, f"{len(esperadas)} tabelas encontradas"
+
+    def sdk_gemini():
+        # Só localiza o pacote (sem importar): o import de verdade fica para o primeiro prompt
+        instalado = importlib.util.find_spec("google.generativeai") is not None
+        return instalado, "google-generativeai instalado" if instalado else "google-generativeai não instalado"
+
+    checagens = [("Configuração", configuracao), ("Banco", banco), ("Tabelas", tabelas), ("SDK do Gemini", sdk_gemini)]
+    if args.rede:
+        def espn():
+            from endpoints.api_handler import URL_SCOREBOARD, cliente_http
+            # Direto no cliente (get_scoreboard engole o erro e devolve [], igual a um dia sem jogos)
+            jogos = cliente_http.get_json(URL_SCOREBOARD, timeout=15, forcar=True).get("events", [])
+            return True, f"scoreboard respondeu ({len(jogos)} jogos hoje)"
+        checagens.append(("ESPN", espn))
+
+    falhas = [nome for nome, funcao in checagens if not _checar(nome, funcao)]
+    return 1 if falhas else 0
+
+# ==============================================================================
+# ENTRADA
+# ==============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cli.py", description="Tips bot NBA: jobs avulsos, loop 24/7 e autoteste")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    for nome, funcao, ajuda in (
+        ("refresh", cmd_refresh, "Atualiza lesões e rankings no banco e sai"),
+        ("phase1", cmd_phase1, "FASE 1: agenda + status news"),
+        ("phase2", cmd_phase2, "FASE 2: choques de estilo + bilhetes"),
+        ("loop", cmd_loop, "Agendador 24/7 (mesmo que main.py)"),
+        ("selftest", cmd_selftest, "Confere .env, banco e dependências sem enviar nada"),
+    ):
+        sub = comandos.add_parser(nome, help=ajuda)
+        sub.add_argument("--apenas-carregar", action="store_true",
+                         help="Só importa/configura o comando, imprime o tempo de inicialização (JSON) e sai")
+        if nome == "selftest":
+            sub.add_argument("--rede", action="store_true", help="Também consulta o scoreboard da ESPN")
+        sub.set_defaults(funcao=funcao)
+
+    args = parser.parse_args(argv)
+    # Logs do comando saem marcados com job=<comando> e um id de execução (no loop, cada tarefa ganha o seu)
+    from endpoints.logs_bot import contexto_log
+    with contexto_log(args.comando):
+        return args.funcao(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,32 @@
-import psycopg2
 from psycopg2.extras import RealDictCursor
 import logging
 import os
 import math
+import numbers
+import io
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from datetime import datetime
+from database.pool_conexoes import PoolConexoes
+from endpoints.instrumentacao import instrumentacao
+from endpoints.logs_bot import configurar_logs
 
 # 📂 CONFIGURAÇÃO DE LOGS
+LOG_DIR_PADRAO = r"C:\Inteligencia_bots\tips_bot\log" if os.name == "nt" else os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "log"
+)
+
 def setup_bot_logs():
-    log_dir = r"C:\Inteligencia_bots\tips_bot\log"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    log_file = os.path.join(log_dir, f"bot_log_{datetime.now().strftime('%Y-%m-%d')}.log")
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s [%(levelname)s] %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
+    # LOG_DIR no ambiente troca a pasta. A escrita (console + arquivo rotacionado à meia-noite)
+    # roda numa thread própria: log.info em laço quente só enfileira (endpoints/logs_bot.py)
+    configurar_logs(os.getenv("LOG_DIR") or LOG_DIR_PADRAO)
     return logging.getLogger("TipsBot")
 
+# .env carregado antes dos logs (LOG_DIR pode vir de lá)
+load_dotenv()
 log = setup_bot_logs()
 
 # 🔐 CONEXÃO COM POSTGRESQL (Dados do seu .env)
-load_dotenv()
 DB_CONFIG = {
     "host": os.getenv("DB_HOST"),
     "database": os.getenv("DB_NAME"),
@@ -35,27 +35,183 @@ DB_CONFIG = {
     "port": os.getenv("DB_PORT")
 }
 
+# ♻️ POOL DE CONEXÕES (único por processo, criado no primeiro uso)
+_pool = None
+_pool_lock = threading.Lock()
+_transacao_local = threading.local()
+
+class ErroTransacao(Exception):
+    """Alguma query dentro de um bloco `transacao()` falhou; nada foi gravado."""
+
+def obter_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolConexoes(
+                    DB_CONFIG,
+                    minimo=int(os.getenv("DB_POOL_MIN", 1)),
+                    maximo=int(os.getenv("DB_POOL_MAX", 5)),
+                    idade_maxima=float(os.getenv("DB_POOL_IDADE_MAXIMA", 1800)),
+                    checar_apos_ocioso=float(os.getenv("DB_POOL_CHECAR_OCIOSO", 30)),
+                    espera_maxima=float(os.getenv("DB_POOL_ESPERA_MAXIMA", 30)),
+                )
+                log.info(f"♻️ Pool de conexões criado (min {_pool.minimo} / max {_pool.maximo}).")
+    return _pool
+
+def metricas_pool():
+    return obter_pool().metricas()
+
+@contextmanager
+def transacao():
+    """
+    Faz várias chamadas de executar_query/buscar_dados compartilharem a mesma conexão e transação.
+    Commit no fim do bloco; se qualquer query falhar, faz rollback de tudo e levanta ErroTransacao.
+    Blocos aninhados participam da transação mais externa.
+    """
+    if getattr(_transacao_local, "conn", None) is not None:
+        yield _transacao_local.conn
+        return
+
+    pool = obter_pool()
+    conn = pool.obter()
+    _transacao_local.conn = conn
+    _transacao_local.falhou = False
+    descartar = False
+    try:
+        yield conn
+        if _transacao_local.falhou:
+            raise ErroTransacao("Uma ou mais queries falharam dentro da transação.")
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            descartar = True
+        raise
+    finally:
+        _transacao_local.conn = None
+        pool.devolver(conn, descartar=descartar)
+
+@contextmanager
+def _conexao_atual():
+    """Usa a conexão da transação em andamento ou pega uma emprestada do pool."""
+    conn = getattr(_transacao_local, "conn", None)
+    if conn is not None:
+        yield conn, False
+        return
+    with obter_pool().conexao() as conn:
+        yield conn, True
+
 def executar_query(sql, params=None):
     try:
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with instrumentacao.cronometrar("chamada_externa", tipo="postgres", operacao="executar"), \
+                _conexao_atual() as (conn, autonoma):
             with conn.cursor() as cur:
                 cur.execute(sql, params)
+            if autonoma:
                 conn.commit()
-                return True
+            return True
     except Exception as e:
         log.error(f"Erro ao executar query: {e}")
+        if getattr(_transacao_local, "conn", None) is not None:
+            _transacao_local.falhou = True
         return False
 
 def buscar_dados(sql, params=None):
     try:
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with instrumentacao.cronometrar("chamada_externa", tipo="postgres", operacao="buscar"), \
+                _conexao_atual() as (conn, _):
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(sql, params)
                 return cur.fetchall()
     except Exception as e:
         log.error(f"Erro ao buscar dados: {e}")
+        if getattr(_transacao_local, "conn", None) is not None:
+            _transacao_local.falhou = True
         return []
 
+def _campo_csv(valor):
+    """
+    Campo para o COPY em CSV: None vira \\N sem aspas (o marcador de NULL), número vai sem aspas
+    e todo o resto vai entre aspas (então texto vazio continua '' e o texto "\\N" não vira NULL).
+    """
+    if valor is None:
+        return r"\N"
+    if isinstance(valor, numbers.Number):
+        return str(valor)
+    return '"' + str(valor).replace('"', '""') + '"'
+
+def carregar_via_staging(tabela, colunas, linhas, comandos):
+    """
+    Carga em massa: envia `linhas` via COPY para uma tabela temporária com as `colunas` de `tabela`
+    e executa `comandos` (SQL com o marcador {staging}) na MESMA transação.
+    Quem lê a tabela real só enxerga o resultado depois do commit (nunca um estado parcial).
+
+    Retorna uma lista com o resultado de cada comando (linhas do RETURNING ou rowcount), ou None se falhar.
+    """
+    # Sempre no schema temporário da sessão: nunca esbarra (nem dá DROP) numa tabela real com o mesmo nome
+    staging = f"pg_temp.stg_{tabela}"
+    lista_colunas = ", ".join(colunas)
+
+    buffer = io.StringIO()
+    buffer.writelines(",".join(map(_campo_csv, linha)) + "\n" for linha in linhas)
+    buffer.seek(0)
+
+    try:
+        with instrumentacao.cronometrar("chamada_externa", tipo="postgres", operacao=f"carga_{tabela}"), \
+                transacao() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {staging}")
+                cur.execute(
+                    f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                    f"SELECT {lista_colunas} FROM {tabela} WITH NO DATA"
+                )
+                cur.copy_expert(
+                    f"COPY {staging} ({lista_colunas}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+                )
+
+                resultados = []
+                for comando in comandos:
+                    cur.execute(comando.format(staging=staging))
+                    resultados.append(cur.fetchall() if cur.description else cur.rowcount)
+        return resultados
+    except Exception as e:
+        log.error(f"Erro na carga em massa de '{tabela}': {e}")
+        return None
+
+# 🏷️ VERSÕES DE SNAPSHOT (cada carga publica um contador; caches em memória só recarregam se ele mudar)
+SQL_TABELA_VERSOES = """
+    CREATE TABLE IF NOT EXISTS snapshot_versions (
+        dataset TEXT PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+_tabela_versoes_ok = False
+
+def sql_publicar_versao(dataset, somente_se=None):
+    """
+    SQL que incrementa a versão de `dataset` (para rodar dentro da transação da carga).
+    Com `somente_se` (um SELECT), só publica se ele retornar alguma linha; senão o RETURNING vem vazio.
+    """
+    condicao = f"WHERE EXISTS ({somente_se})" if somente_se else ""
+    return f"""
+        INSERT INTO snapshot_versions (dataset, version) SELECT '{dataset}', 1 {condicao}
+        ON CONFLICT (dataset) DO UPDATE SET
+            version = snapshot_versions.version + 1,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING version;
+    """
+
+def ler_versao_snapshot(dataset):
+    """Versão atual publicada para `dataset` (None se nunca foi publicada)."""
+    global _tabela_versoes_ok
+    if not _tabela_versoes_ok:
+        _tabela_versoes_ok = executar_query(SQL_TABELA_VERSOES)
+    res = buscar_dados("SELECT version FROM snapshot_versions WHERE dataset = %s", (dataset,))
+    return res[0]['version'] if res else None
+
 def calcular_palpite_par(media):
     """
     Aplica a lógica de arredondamento e segurança:
@@ -0,0 +1,208 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+class PoolEsgotado(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo máximo de espera."""
+
+class PoolConexoes:
+    """
+    Pool de conexões PostgreSQL compartilhado pelo processo inteiro (thread-safe).
+
+    - Abre no máximo `maximo` conexões; quem pede além disso espera na fila.
+    - Mantém `minimo` conexões aquecidas desde o primeiro uso.
+    - Health check: conexão ociosa há mais de `checar_apos_ocioso` segundos faz um SELECT 1 antes de ser entregue.
+    - Reciclagem: conexão mais velha que `idade_maxima` segundos é fechada e reaberta.
+    """
+
+    def __init__(self, config, minimo=1, maximo=10, idade_maxima=1800, checar_apos_ocioso=30, espera_maxima=30):
+        self._config = config
+        self.minimo = max(0, int(minimo))
+        self.maximo = max(1, int(maximo))
+        self.idade_maxima = idade_maxima
+        self.checar_apos_ocioso = checar_apos_ocioso
+        self.espera_maxima = espera_maxima
+
+        self._cond = threading.Condition()
+        self._livres = []          # [(conn, devolvida_em)]
+        self._criada_em = {}       # id(conn) -> timestamp de abertura
+        self._total = 0            # conexões existentes (livres + em uso)
+        self._em_uso = 0
+        self._aquecido = False
+
+        self._metricas = {
+            "conexoes_abertas": 0,
+            "checkouts": 0,
+            "esperas": 0,
+            "tempo_espera_total_s": 0.0,
+            "pico_em_uso": 0,
+            "reciclagens": 0,
+            "falhas_health_check": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Abertura / validação
+    # ------------------------------------------------------------------
+    def _abrir(self):
+        conn = psycopg2.connect(**self._config)
+        self._criada_em[id(conn)] = time.monotonic()
+        with self._cond:
+            self._metricas["conexoes_abertas"] += 1
+        return conn
+
+    def _fechar(self, conn):
+        self._criada_em.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _aquecer(self):
+        """Abre as `minimo` conexões iniciais (uma vez só)."""
+        with self._cond:
+            if self._aquecido:
+                return
+            self._aquecido = True
+            faltam = max(0, self.minimo - self._total)
+            self._total += faltam
+
+        for abertas in range(faltam):
+            try:
+                conn = self._abrir()
+            except Exception:
+                # Libera as vagas reservadas que não viraram conexão e deixa o próximo obter() tentar de novo
+                with self._cond:
+                    self._total -= faltam - abertas
+                    self._aquecido = False
+                    self._cond.notify_all()
+                raise
+            with self._cond:
+                self._livres.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def _validar(self, conn, devolvida_em):
+        """Devolve uma conexão utilizável: recicla as velhas e testa as que ficaram ociosas."""
+        agora = time.monotonic()
+
+        if conn.closed:
+            self._fechar(conn)
+            return self._abrir()
+
+        if agora - self._criada_em.get(id(conn), agora) > self.idade_maxima:
+            self._fechar(conn)
+            with self._cond:
+                self._metricas["reciclagens"] += 1
+            return self._abrir()
+
+        if agora - devolvida_em > self.checar_apos_ocioso:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except Exception:
+                with self._cond:
+                    self._metricas["falhas_health_check"] += 1
+                self._fechar(conn)
+                return self._abrir()
+
+        return conn
+
+    # ------------------------------------------------------------------
+    # Checkout / devolução
+    # ------------------------------------------------------------------
+    def obter(self):
+        self._aquecer()
+
+        inicio = time.monotonic()
+        esperou = False
+        item = None
+
+        with self._cond:
+            while True:
+                if self._livres:
+                    item = self._livres.pop()
+                    break
+                if self._total < self.maximo:
+                    self._total += 1
+                    break
+
+                restante = self.espera_maxima - (time.monotonic() - inicio)
+                if restante <= 0:
+                    raise PoolEsgotado(f"Pool esgotado ({self.maximo} conexões em uso) após {self.espera_maxima}s.")
+                esperou = True
+                self._cond.wait(restante)
+
+            self._em_uso += 1
+            self._metricas["checkouts"] += 1
+            self._metricas["pico_em_uso"] = max(self._metricas["pico_em_uso"], self._em_uso)
+            if esperou:
+                self._metricas["esperas"] += 1
+                self._metricas["tempo_espera_total_s"] += time.monotonic() - inicio
+
+        try:
+            if item is None:
+                return self._abrir()
+            return self._validar(*item)
+        except Exception:
+            with self._cond:
+                self._em_uso -= 1
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+    def devolver(self, conn, descartar=False):
+        """Devolve a conexão ao pool, sempre limpa (sem transação aberta)."""
+        if not descartar and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                descartar = True
+
+        if descartar or conn.closed:
+            self._fechar(conn)
+            with self._cond:
+                self._em_uso -= 1
+                self._total -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._em_uso -= 1
+            self._livres.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def conexao(self):
+        conn = self.obter()
+        descartar = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # Conexão possivelmente quebrada: não volta para o pool
+            descartar = True
+            raise
+        finally:
+            self.devolver(conn, descartar=descartar)
+
+    # ------------------------------------------------------------------
+    # Observabilidade / encerramento
+    # ------------------------------------------------------------------
+    def metricas(self):
+        with self._cond:
+            dados = dict(self._metricas)
+            dados["em_uso"] = self._em_uso
+            dados["livres"] = len(self._livres)
+            dados["total"] = self._total
+        return dados
+
+    def fechar_todas(self):
+        with self._cond:
+            livres, self._livres = self._livres, []
+            self._total -= len(livres)
+            self._aquecido = False
+        for conn, _ in livres:
+            self._fechar(conn)
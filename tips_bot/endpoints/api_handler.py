@@ -1,38 +1,73 @@
-import requests
-import pandas as pd
-from io import StringIO
+import os
 from database.database_manager import log
+from endpoints.http_client import cliente_http
+from nba_comum.snapshot_rodada import SnapshotRodada
+from endpoints.parser_lesoes import extrair_lesoes
 
 # Endpoints e URLs
-URL_BY_ATHLETE = "https://site.web.api.espn.com/apis/common/v3/sports/basketball/nba/statistics/byathlete?isqualified=true&limit=50&sort=offensive.avgPoints:desc"
+URL_BY_ATHLETE = "https://site.web.api.espn.com/apis/common/v3/sports/basketball/nba/statistics/byathlete?isqualified=true&limit={limite}&page={pagina}&sort=offensive.avgPoints:desc"
 URL_SCOREBOARD = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
 URL_TEAM_BASE = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/teams"
 URL_SCRAPE_INJURIES = "https://www.espn.com/nba/injuries"
 
+# Atletas por página do ranking (a liga inteira tem 450+ qualificados)
+RANKINGS_POR_PAGINA = int(os.getenv("RANKINGS_POR_PAGINA", 50))
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
-def get_league_rankings():
-    """Busca os 50 melhores atletas da liga (API)."""
+def get_league_rankings(por_pagina=RANKINGS_POR_PAGINA):
+    """
+    Busca TODOS os atletas qualificados da liga (API paginada).
+    A 1ª página informa o total de páginas; as demais vêm em paralelo.
+    Se qualquer página falhar, retorna [] (melhor manter o ranking anterior do que gravar um pela metade).
+    """
     try:
-        response = requests.get(URL_BY_ATHLETE, timeout=15)
-        response.raise_for_status()
-        return response.json().get('athletes', [])
+        primeira = cliente_http.get_json(URL_BY_ATHLETE.format(limite=por_pagina, pagina=1), timeout=15)
     except Exception as e:
         log.error(f"Erro na API Rankings: {e}")
         return []
 
-def get_scoreboard():
-    """Busca os jogos do dia (API)."""
+    total_paginas = primeira.get('pagination', {}).get('pages', 1)
+    urls = [URL_BY_ATHLETE.format(limite=por_pagina, pagina=p) for p in range(2, total_paginas + 1)]
+    paginas = [primeira] + cliente_http.get_json_varios(urls, timeout=15)
+
+    atletas = {}
+    for numero, pagina in enumerate(paginas, start=1):
+        if isinstance(pagina, Exception):
+            log.error(f"Erro na API Rankings (página {numero}/{total_paginas}): {pagina}")
+            return []
+        # Se as estatísticas mudarem no meio da paginação um atleta pode repetir entre páginas
+        for item in pagina.get('athletes', []):
+            atletas.setdefault(item.get('athlete', {}).get('id'), item)
+
+    log.info(f"📊 Rankings: {len(atletas)} atletas em {total_paginas} página(s).")
+    return list(atletas.values())
+
+def get_scoreboard(forcar=False):
+    """Busca os jogos do dia (API). `forcar=True` ignora o cache."""
     try:
-        response = requests.get(URL_SCOREBOARD, timeout=15)
-        response.raise_for_status()
-        return response.json().get('events', [])
+        return cliente_http.get_json(URL_SCOREBOARD, timeout=15, forcar=forcar).get('events', [])
     except Exception as e:
         log.error(f"Erro na API Scoreboard: {e}")
         return []
 
+# Rodada do dia já interpretada, gravada por data (RODADA_DIR pode ser a mesma pasta do handcap_bot)
+snapshot_rodada = SnapshotRodada(
+    lambda forcar: cliente_http.get_json(URL_SCOREBOARD, timeout=15, forcar=forcar),
+    diretorio=os.getenv("RODADA_DIR", "rodadas"),
+    ttl_s=int(os.getenv("RODADA_TTL_S", 60)),
+)
+
+def get_rodada(forcar=False):
+    """Jogos do dia no formato do snapshot (times, ids, horários e linhas já interpretados)."""
+    try:
+        return snapshot_rodada.carregar(forcar=forcar)['jogos']
+    except Exception as e:
+        log.error(f"Erro ao carregar a rodada do dia: {e}")
+        return []
+
 def get_team_schedule(team_id):
     """
     Busca histórico para cálculo de médias dos últimos jogos (API).
@@ -40,48 +75,64 @@ def get_team_schedule(team_id):
     """
     try:
         url = f"{URL_TEAM_BASE}/{team_id}/schedule"
-        response = requests.get(url, timeout=10)
+        response = cliente_http.get(url, timeout=10)
         return response.json().get('events', [])
     except Exception as e:
         log.error(f"Erro na API Schedule {team_id}: {e}")
         return []
 
+def _montar_schedules(team_ids, resultados):
+    schedules = {}
+    for team_id, resultado in zip(team_ids, resultados):
+        if isinstance(resultado, Exception):
+            log.error(f"Erro na API Schedule {team_id}: {resultado}")
+            schedules[team_id] = []
+        else:
+            schedules[team_id] = resultado.get('events', [])
+    return schedules
+
+def get_team_schedules(team_ids, timeout=10):
+    """
+    Busca o calendário de vários times EM PARALELO (ex: os 30 times de uma rodada de 15 jogos).
+    Retorna {team_id: [eventos]}; time com erro volta com lista vazia.
+    """
+    team_ids = list(dict.fromkeys(team_ids))
+    urls = [f"{URL_TEAM_BASE}/{team_id}/schedule" for team_id in team_ids]
+    return _montar_schedules(team_ids, cliente_http.get_json_varios(urls, timeout=timeout))
+
+async def get_team_schedules_async(team_ids, timeout=10):
+    """Mesma coisa que get_team_schedules, para quem roda dentro de um event loop asyncio."""
+    team_ids = list(dict.fromkeys(team_ids))
+    urls = [f"{URL_TEAM_BASE}/{team_id}/schedule" for team_id in team_ids]
+    return _montar_schedules(team_ids, await cliente_http.get_json_varios_async(urls, timeout=timeout))
+
+def _em_pedacos(texto, tamanho=64 * 1024):
+    for inicio in range(0, len(texto), tamanho):
+        yield texto[inicio:inicio + tamanho]
+
+def iter_injured_players():
+    """
+    Gerador com as lesões da página da ESPN, lida em pedaços por um parser de eventos
+    (só as células NAME, STATUS e DATE). Erros de rede/HTTP sobem para quem chamou.
+    """
+    log.info(f"🕵️ Iniciando Scraping de Lesões em: {URL_SCRAPE_INJURIES}")
+    response = cliente_http.get(URL_SCRAPE_INJURIES, headers=HEADERS, timeout=15)
+    response.raise_for_status()
+    yield from extrair_lesoes(_em_pedacos(response.text))
+
 def get_all_injured_players():
     """
     VARREDURA DE LESÕES VIA SCRAPING (FONTE REAL).
     Retorna lista de dicionários: [{'player_name': 'Nikola Jokic', 'status': 'Out', ...}]
     """
-    injured_list = []
     try:
-        log.info(f"🕵️ Iniciando Scraping de Lesões em: {URL_SCRAPE_INJURIES}")
-        response = requests.get(URL_SCRAPE_INJURIES, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        
-        # Leitura das tabelas HTML com Pandas
-        dfs = pd.read_html(StringIO(response.text))
+        injured_list = list(iter_injured_players())
         
-        if not dfs:
+        if not injured_list:
             log.warning("⚠️ Scraping realizado, mas nenhuma tabela encontrada.")
-            return []
-            
-        for df in dfs:
-            # Padroniza colunas para maiúsculo
-            df.columns = [str(c).upper() for c in df.columns]
             
-            if 'NAME' in df.columns and 'STATUS' in df.columns:
-                for _, row in df.iterrows():
-                    raw_name = str(row['NAME'])
-                    status = str(row['STATUS'])
-                    date_val = str(row['DATE']) if 'DATE' in df.columns else ''
-                    
-                    injured_list.append({
-                        "player_name": raw_name.strip(),
-                        "status": status.strip(),
-                        "details": date_val.strip()
-                    })
-                    
         return injured_list
 
     except Exception as e:
         log.error(f"❌ Erro fatal no Scraping de lesões: {e}")
-        return []
\ No newline at end of file
+        return []
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from urllib.parse import urlsplit
+
+from nba_comum.cache_http import CacheHTTP
+from nba_comum.transporte_gravado import transporte_do_ambiente
+
+from endpoints.instrumentacao import instrumentacao
+from endpoints.logs_bot import propagar_contexto
+
+# TTL (segundos) de cada endpoint da ESPN. A primeira regra que casar com a URL vale.
+TTLS_ESPN = [
+    ("/scoreboard", 60),             # placar/rodada do dia muda pouco entre as fases
+    ("/schedule", 30 * 60),          # calendário/placares dos times
+    ("/statistics/byathlete", 15 * 60),
+    ("espn.com/nba/injuries", 10 * 60),
+]
+
+class ClienteHTTP:
+    """
+    Cliente HTTP compartilhado por todos os endpoints.
+    - Uma única requests.Session (keep-alive: reaproveita conexões TCP/TLS com a ESPN).
+    - No máximo `max_simultaneas` requisições em voo, venham de threads ou de asyncio.
+    - APIs em lote que disparam N requisições em paralelo, cada uma com seu timeout.
+    - Cache opcional (TTL + ETag) na frente de todas as chamadas GET.
+    - `modo_transporte` ('gravar', 'reproduzir' ou 'misto'): grava/reproduz as respostas em `dir_fixtures`
+      (ver nba_comum/transporte_gravado.py), para rodar sem rede.
+    """
+
+    def __init__(self, max_simultaneas=8, cache=None, modo_transporte=None, dir_fixtures=None):
+        self.max_simultaneas = max_simultaneas
+        self.cache = cache
+        self.sessao = requests.Session()
+
+        # Retry leve só para erros transitórios do servidor
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=frozenset(["GET"]))
+        opcoes = {"pool_connections": 4, "pool_maxsize": max_simultaneas, "max_retries": retry}
+        self.transporte = transporte_do_ambiente(modo_transporte, dir_fixtures, **opcoes)
+        adaptador = self.transporte or HTTPAdapter(**opcoes)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+
+        self._limite = threading.BoundedSemaphore(max_simultaneas)
+        self._executor = ThreadPoolExecutor(max_workers=max_simultaneas, thread_name_prefix="http")
+
+    def _get_rede(self, url, **kwargs):
+        with self._limite:
+            with instrumentacao.cronometrar("chamada_externa", tipo="http", destino=urlsplit(url).netloc):
+                return self.sessao.get(url, **kwargs)
+
+    def get(self, url, timeout=15, forcar=False, **kwargs):
+        """GET pelo cache (se configurado). `forcar=True` ignora o que estiver guardado."""
+        if self.cache is None:
+            return self._get_rede(url, timeout=timeout, **kwargs)
+        resposta = self.cache.buscar(self._get_rede, url, forcar=forcar, timeout=timeout, **kwargs)
+        instrumentacao.incrementar("http_cache_total", origem=getattr(resposta, "origem", "rede"))
+        return resposta
+
+    def get_json(self, url, timeout=15, **kwargs):
+        response = self.get(url, timeout=timeout, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def get_json_varios(self, urls, timeout=10, **kwargs):
+        """
+        Busca várias URLs em paralelo. Retorna na mesma ordem de `urls`:
+        o JSON de cada uma ou a Exception que ela gerou (uma falha não derruba as outras).
+        """
+        futuros = [self._executor.submit(propagar_contexto(self.get_json), url, timeout, **kwargs) for url in urls]
+        resultados = []
+        for futuro in futuros:
+            try:
+                resultados.append(futuro.result())
+            except Exception as e:
+                resultados.append(e)
+        return resultados
+
+    # ------------------------------------------------------------------
+    # Versões para asyncio (rodam no mesmo pool de threads e na mesma sessão)
+    # ------------------------------------------------------------------
+    async def get_json_async(self, url, timeout=15, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self.get_json, url, timeout, **kwargs))
+
+    async def get_json_varios_async(self, urls, timeout=10, **kwargs):
+        tarefas = [self.get_json_async(url, timeout, **kwargs) for url in urls]
+        return await asyncio.gather(*tarefas, return_exceptions=True)
+
+# 30 = os dois times de cada jogo numa rodada cheia de 15 jogos
+cliente_http = ClienteHTTP(
+    max_simultaneas=int(os.getenv("HTTP_MAX_SIMULTANEAS", 30)),
+    cache=CacheHTTP(TTLS_ESPN, diretorio=os.getenv("CACHE_HTTP_DIR") or None),
+    modo_transporte=os.getenv("HTTP_TRANSPORTE") or None,
+    dir_fixtures=os.getenv("HTTP_FIXTURES_DIR") or None,
+)
@@ -0,0 +1,4 @@
+from nba_comum.instrumentacao import Instrumentacao
+
+# Instância única do processo: todos os módulos registram aqui
+instrumentacao = Instrumentacao(prefixo="tips_bot_")
@@ -0,0 +1,187 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+from endpoints.instrumentacao import instrumentacao
+
+FORMATO_TEXTO = "%(asctime)s [%(levelname)s] %(message)s"
+
+# Job e execução atuais: o agendador (e o cli.py) marcam cada rodada; threads de pool herdam via propagar_contexto
+_job = contextvars.ContextVar("log_job", default=None)
+_execucao = contextvars.ContextVar("log_execucao", default=None)
+
+def novo_id_execucao():
+    return uuid.uuid4().hex[:12]
+
+@contextmanager
+def contexto_log(job, execucao=None):
+    """Todo log emitido dentro do bloco sai com `job` e um id de execução (novo, se não for passado)."""
+    token_job = _job.set(job)
+    token_execucao = _execucao.set(execucao or novo_id_execucao())
+    try:
+        yield _execucao.get()
+    finally:
+        _execucao.reset(token_execucao)
+        _job.reset(token_job)
+
+def propagar_contexto(funcao):
+    """
+    `funcao` presa a uma cópia do contexto atual. Thread nova e worker de pool começam com contexto
+    vazio, então sem isso os logs do Gemini/HTTP/pipeline perderiam o job. Use uma por submit/Thread.
+    """
+    return partial(contextvars.copy_context().run, funcao)
+
+class FiltroContexto(logging.Filter):
+    """Carimba job/execução no registro ainda na thread que logou (depois da fila o contexto é outro)."""
+
+    def filter(self, record):
+        record.job = _job.get()
+        record.execucao = _execucao.get()
+        return True
+
+class LimitadorPorLinha(logging.Filter):
+    """
+    Abaixo de WARNING, cada linha de código (arquivo:linha) emite no máximo `limite` registros por
+    `janela_s`. O excesso é descartado ainda no produtor (não entra na fila nem formata) e o total
+    descartado sai junto do próximo registro liberado daquela linha. Avisos e erros nunca são limitados.
+    """
+
+    def __init__(self, limite=20, janela_s=60.0, nivel_maximo=logging.INFO):
+        super().__init__()
+        self.limite = limite
+        self.janela_s = janela_s
+        self.nivel_maximo = nivel_maximo
+        self._lock = threading.Lock()
+        self._janelas = {}  # (arquivo, linha) -> [inicio, emitidos, suprimidos]
+
+    def filter(self, record):
+        if self.limite <= 0 or record.levelno > self.nivel_maximo:
+            return True
+        chave = (record.pathname, record.lineno)
+        agora = time.monotonic()
+        with self._lock:
+            janela = self._janelas.get(chave)
+            if janela is None or agora - janela[0] >= self.janela_s:
+                suprimidos = janela[2] if janela else 0
+                self._janelas[chave] = [agora, 1, 0]
+            elif janela[1] < self.limite:
+                janela[1] += 1
+                suprimidos = 0
+            else:
+                janela[2] += 1
+                instrumentacao.incrementar("logs_suprimidos_total", nivel=record.levelname)
+                return False
+        if suprimidos:
+            record.suprimidos = suprimidos
+        return True
+
+class FormatadorTexto(logging.Formatter):
+    """Formato de sempre, com [job#execução] quando houver e o total suprimido pelo limitador."""
+
+    def __init__(self):
+        super().__init__(FORMATO_TEXTO)
+
+    def formatMessage(self, record):
+        texto = super().formatMessage(record)
+        job = getattr(record, "job", None)
+        if job:
+            prefixo = f"[{record.levelname}]"
+            texto = texto.replace(prefixo, f"{prefixo} [{job}#{record.execucao}]", 1)
+        suprimidos = getattr(record, "suprimidos", 0)
+        if suprimidos:
+            texto += f" (+{suprimidos} repetições suprimidas)"
+        return texto
+
+# Atributos que todo LogRecord tem: o que sobrar veio de `extra=` e entra no JSON
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "job", "execucao", "suprimidos"
+}
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro (ts, nivel, msg, job, execucao, origem, + campos de `extra=`)."""
+
+    def format(self, record):
+        dados = {
+            "ts": datetime.fromtimestamp(record.created).astimezone().isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "job": getattr(record, "job", None),
+            "execucao": getattr(record, "execucao", None),
+            "thread": record.threadName,
+            "origem": f"{record.module}:{record.lineno}",
+        }
+        if getattr(record, "suprimidos", 0):
+            dados["suprimidos"] = record.suprimidos
+        dados.update({k: v for k, v in vars(record).items() if k not in _ATRIBUTOS_PADRAO})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados["erro"] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+class _ProdutorFila(QueueHandler):
+    def prepare(self, record):
+        # Só resolve a mensagem e o traceback (a formatação de verdade é na thread de escrita)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_listener = None
+_lock_config = threading.Lock()
+
+def configurar_logs(diretorio, arquivo="bot_log.log", formato=None, nivel=None, retencao_dias=None,
+                    limite_por_linha=None, janela_s=None):
+    """
+    Liga o log assíncrono no logger raiz (uma vez por processo; chamadas seguintes não fazem nada).
+
+    Quem loga só enfileira (QueueHandler); uma thread (QueueListener) escreve no console e em
+    `diretorio/arquivo`, que vira `arquivo.AAAA-MM-DD` à meia-noite e guarda `retencao_dias` dias.
+    Config pelo ambiente: LOG_FORMATO (texto|json, só o arquivo), LOG_NIVEL, LOG_RETENCAO_DIAS,
+    LOG_LIMITE_POR_LINHA (0 desliga) e LOG_JANELA_LIMITE_S.
+    """
+    global _listener
+    with _lock_config:
+        if _listener is not None:
+            return
+        formato = formato or os.getenv("LOG_FORMATO", "texto")
+        nivel = nivel or os.getenv("LOG_NIVEL", "INFO")
+        retencao_dias = int(os.getenv("LOG_RETENCAO_DIAS", 14)) if retencao_dias is None else retencao_dias
+        limite_por_linha = int(os.getenv("LOG_LIMITE_POR_LINHA", 20)) if limite_por_linha is None else limite_por_linha
+        janela_s = float(os.getenv("LOG_JANELA_LIMITE_S", 60)) if janela_s is None else janela_s
+
+        os.makedirs(diretorio, exist_ok=True)
+        arquivo_log = TimedRotatingFileHandler(os.path.join(diretorio, arquivo), when="midnight",
+                                               backupCount=retencao_dias, encoding="utf-8", delay=True)
+        arquivo_log.setFormatter(FormatadorJSON() if formato == "json" else FormatadorTexto())
+        console = logging.StreamHandler()
+        console.setFormatter(FormatadorTexto())
+
+        fila = queue.SimpleQueue()
+        produtor = _ProdutorFila(fila)
+        produtor.addFilter(FiltroContexto())
+        produtor.addFilter(LimitadorPorLinha(limite_por_linha, janela_s))
+
+        raiz = logging.getLogger()
+        raiz.setLevel(nivel.upper())
+        raiz.addHandler(produtor)
+
+        _listener = QueueListener(fila, arquivo_log, console)
+        _listener.start()
+        # Esvazia a fila na saída (atexit roda em ordem inversa: antes do logging.shutdown)
+        atexit.register(_listener.stop)
@@ -0,0 +1,93 @@
+import re
+from html.parser import HTMLParser
+
+_ESPACOS = re.compile(r"\s+")
+
+class ParserLesoes(HTMLParser):
+    """
+    Parser por eventos (html.parser, sem DOM) da página de lesões da ESPN.
+
+    Lê o cabeçalho de cada tabela para achar as colunas NAME, STATUS e DATE
+    (ex: "EST. RETURN DATE") e guarda só essas células de cada linha.
+    Pode receber a página em pedaços via feed(); os registros prontos saem em `registros`.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.registros = []
+        self._colunas = None      # {'NAME': i, 'STATUS': j, 'DATE': k} da tabela atual
+        self._cabecalho = None    # textos dos <th> da tabela atual
+        self._celulas = None      # células da linha atual (só as que interessam)
+        self._indice = -1         # índice da célula atual na linha
+        self._texto = None        # pedaços de texto da célula atual (None = célula ignorada)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._colunas, self._cabecalho = None, []
+        elif tag == "tr" and self._cabecalho is not None:
+            self._celulas, self._indice = {}, -1
+        elif tag in ("td", "th") and self._celulas is not None:
+            self._indice += 1
+            cabecalho = tag == "th" and self._colunas is None
+            interessa = self._colunas is not None and self._indice in self._colunas.values()
+            self._texto = [] if cabecalho or interessa else None
+
+    def handle_data(self, data):
+        if self._texto is not None:
+            self._texto.append(data)
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._texto is not None:
+            texto = _ESPACOS.sub(" ", "".join(self._texto)).strip()
+            if tag == "th" and self._colunas is None:
+                self._cabecalho.append(texto.upper())
+            else:
+                self._celulas[self._indice] = texto
+            self._texto = None
+        elif tag == "tr" and self._celulas is not None:
+            self._fechar_linha()
+            self._celulas = None
+        elif tag == "table":
+            self._colunas = self._cabecalho = self._celulas = None
+
+    def _fechar_linha(self):
+        if self._colunas is None:
+            # Primeira linha com <th>: define as colunas da tabela
+            if self._cabecalho:
+                colunas = {}
+                for i, nome in enumerate(self._cabecalho):
+                    if nome in ("NAME", "STATUS"):
+                        colunas[nome] = i
+                    elif nome.endswith("DATE"):
+                        colunas.setdefault("DATE", i)
+                if "NAME" in colunas and "STATUS" in colunas:
+                    self._colunas = colunas
+                else:
+                    # Tabela que não é de lesões: ignora até o fim dela
+                    self._cabecalho = self._celulas = None
+            return
+
+        nome = self._celulas.get(self._colunas["NAME"])
+        if not nome:
+            return
+        self.registros.append({
+            "player_name": nome,
+            "status": self._celulas.get(self._colunas["STATUS"], ""),
+            "details": self._celulas.get(self._colunas.get("DATE"), ""),
+        })
+
+def extrair_lesoes(pedacos):
+    """
+    Gerador: recebe a página em pedaços de texto (ex: response.iter_content(decode_unicode=True))
+    e devolve os registros {'player_name', 'status', 'details'} conforme cada linha termina.
+    """
+    if isinstance(pedacos, str):
+        pedacos = (pedacos,)
+    parser = ParserLesoes()
+    for pedaco in pedacos:
+        parser.feed(pedaco)
+        if parser.registros:
+            yield from parser.registros
+            parser.registros = []
+    parser.close()
+    yield from parser.registros
@@ -1,17 +1,24 @@
-import time
-import schedule
+import os
+from functools import partial
 from datetime import datetime, timedelta
 from database.database_manager import log
 from tips.data_refresher import realizar_upsert_nba
 from tips.content_creator import (
     gerar_agenda_simplificada, 
     gerar_status_news, 
-    preparar_bilhete_free, 
-    gerar_choque_formatado
+    preparar_pedidos_jogo,
+    gerar_mensagens_jogo,
+    novo_executor_ia
 )
-from tips.strategy_processor import analisar_confronto_estilos
-from notifier_telegram import enviar_mensagem_telegram
-from endpoints.api_handler import get_scoreboard
+from tips.strategy_processor import analisar_confronto_estilos, calcular_medias_pontos_equipes
+from tips.indice_lesoes import indice_lesoes
+from tips.feed_lesoes import feed_lesoes, ADICIONADO, STATUS_ALTERADO
+from tips.contexto_rodada import carregar_contexto_rodada
+from tips.pipeline import Pipeline, Estagio
+from tips.agendador import Agendador, RECUPERAR
+from notifier_telegram import enviar_mensagem_telegram, fila_telegram
+from endpoints.api_handler import get_rodada
+from endpoints.instrumentacao import instrumentacao
 
 # ==============================================================================
 # FUNÇÕES AUXILIARES
@@ -19,65 +26,35 @@ from endpoints.api_handler import get_scoreboard
 
 def buscar_jogos_nba():
     """
-    Formata os jogos vindos da API e converte horário para Brasília (UTC-3).
-    BLINDAGEM: Suporta formatos com/sem segundos e milissegundos.
+    Jogos do dia a partir do snapshot da rodada (horário já convertido para Brasília, UTC-3).
     """
     try:
-        eventos = get_scoreboard()
-        if not eventos:
-            return []
-            
-        jogos_formatados = []
-        
-        for e in eventos:
-            horario_formatado = "--:--"
-            date_str = "N/A"
-            
-            # Tratamento de Horário (Conversão UTC -> Brasília)
-            try:
-                # Tenta pegar a data na raiz ou na competição
-                date_str = e.get('date') or e['competitions'][0].get('date')
-                
-                # Lista de formatos possíveis da API da ESPN
-                formatos_possiveis = [
-                    "%Y-%m-%dT%H:%M:%SZ",       # Padrão 1 (Com segundos)
-                    "%Y-%m-%dT%H:%M:%S.%fZ",    # Padrão 2 (Com millis)
-                    "%Y-%m-%dT%H:%MZ"           # Padrão 3 (SEM segundos)
-                ]
-                
-                data_utc = None
-                for fmt in formatos_possiveis:
-                    try:
-                        data_utc = datetime.strptime(date_str, fmt)
-                        break 
-                    except ValueError:
-                        continue 
-                
-                if data_utc:
-                    # Subtrai 3 horas (Fuso Brasília)
-                    data_br = data_utc - timedelta(hours=3)
-                    horario_formatado = data_br.strftime("%H:%M")
-                else:
-                    log.warning(f"⚠️ Formato de data desconhecido recebido da API: {date_str}")
-
-            except Exception as erro_data:
-                log.error(f"Erro ao processar data ({date_str}): {erro_data}")
-                horario_formatado = "--:--"
-
-            jogos_formatados.append({
-                "id_casa": e['competitions'][0]['competitors'][0]['team']['id'],
-                "nome_casa": e['competitions'][0]['competitors'][0]['team']['shortDisplayName'],
-                "id_fora": e['competitions'][0]['competitors'][1]['team']['id'],
-                "nome_fora": e['competitions'][0]['competitors'][1]['team']['shortDisplayName'],
-                "horario": horario_formatado
-            })
-            
-        return jogos_formatados
+        rodada = get_rodada()
+        return [{
+            "id_casa": jogo['mandante']['id'],
+            "nome_casa": jogo['mandante']['apelido'],
+            "id_fora": jogo['visitante']['id'],
+            "nome_fora": jogo['visitante']['apelido'],
+            "horario": jogo['horario_brasilia']
+        } for jogo in rodada]
 
     except Exception as e:
         log.error(f"Erro ao buscar jogos: {e}")
         return []
 
+def alertar_baixas_de_ultima_hora(mudancas):
+    """
+    Assinante do feed de lesões: jogador que passou para 'Out' vira alerta no Telegram, tanto quem
+    já estava na lista (ex: Day-To-Day -> Out) quanto quem entrou direto como Out (o corte mais comum).
+    Ligado com ALERTA_LESOES=1.
+    """
+    baixas = [m for m in mudancas
+              if m.tipo in (ADICIONADO, STATUS_ALTERADO) and (m.status or "").upper() == "OUT"]
+    if not baixas:
+        return
+    linhas = "\n".join(f"• <b>{m.player_name}</b>: {m.status_anterior or 'fora da lista'} ➡️ {m.status}" for m in baixas)
+    enviar_mensagem_telegram(f"🚨 <b>BAIXAS DE ÚLTIMA HORA</b>\n\n{linhas}")
+
 # ==============================================================================
 # TAREFAS AGENDADAS (JOBS)
 # ==============================================================================
@@ -98,13 +75,19 @@ def job_fase_1_tarde():
         log.info("✅ [FIM] FASE 1 finalizada (sem jogos). Voltando ao loop...")
         return
 
+    # Blacklist em memória: só recarrega se houve refresh novo desde o último job
+    indice_lesoes.sincronizar()
+
     # 1. Envia Agenda
     try:
+        # O espaçamento entre mensagens fica a cargo da fila do Telegram
         enviar_mensagem_telegram(gerar_agenda_simplificada(jogos))
-        time.sleep(3) 
         
-        # 2. Envia Status News
-        enviar_mensagem_telegram(gerar_status_news(jogos))
+        # 2. Envia Status News (rankings de todos os times lidos de uma vez)
+        contexto = carregar_contexto_rodada(jogos)
+        with novo_executor_ia() as executor:
+            status_news = gerar_status_news(jogos, contexto, executor)
+        enviar_mensagem_telegram(status_news)
         
         # LOG DE CONCLUSÃO ADICIONADO
         log.info("✅ [FIM] FASE 1 concluída com sucesso. Aguardando próximo agendamento...")
@@ -112,6 +95,26 @@ def job_fase_1_tarde():
     except Exception as e:
         log.error(f"Erro na Fase 1: {e}")
 
+def _analisar_jogo(jogo, contexto):
+    """Estágio 1 (Fase 2): choque de estilos + médias dos times -> pedidos de IA do jogo."""
+    choque = None
+    try:
+        is_choque, time_vant = analisar_confronto_estilos(jogo['nome_casa'], jogo['nome_fora'], contexto)
+        if is_choque:
+            rival = jogo['nome_fora'] if time_vant == jogo['nome_casa'] else jogo['nome_casa']
+            choque = (time_vant, rival)
+    except Exception as e:
+        log.error(f"Erro ao processar choque para {jogo['nome_casa']} x {jogo['nome_fora']}: {e}")
+
+    # Calendários dos dois times baixados em paralelo
+    medias = calcular_medias_pontos_equipes([jogo['id_casa'], jogo['id_fora']])
+    return preparar_pedidos_jogo(jogo, choque, contexto, medias)
+
+def _entregar_mensagens(mensagens):
+    """Estágio 3 (Fase 2): enfileira as mensagens do jogo (choque, depois bilhete) e espera a entrega."""
+    futuros = [enviar_mensagem_telegram(m) for m in mensagens if m]
+    return sum(1 for f in futuros if f.result())
+
 def job_fase_2_final():
     """Tarefa 3: Executada (Choque + Bilhetes)."""
     log.info("🎫 [JOB] Executando FASE 2: Análise Final (Choques + Bilhetes)...")
@@ -122,31 +125,23 @@ def job_fase_2_final():
         log.info("✅ [FIM] FASE 2 finalizada (sem jogos). Voltando ao loop...")
         return
 
-    # Parte A: Choques de Estilos
-    log.info("🚨 Verificando Choques de Estilos...")
-    for jogo in jogos:
-        try:
-            is_choque, time_vant = analisar_confronto_estilos(jogo['nome_casa'], jogo['nome_fora'])
-            if is_choque:
-                rival = jogo['nome_fora'] if time_vant == jogo['nome_casa'] else jogo['nome_casa']
-                mensagem_choque = gerar_choque_formatado(time_vant, rival)
-                enviar_mensagem_telegram(mensagem_choque)
-                time.sleep(5)
-        except Exception as e:
-            log.error(f"Erro ao processar choque para {jogo['nome_casa']} x {jogo['nome_fora']}: {e}")
-
-    # Parte B: Bilhetes Free
-    log.info("🎫 Gerando Bilhetes Free...")
-    for jogo in jogos:
-        try:
-            bilhete = preparar_bilhete_free(jogo)
-            if bilhete:
-                enviar_mensagem_telegram(bilhete)
-                time.sleep(5)
-        except Exception as e:
-            log.error(f"Erro ao processar bilhete para {jogo['nome_casa']} x {jogo['nome_fora']}: {e}")
-            
-    # LOG DE CONCLUSÃO ADICIONADO
+    indice_lesoes.sincronizar()
+    contexto = carregar_contexto_rodada(jogos)
+
+    # Pipeline: análise -> geração de IA -> entrega, com os três estágios rodando ao mesmo tempo.
+    # Cada jogo sai na ordem da rodada, com o choque (se houver) antes do bilhete.
+    log.info("🚨 Verificando Choques de Estilos e gerando Bilhetes Free...")
+    with novo_executor_ia() as executor:
+        pipeline = Pipeline([
+            Estagio("analise", partial(_analisar_jogo, contexto=contexto), workers=4),
+            Estagio("geracao", partial(gerar_mensagens_jogo, executor=executor),
+                    workers=int(os.getenv("GEMINI_MAX_SIMULTANEO", 4))),
+            Estagio("entrega", _entregar_mensagens, ordenado=True),
+        ])
+        entregues = pipeline.executar(jogos)
+
+    log.info(pipeline.resumo())
+    log.info(f"📬 {sum(e or 0 for e in entregues)} mensagens entregues | Fila do Telegram: {fila_telegram.metricas()}")
     log.info("✅ [FIM] FASE 2 concluída com sucesso. Aguardando próximo agendamento...")
 
 # ==============================================================================
@@ -161,54 +156,63 @@ def main_loop_control():
     log.info("🚀 INICIALIZANDO O AUTOMATIZADOR DO BOT NBA 24/7")
     log.info("=========================================================")
 
+    # Métricas de latência (HTTP, Postgres, Gemini, Telegram e jobs) em /metrics e /metrics.json.
+    # Só em localhost; METRICAS_HOST=0.0.0.0 expõe para a rede (o endpoint não tem autenticação)
+    if os.getenv("METRICAS_PORTA"):
+        instrumentacao.servir(int(os.getenv("METRICAS_PORTA")), host=os.getenv("METRICAS_HOST", "127.0.0.1"))
+
+    if os.getenv("ALERTA_LESOES") == "1":
+        feed_lesoes.inscrever(alertar_baixas_de_ultima_hora)
+
+    agendador = Agendador(
+        max_workers=3,
+        arquivo_estado=os.getenv("AGENDADOR_ESTADO", "agendador_estado.json"),
+    )
+
     # -----------------------------------------------------------
     # CONFIGURAÇÃO DE HORÁRIOS
     # -----------------------------------------------------------
     
-    # 1ª: De uma em uma hora, busca dados frescos
-    schedule.every(1).hours.do(job_atualizar_dados)
+    # 1ª: De uma em uma hora, busca dados frescos (execução perdida roda assim que o bot voltar)
+    tarefa_dados = agendador.a_cada(timedelta(hours=1), job_atualizar_dados, politica=RECUPERAR)
     
     # 2ª: FASE 1 (Agenda + Status News)
     # Defina aqui o horário oficial ou de teste (Ex: "15:30")
-    schedule.every().day.at("00:12").do(job_fase_1_tarde)
+    # Se o bot estava fora do ar no horário, ainda envia se voltar em até 2h
+    agendador.diariamente("00:12", job_fase_1_tarde, politica=RECUPERAR, janela_recuperacao=timedelta(hours=2))
     
     # 3ª: FASE 2 (Choque + Bilhete)
     # Defina aqui o horário oficial ou de teste (Ex: "16:30")
-    schedule.every().day.at("00:12").do(job_fase_2_final)
+    agendador.diariamente("00:12", job_fase_2_final, politica=RECUPERAR, janela_recuperacao=timedelta(hours=2))
 
     # Executa uma atualização imediata ao ligar o bot para garantir dados
     log.info("⚡ Executando atualização inicial de dados...")
-    job_atualizar_dados()
+    agendador.executar_agora(tarefa_dados)
 
     # --- DIAGNÓSTICO DE AGENDAMENTO ---
     log.info("=========================================================")
     log.info("📅 [DIAGNÓSTICO] VERIFICANDO MEMÓRIA DE AGENDAMENTOS:")
     log.info(f"📆 Hora do Sistema: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    jobs = schedule.get_jobs()
-    if not jobs:
+    proximas = agendador.proximas_execucoes()
+    if not proximas:
         log.warning("⚠️ ALERTA: Nenhuma tarefa foi agendada! Verifique o código.")
     
-    for i, job in enumerate(jobs):
-        log.info(f"   [{i+1}] Próxima execução: {job.next_run} | Tarefa: {job.job_func.__name__}")
+    for i, (quando, nome) in enumerate(proximas):
+        log.info(f"   [{i+1}] Próxima execução: {quando} | Tarefa: {nome}")
         
     log.info("=========================================================")
-    log.info(f"✅ Loop iniciado. Verificando relógio a cada 1 segundo...")
+    log.info(f"✅ Loop iniciado. Aguardando o próximo horário agendado...")
     
-    while True:
-        try:
-            # Verifica se há tarefas agendadas para rodar agora
-            schedule.run_pending()
-            
-            # Sleep de 1 segundo para precisão exata
-            time.sleep(1)
-            
-        except KeyboardInterrupt:
-            log.warning("\nProcesso interrompido pelo usuário.")
-            break
-        except Exception as e:
-            log.error(f"\nERRO FATAL NO LOOP: {e}. Reiniciando ciclo em 1 minuto...")
-            time.sleep(60)
+    try:
+        # Dorme até o próximo horário; as tarefas rodam no pool, sem travar umas às outras
+        agendador.executar_para_sempre()
+    except KeyboardInterrupt:
+        log.warning("\nProcesso interrompido pelo usuário.")
+    finally:
+        log.info(f"📊 [AGENDADOR] {agendador.metricas()}")
+        log.info(f"📈 [MÉTRICAS]\n{instrumentacao.resumo()}")
+        agendador.parar(esperar=False)
 
 if __name__ == "__main__":
-    main_loop_control()
\ No newline at end of file
+    main_loop_control()
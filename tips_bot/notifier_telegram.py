@@ -1,7 +1,9 @@
-import requests
 import os
+from concurrent.futures import Future
 from dotenv import load_dotenv
 from database.database_manager import log
+from nba_comum.fila_telegram import FilaTelegram
+from endpoints.instrumentacao import instrumentacao
 
 # Carrega as variáveis do seu arquivo .env
 load_dotenv()
@@ -10,41 +12,35 @@ load_dotenv()
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
-def enviar_mensagem_telegram(mensagem):
+# Fila única de saída: respeita os limites do Telegram (global e por chat) e o retry_after do 429
+fila_telegram = FilaTelegram(
+    TOKEN,
+    chat_id_padrao=CHAT_ID,
+    msgs_por_minuto_chat=int(os.getenv("TELEGRAM_MSGS_POR_MINUTO_CHAT", 20)),
+    instrumentacao=instrumentacao,
+)
+
+def enviar_mensagem_telegram(mensagem, aguardar=False):
     """
     Envia o bilhete formatado ou o alerta de choque para o grupo do Telegram.
     Utiliza HTML para negritos e emojis conforme o manual.
+
+    A mensagem vai para a fila e a função retorna na hora (Future[bool]);
+    com `aguardar=True`, espera a entrega e retorna o bool.
     """
     if not TOKEN or not CHAT_ID:
         log.error("❌ Erro crítico: TELEGRAM_BOT_TOKEN ou TELEGRAM_CHAT_ID ausentes no .env")
-        return False
-
-    url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
-    
-    # Montagem do pacote de dados para a API do Telegram
-    payload = {
-        "chat_id": CHAT_ID,
-        "text": mensagem,
-        "parse_mode": "HTML",
-        "disable_web_page_preview": True # Mantém o chat limpo sem links grandes
-    }
+        # Mesmo tipo de retorno do caminho normal: um Future já resolvido com False
+        futuro = Future()
+        futuro.set_result(False)
+        return futuro.result() if aguardar else futuro
 
-    try:
-        log.info("📤 Tentando enviar notificação para o Telegram...")
-        response = requests.post(url, data=payload, timeout=15)
-        
-        if response.status_code == 200:
-            log.info("✅ Mensagem entregue ao grupo com sucesso!")
-            return True
-        else:
-            log.error(f"❌ Falha no Telegram (Status {response.status_code}): {response.text}")
-            return False
-            
-    except Exception as e:
-        log.error(f"❌ Erro de conexão ao tentar falar com o Telegram: {e}")
-        return False
+    log.info("📤 Notificação enfileirada para o Telegram...")
+    # disable_web_page_preview mantém o chat limpo sem links grandes
+    futuro = fila_telegram.enfileirar(mensagem, parse_mode="HTML", disable_web_page_preview=True)
+    return futuro.result() if aguardar else futuro
 
 # Bloco de teste rápido: Rode este arquivo diretamente para ver se apita no celular
 if __name__ == "__main__":
     teste_msg = "🚀 <b>BOT ONLINE!</b>\nO sistema de Tips NBA 2025/26 foi conectado com sucesso ao Telegram."
-    enviar_mensagem_telegram(teste_msg)
\ No newline at end of file
+    enviar_mensagem_telegram(teste_msg, aguardar=True)
\ No newline at end of file
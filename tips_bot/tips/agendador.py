@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from database.database_manager import log
+from endpoints.instrumentacao import instrumentacao
+from endpoints.logs_bot import contexto_log
+
+RECUPERAR = "recuperar"  # execução perdida (bot desligado/atrasado) roda assim que possível, uma única vez
+PULAR = "pular"          # execução perdida é descartada; segue para o próximo horário
+
+class Tarefa:
+    def __init__(self, nome, funcao, intervalo=None, horario=None, politica=PULAR, janela_recuperacao=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.intervalo = intervalo          # timedelta (tarefas periódicas)
+        self.horario = horario              # (hora, minuto) (tarefas diárias)
+        self.politica = politica
+        self.janela_recuperacao = janela_recuperacao  # só recupera se o atraso for menor que isso (None = sempre)
+        self.proxima = None
+        self.ultima_execucao = None
+        self.em_execucao = threading.Lock()
+        self.historico = {"execucoes": 0, "erros": 0, "puladas_sobreposicao": 0, "puladas_atraso": 0,
+                          "ultima_duracao_s": None, "duracao_max_s": 0.0, "ultimo_atraso_s": None, "atraso_max_s": 0.0}
+
+    def horario_seguinte(self, depois_de):
+        """Próximo horário nominal estritamente depois de `depois_de`."""
+        if self.intervalo is not None:
+            return depois_de + self.intervalo
+        hora, minuto = self.horario
+        candidato = depois_de.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+        return candidato if candidato > depois_de else candidato + timedelta(days=1)
+
+    def horario_anterior(self, agora):
+        """
+        Horário nominal mais recente que já passou depois da última execução (None se nada foi perdido).
+        Com vários perdidos (ex: bot fora o fim de semana), vale o último: é ele que a janela de recuperação mede.
+        """
+        if self.ultima_execucao is None:
+            return None
+        if self.intervalo is not None:
+            perdidos = (agora - self.ultima_execucao) // self.intervalo
+            return self.ultima_execucao + perdidos * self.intervalo if perdidos >= 1 else None
+        hora, minuto = self.horario
+        devido = agora.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+        if devido > agora:
+            devido -= timedelta(days=1)
+        return devido if devido > self.ultima_execucao else None
+
+class Agendador:
+    """
+    Agendador sem polling: dorme até o próximo horário (ou até ser acordado) e dispara as tarefas
+    num pool de threads, então uma tarefa lenta não atrasa as outras.
+
+    - A mesma tarefa nunca roda sobreposta: se a anterior ainda não terminou, a nova é pulada (e contada).
+    - Registra duração e atraso (horário real - horário previsto) de cada execução.
+    - As últimas execuções ficam em `arquivo_estado`; ao religar, execuções perdidas seguem a política
+      da tarefa: RECUPERAR (roda uma vez, se dentro da janela) ou PULAR.
+    """
+
+    def __init__(self, max_workers=3, arquivo_estado=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._tarefas = []
+        self._acordar = threading.Event()
+        self._parar = False
+        self._lock = threading.Lock()
+        self.arquivo_estado = arquivo_estado
+        self._estado = self._ler_estado()
+
+    # ------------------------------------------------------------------
+    # Cadastro
+    # ------------------------------------------------------------------
+    def a_cada(self, intervalo, funcao, politica=RECUPERAR, janela_recuperacao=None, nome=None):
+        return self._adicionar(Tarefa(nome or funcao.__name__, funcao, intervalo=intervalo,
+                                      politica=politica, janela_recuperacao=janela_recuperacao))
+
+    def diariamente(self, horario, funcao, politica=PULAR, janela_recuperacao=None, nome=None):
+        hora, minuto = (int(p) for p in horario.split(":"))
+        return self._adicionar(Tarefa(nome or funcao.__name__, funcao, horario=(hora, minuto),
+                                      politica=politica, janela_recuperacao=janela_recuperacao))
+
+    def _adicionar(self, tarefa):
+        agora = datetime.now()
+        ultima = self._estado.get(tarefa.nome)
+        tarefa.ultima_execucao = datetime.fromisoformat(ultima) if ultima else None
+
+        perdida = tarefa.horario_anterior(agora)
+        if perdida and self._deve_recuperar(tarefa, agora - perdida):
+            log.info(f"⏪ [AGENDADOR] '{tarefa.nome}' perdeu a execução de {perdida:%d/%m %H:%M}. Recuperando agora.")
+            tarefa.proxima = perdida
+        else:
+            if perdida:
+                with self._lock:
+                    tarefa.historico["puladas_atraso"] += 1
+                log.info(f"⏭️ [AGENDADOR] '{tarefa.nome}' perdeu a execução de {perdida:%d/%m %H:%M}. Pulando (política: {tarefa.politica}).")
+            # Periódica sem histórico: primeira execução após um intervalo (mesmo comportamento do schedule)
+            tarefa.proxima = tarefa.horario_seguinte(agora)
+
+        with self._lock:
+            self._tarefas.append(tarefa)
+        self._acordar.set()
+        return tarefa
+
+    @staticmethod
+    def _deve_recuperar(tarefa, atraso):
+        if tarefa.politica != RECUPERAR:
+            return False
+        return tarefa.janela_recuperacao is None or atraso <= tarefa.janela_recuperacao
+
+    # ------------------------------------------------------------------
+    # Estado persistido (última execução de cada tarefa)
+    # ------------------------------------------------------------------
+    def _ler_estado(self):
+        if not self.arquivo_estado or not os.path.exists(self.arquivo_estado):
+            return {}
+        try:
+            with open(self.arquivo_estado, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning(f"⚠️ [AGENDADOR] Estado ilegível ({e}). Começando do zero.")
+            return {}
+
+    def _gravar_estado(self, tarefa):
+        if not self.arquivo_estado:
+            return
+        with self._lock:
+            self._estado[tarefa.nome] = tarefa.ultima_execucao.isoformat()
+            estado = dict(self._estado)
+        temporario = self.arquivo_estado + ".tmp"
+        try:
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(estado, f)
+            os.replace(temporario, self.arquivo_estado)
+        except OSError as e:
+            log.warning(f"⚠️ [AGENDADOR] Não foi possível salvar o estado: {e}")
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+    def _rodar(self, tarefa, previsto):
+        # Cada rodada ganha um id de execução: todos os logs dela (inclusive de threads filhas) saem marcados
+        with contexto_log(tarefa.nome):
+            inicio = datetime.now()
+            atraso = (inicio - previsto).total_seconds()
+            cronometro = time.perf_counter()
+            try:
+                with instrumentacao.cronometrar("job", tarefa=tarefa.nome):
+                    tarefa.funcao()
+            except Exception as e:
+                with self._lock:
+                    tarefa.historico["erros"] += 1
+                log.error(f"❌ [AGENDADOR] Erro na tarefa '{tarefa.nome}': {e}")
+            finally:
+                duracao = time.perf_counter() - cronometro
+                # Roda numa thread do pool: histórico e última execução só mudam sob o lock (metricas() lê junto)
+                with self._lock:
+                    h = tarefa.historico
+                    h["execucoes"] += 1
+                    h["ultima_duracao_s"] = round(duracao, 2)
+                    h["duracao_max_s"] = round(max(h["duracao_max_s"], duracao), 2)
+                    h["ultimo_atraso_s"] = round(atraso, 2)
+                    h["atraso_max_s"] = round(max(h["atraso_max_s"], atraso), 2)
+                    tarefa.ultima_execucao = previsto
+                self._gravar_estado(tarefa)
+                tarefa.em_execucao.release()
+                log.info(f"⏱️ [AGENDADOR] '{tarefa.nome}' terminou em {duracao:.1f}s (atraso de {atraso:.1f}s).")
+
+    def _disparar(self, tarefa, agora):
+        previsto = tarefa.proxima
+        # Próximo horário a partir de agora: várias execuções perdidas viram uma só
+        tarefa.proxima = tarefa.horario_seguinte(agora)
+
+        if not tarefa.em_execucao.acquire(blocking=False):
+            with self._lock:
+                tarefa.historico["puladas_sobreposicao"] += 1
+            log.warning(f"⏭️ [AGENDADOR] '{tarefa.nome}' ainda está rodando. Execução de {previsto:%H:%M} pulada.")
+            return
+        self._executor.submit(self._rodar, tarefa, previsto)
+
+    def executar_agora(self, tarefa):
+        """Roda a tarefa imediatamente no pool (respeitando a regra de não sobrepor) e espera terminar."""
+        if not tarefa.em_execucao.acquire(blocking=False):
+            log.warning(f"⏭️ [AGENDADOR] '{tarefa.nome}' já está rodando.")
+            return
+        if tarefa.intervalo is not None:
+            # Conta como a execução do período: a próxima periódica fica um intervalo depois desta
+            tarefa.proxima = tarefa.horario_seguinte(datetime.now())
+        self._executor.submit(self._rodar, tarefa, datetime.now()).result()
+
+    def proximas_execucoes(self):
+        with self._lock:
+            return sorted(((t.proxima, t.nome) for t in self._tarefas))
+
+    def metricas(self):
+        with self._lock:
+            return {t.nome: dict(t.historico, proxima=t.proxima.strftime("%Y-%m-%d %H:%M:%S")) for t in self._tarefas}
+
+    def executar_para_sempre(self):
+        """Loop principal: espera até o próximo horário (sem polling) e dispara o que venceu."""
+        while not self._parar:
+            agora = datetime.now()
+            with self._lock:
+                tarefas = list(self._tarefas)
+
+            for tarefa in tarefas:
+                if tarefa.proxima <= agora:
+                    atraso = agora - tarefa.proxima
+                    # Acordou muito depois do horário (ex: máquina suspensa): aplica a política da tarefa
+                    if atraso > timedelta(minutes=1) and not self._deve_recuperar(tarefa, atraso):
+                        with self._lock:
+                            tarefa.historico["puladas_atraso"] += 1
+                        log.info(f"⏭️ [AGENDADOR] '{tarefa.nome}' atrasada {atraso}. Pulando (política: {tarefa.politica}).")
+                        tarefa.proxima = tarefa.horario_seguinte(agora)
+                        continue
+                    self._disparar(tarefa, agora)
+
+            with self._lock:
+                proxima = min((t.proxima for t in self._tarefas), default=None)
+            espera = 3600.0 if proxima is None else max(0.0, (proxima - datetime.now()).total_seconds())
+            # Dorme em blocos de no máximo 60s para acompanhar ajustes do relógio do sistema
+            self._acordar.wait(timeout=min(espera, 60.0))
+            self._acordar.clear()
+
+    def parar(self, esperar=True):
+        self._parar = True
+        self._acordar.set()
+        self._executor.shutdown(wait=esperar)
@@ -1,31 +1,65 @@
-import google.generativeai as genai
 import os
-from database.database_manager import log, calcular_palpite_par, buscar_dados
+import threading
+from functools import partial
+from database.database_manager import log, calcular_palpite_par
 from tips.strategy_processor import calcular_media_pontos_equipe
+from tips.indice_lesoes import indice_lesoes
+from tips.contexto_rodada import carregar_contexto, carregar_contexto_rodada
+from tips.gerador_ia import ExecutorGeracao
+from endpoints.instrumentacao import instrumentacao
 
 # IA Configurada (Temperatura 0.4 para precisão)
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 model_name = "gemini-2.0-flash"
-model = genai.GenerativeModel(
-    model_name=model_name, 
-    generation_config={"temperature": 0.4}
-)
+# Criado no primeiro prompt (obter_modelo): importar o SDK do Gemini é a parte mais cara do import
+# do bot, e refresh/selftest nem usam a IA. Atribuir um modelo aqui antes (ex: benchmark) também vale.
+model = None
+_model_lock = threading.Lock()
 
-log.info(f"🧠 Modelo de IA carregado: {model_name} (Temp 0.4)")
+def obter_modelo():
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                model = genai.GenerativeModel(
+                    model_name=model_name,
+                    generation_config={"temperature": 0.4}
+                )
+                log.info(f"🧠 Modelo de IA carregado: {model_name} (Temp 0.4)")
+    return model
+
+def _gerar_texto_ia(prompt):
+    modelo = obter_modelo()
+    with instrumentacao.cronometrar("chamada_externa", tipo="gemini", operacao="generate_content"):
+        return modelo.generate_content(prompt).text.strip()
+
+def novo_executor_ia(orcamento_s=None):
+    """
+    Executor de geração para UM job: prompts rodam em paralelo (GEMINI_MAX_SIMULTANEO)
+    e o job inteiro tem GEMINI_ORCAMENTO_JOB_S segundos; o que passar disso vira texto padrão.
+    """
+    return ExecutorGeracao(
+        _gerar_texto_ia,
+        limite_simultaneo=int(os.getenv("GEMINI_MAX_SIMULTANEO", 4)),
+        orcamento_s=orcamento_s or float(os.getenv("GEMINI_ORCAMENTO_JOB_S", 90)),
+    )
+
+def _gerar_com_executor(pedidos, executor=None):
+    """Gera os textos de `pedidos` [(prompt, fallback)] usando o executor do job (ou um temporário)."""
+    if executor is not None:
+        return executor.gerar_todos(pedidos)
+    with novo_executor_ia() as temporario:
+        return temporario.gerar_todos(pedidos)
 
 # --- FUNÇÃO HELPER DE SEGURANÇA (BLACKLIST) ---
 def is_player_injured_blacklist(player_name):
     """
     Verifica se o jogador está na tabela 'injuries'.
     Retorna True se estiver machucado/bloqueado.
+    Consulta o índice em memória (sem ir ao banco); nomes comparados sem maiúsculas/acentos.
     """
-    if not player_name: 
-        return False
-        
-    # Verifica pelo NOME (Compatibilidade e Segurança)
-    # Usamos ILIKE para ignorar maiúsculas/minúsculas
-    res = buscar_dados("SELECT 1 FROM injuries WHERE player_name ILIKE %s LIMIT 1", (player_name.strip(),))
-    return True if res else False
+    return indice_lesoes.contem(player_name)
 # -----------------------------------------------
 
 def gerar_agenda_simplificada(jogos):
@@ -41,14 +75,17 @@ def gerar_agenda_simplificada(jogos):
     texto += "\n🤖 A análise detalhada será enviada!"
     return texto
 
-def gerar_status_news(jogos):
+def gerar_status_news(jogos, contexto=None, executor=None):
     """
     Gera o Status News.
     Detecta se o MVP está na Blacklist de Injuries e reporta como desfalque.
+    Todos os textos da IA são pedidos de uma vez (em paralelo) e montados na ordem dos jogos.
     """
+    contexto = contexto or carregar_contexto_rodada(jogos)
     texto = "📊 <b>Status News :</b>\n\n"
-    tem_conteudo = False 
     
+    # 1ª passada: monta prompt + texto padrão de cada time com destaque
+    pedidos = []
     for j in jogos:
         times_para_analisar = [
             {'id': j['id_casa'], 'nome': j['nome_casa']},
@@ -57,98 +94,91 @@ def gerar_status_news(jogos):
 
         for time in times_para_analisar:
             # 1. Busca Ofensivo (Top Ranking)
-            mvp_off = buscar_dados(
-                "SELECT player_name, rank_position FROM league_offensive_rankings WHERE team = %s AND rank_position <= 5 LIMIT 1", 
-                (time['nome'],)
-            )
+            mvp_off = contexto.destaque_ofensivo(time['nome'], rank_maximo=5)
             
             prompt = ""
             
             if mvp_off:
-                jogador = mvp_off[0]['player_name']
-                posicao = mvp_off[0]['rank_position']
+                jogador = mvp_off['player_name']
+                posicao = mvp_off['rank_position']
                 
                 # VERIFICAÇÃO DE LESÃO (BLACKLIST)
                 if is_player_injured_blacklist(jogador):
                     # O jogador é Craque, mas está OFF.
                     prompt = (f"O craque {jogador} do time {time['nome']} (Top {posicao} da liga) está MACHUCADO e fora do jogo. "
                               f"Escreva uma frase jornalística curta (max 15 palavras) sobre o impacto desse desfalque.")
+                    fallback = f"Desfalque de peso: {jogador} (Top {posicao} da liga em pontos) está fora do jogo."
                 else:
                     # Jogador saudável
                     prompt = (f"O jogador {jogador} do time {time['nome']} é Top {posicao} em PONTUAÇÃO. "
                               f"Escreva uma frase curta (max 15 palavras) destacando essa liderança.")
+                    fallback = f"{jogador} chega como Top {posicao} da liga em pontuação."
             
             # Se não achou MVP ofensivo ou não gerou prompt, tenta Defensivo
             elif not prompt: 
-                mvp_def = buscar_dados(
-                    "SELECT player_name, rank_position FROM league_defensive_rankings WHERE team = %s AND rank_position <= 5 LIMIT 1", 
-                    (time['nome'],)
-                )
+                mvp_def = contexto.destaque_defensivo(time['nome'], rank_maximo=5)
                 if mvp_def:
-                    jogador = mvp_def[0]['player_name']
-                    posicao = mvp_def[0]['rank_position']
+                    jogador = mvp_def['player_name']
+                    posicao = mvp_def['rank_position']
                     
                     if is_player_injured_blacklist(jogador):
                          prompt = (f"O defensor de elite {jogador} do time {time['nome']} está MACHUCADO. "
                                    f"Escreva uma frase curta sobre o desfalque defensivo.")
+                         fallback = f"Desfalque na defesa: {jogador} está fora do jogo."
                     else:
                         prompt = (f"O jogador {jogador} do time {time['nome']} é Top {posicao} em DEFESA. "
                                   f"Escreva uma frase curta destacando essa dominância.")
+                        fallback = f"{jogador} chega como Top {posicao} da liga em defesa."
 
             if not prompt:
                 continue
 
-            try:
-                analise_ia = model.generate_content(prompt).text.strip().replace(f"{time['nome']}:", "").strip()
-                texto += f"<b>{time['nome']}</b>: {analise_ia}\n\n"
-                tem_conteudo = True
-            except Exception as e:
-                log.error(f"Erro IA Status News {time['nome']}: {e}")
-                continue
+            pedidos.append((time['nome'], prompt, fallback))
 
-    if not tem_conteudo:
+    # 2ª passada: IA em paralelo, texto montado na ordem original
+    textos = _gerar_com_executor([(p, fb) for _, p, fb in pedidos], executor)
+    for (nome_time, _, _), analise in zip(pedidos, textos):
+        analise_ia = analise.replace(f"{nome_time}:", "").strip()
+        texto += f"<b>{nome_time}</b>: {analise_ia}\n\n"
+
+    if not pedidos:
         texto += "Nenhum destaque estatístico crítico para a rodada de hoje.\n"
 
     return texto
 
-def preparar_bilhete_free(partida):
+def _preparar_bilhete(partida, contexto, medias):
     """
-    Gera o Bilhete Free completo.
-    Filtra jogadores lesionados das sugestões.
+    Parte do Bilhete Free que não depende da IA.
+    Retorna (prompt, fallback, partes) ou None se não houver nenhuma entrada válida.
     """
-    m_casa = calcular_media_pontos_equipe(partida['id_casa'])
-    m_fora = calcular_media_pontos_equipe(partida['id_fora'])
+    m_casa = medias.get(partida['id_casa'])
+    m_fora = medias.get(partida['id_fora'])
+    if m_casa is None:
+        m_casa = calcular_media_pontos_equipe(partida['id_casa'])
+    if m_fora is None:
+        m_fora = calcular_media_pontos_equipe(partida['id_fora'])
     
     # Busca atletas candidatos
-    atleta_casa_cand = buscar_dados("SELECT player_name, last_3_avg FROM team_top_scorers WHERE team_id = %s LIMIT 1", (str(partida['id_casa']),))
-    atleta_fora_cand = buscar_dados("SELECT player_name, last_3_avg FROM team_top_scorers WHERE team_id = %s LIMIT 1", (str(partida['id_fora']),))
+    atleta_casa_cand = contexto.cestinha(partida['id_casa'])
+    atleta_fora_cand = contexto.cestinha(partida['id_fora'])
 
     # Validação via Blacklist Injuries
     atleta_casa = None
-    if atleta_casa_cand and not is_player_injured_blacklist(atleta_casa_cand[0]['player_name']):
+    if atleta_casa_cand and not is_player_injured_blacklist(atleta_casa_cand['player_name']):
         atleta_casa = atleta_casa_cand
         
     atleta_fora = None
-    if atleta_fora_cand and not is_player_injured_blacklist(atleta_fora_cand[0]['player_name']):
+    if atleta_fora_cand and not is_player_injured_blacklist(atleta_fora_cand['player_name']):
         atleta_fora = atleta_fora_cand
-
-    prompt = (f"Escreva uma análise curta (máximo 25 palavras) e vibrante sobre o jogo {partida['nome_casa']} x {partida['nome_fora']}. "
-              f"Foque na expectativa de pontos e rivalidade. Use tom de narrador.")
-    analise = model.generate_content(prompt).text.strip()
-
-    texto_base = f"🏀 <b>Bilhete Free</b>\n\n"
-    texto_base += f"🏀 <b>{partida['nome_casa']}</b> x <b>{partida['nome_fora']}</b>\n\n"
-    texto_base += f"📊 <b>CONFRONTO</b>\n\n"
-    texto_base += f"🏀🔥 {analise}\n\n"
     
     texto_destaques = "⭐️ <b>DESTAQUES</b>\n\n"
     tem_destaque = False
     
     if atleta_casa:
-        texto_destaques += f"🔥 {atleta_casa[0]['player_name']} (<b>{partida['nome_casa']}</b>)\n"
+        texto_destaques += f"🔥 {atleta_casa['player_name']} (<b>{partida['nome_casa']}</b>)\n"
         tem_destaque = True
     if atleta_fora:
-        texto_destaques += f"🔥 {atleta_fora[0]['player_name']} (<b>{partida['nome_fora']}</b>)\n"
+        texto_destaques += f"🔥 {atleta_fora['player_name']} (<b>{partida['nome_fora']}</b>)\n"
         tem_destaque = True
     
     texto_destaques += "\n"
@@ -161,35 +191,83 @@ def preparar_bilhete_free(partida):
         entradas_validas.append(f"🏀 <b>{partida['nome_fora']}</b> {calcular_palpite_par(m_fora)}+ pontos")
 
     if atleta_casa:
-        entradas_validas.append(f"👤 {atleta_casa[0]['player_name']} {calcular_palpite_par(atleta_casa[0]['last_3_avg'])}+ pontos")
+        entradas_validas.append(f"👤 {atleta_casa['player_name']} {calcular_palpite_par(atleta_casa['last_3_avg'])}+ pontos")
     if atleta_fora:
-        entradas_validas.append(f"👤 {atleta_fora[0]['player_name']} {calcular_palpite_par(atleta_fora[0]['last_3_avg'])}+ pontos")
+        entradas_validas.append(f"👤 {atleta_fora['player_name']} {calcular_palpite_par(atleta_fora['last_3_avg'])}+ pontos")
 
+    # Sem entradas não há bilhete: nem chama a IA
     if not entradas_validas:
         return None
 
+    prompt = (f"Escreva uma análise curta (máximo 25 palavras) e vibrante sobre o jogo {partida['nome_casa']} x {partida['nome_fora']}. "
+              f"Foque na expectativa de pontos e rivalidade. Use tom de narrador.")
+    fallback = f"{partida['nome_casa']} e {partida['nome_fora']} entram em quadra hoje em busca de pontos e da vitória!"
+
+    partes = {
+        'texto_destaques': texto_destaques if tem_destaque else "",
+        'entradas_validas': entradas_validas,
+    }
+    return prompt, fallback, partes
+
+def _montar_bilhete(partida, analise, partes):
+    texto_base = f"🏀 <b>Bilhete Free</b>\n\n"
+    texto_base += f"🏀 <b>{partida['nome_casa']}</b> x <b>{partida['nome_fora']}</b>\n\n"
+    texto_base += f"📊 <b>CONFRONTO</b>\n\n"
+    texto_base += f"🏀🔥 {analise}\n\n"
+
     texto_final = texto_base
-    if tem_destaque:
-        texto_final += texto_destaques
+    texto_final += partes['texto_destaques']
     
     texto_final += "🔥 <b>POSSÍVEIS ENTRADAS</b>\n\n"
-    for entrada in entradas_validas:
+    for entrada in partes['entradas_validas']:
         texto_final += f"{entrada}\n"
     
     return texto_final
 
-def gerar_choque_formatado(time_vant, time_rival):
+def preparar_bilhetes_free(jogos, contexto=None, medias=None, executor=None):
     """
-    Alerta de Choque de Estilos com Múltipla.
-    Bloqueia jogadores da Blacklist 'injuries'.
+    Gera os Bilhetes Free de vários jogos com as chamadas de IA em paralelo.
+    Retorna uma lista alinhada com `jogos` (None onde não há bilhete ou houve erro).
+    """
+    contexto = contexto or carregar_contexto_rodada(jogos)
+    medias = medias or {}
+
+    preparados = []
+    for partida in jogos:
+        try:
+            preparados.append(_preparar_bilhete(partida, contexto, medias))
+        except Exception as e:
+            log.error(f"Erro ao processar bilhete para {partida['nome_casa']} x {partida['nome_fora']}: {e}")
+            preparados.append(None)
+
+    validos = [(i, p) for i, p in enumerate(preparados) if p]
+    textos = _gerar_com_executor([(prompt, fallback) for _, (prompt, fallback, _) in validos], executor)
+
+    bilhetes = [None] * len(jogos)
+    for (i, (_, _, partes)), analise in zip(validos, textos):
+        bilhetes[i] = _montar_bilhete(jogos[i], analise, partes)
+    return bilhetes
+
+def preparar_bilhete_free(partida, contexto=None, medias=None, executor=None):
     """
-    # 1. Geração do Texto de Alerta (IA)
+    Gera o Bilhete Free completo.
+    Filtra jogadores lesionados das sugestões.
+    `medias`: {team_id: média de pontos} já calculado para a rodada (evita baixar o calendário de novo).
+    """
+    return preparar_bilhetes_free([partida], contexto, medias, executor)[0]
+
+def _preparar_choque(time_vant, time_rival, contexto):
+    """Parte do Alerta de Choque que não depende da IA: prompt, texto padrão e a MÚLTIPLA."""
+    # 1. Texto de Alerta (IA)
     prompt = (
         f"O time {time_vant} tem uma vantagem estatística muito forte (choque de estilos) contra o {time_rival}. "
         f"Escreva um alerta de 2 frases curtas e sérias destacando essa superioridade e desequilíbrio. "
         f"Comece com 'O {time_vant} entra em quadra...' ou similar. Seja profissional."
     )
-    texto_ia = model.generate_content(prompt).text.strip()
+    fallback = (
+        f"O {time_vant} entra em quadra com clara superioridade estatística sobre o {time_rival}. "
+        f"Os números apontam um desequilíbrio forte de estilos neste confronto."
+    )
     
     # 2. Busca de Dados para a MÚLTIPLA
     multipla = []
@@ -203,7 +281,7 @@ def gerar_choque_formatado(time_vant, time_rival):
     # --- LÓGICA DE SELEÇÃO DE JOGADORES (ATAQUE) ---
     selected_off_player = None
 
-    off_candidates = buscar_dados("SELECT player_name, avg_points FROM league_offensive_rankings WHERE team = %s ORDER BY rank_position ASC LIMIT 10", (time_vant,))
+    off_candidates = contexto.ofensivos(time_vant, limite=10)
     
     for cand in off_candidates:
         nome_cand = cand['player_name']
@@ -219,7 +297,7 @@ def gerar_choque_formatado(time_vant, time_rival):
         break 
 
     # --- LÓGICA DE SELEÇÃO DE JOGADORES (DEFESA) ---
-    def_candidates = buscar_dados("SELECT player_name, avg_steals, avg_blocks FROM league_defensive_rankings WHERE team = %s ORDER BY rank_position ASC LIMIT 10", (time_vant,))
+    def_candidates = contexto.defensivos(time_vant, limite=10)
     
     for cand in def_candidates:
         p_name = cand['player_name']
@@ -233,10 +311,10 @@ def gerar_choque_formatado(time_vant, time_rival):
             continue 
 
         # Apto e Único
-        p_off_stats = buscar_dados("SELECT avg_points FROM league_offensive_rankings WHERE player_name ILIKE %s", (p_name,))
+        p_off_pontos = contexto.pontos_ofensivos(p_name)
         
-        if p_off_stats:
-            pts_def = calcular_palpite_par(p_off_stats[0]['avg_points'])
+        if p_off_pontos is not None:
+            pts_def = calcular_palpite_par(p_off_pontos)
             multipla.append(f"✔️ {p_name} {pts_def}+ pontos")
         else:
             stl = float(cand['avg_steals'])
@@ -253,6 +331,9 @@ def gerar_choque_formatado(time_vant, time_rival):
         
         break
 
+    return prompt, fallback, multipla
+
+def _montar_choque(texto_ia, multipla):
     lines_multipla = "\n".join(multipla)
 
     return (f"🚨 <b>ALERTA DE CHOQUE DE ESTILOS</b> 🚨\n"
@@ -261,4 +342,62 @@ def gerar_choque_formatado(time_vant, time_rival):
             f"🏀💰 <b>MÚLTIPLA:</b>\n\n"
             f"{lines_multipla}\n\n"
             f"ℹ️ <b>Nota Técnica:</b>\n"
-            f"Cenários como ajustes de rotação podem reduzir minutos de titulares, impactando mercados individuais fiquem atentos aos jogos.")
\ No newline at end of file
+            f"Cenários como ajustes de rotação podem reduzir minutos de titulares, impactando mercados individuais fiquem atentos aos jogos.")
+
+def gerar_choques_formatados(confrontos, contexto=None, executor=None):
+    """
+    Alertas de Choque de Estilos para vários confrontos [(time_vant, time_rival), ...],
+    com as chamadas de IA em paralelo. Retorna a lista de mensagens na mesma ordem (None se deu erro).
+    """
+    contexto = contexto or carregar_contexto([t for par in confrontos for t in par])
+
+    preparados = []
+    for time_vant, time_rival in confrontos:
+        try:
+            preparados.append(_preparar_choque(time_vant, time_rival, contexto))
+        except Exception as e:
+            log.error(f"Erro ao processar choque para {time_vant} x {time_rival}: {e}")
+            preparados.append(None)
+
+    validos = [(i, p) for i, p in enumerate(preparados) if p]
+    textos = _gerar_com_executor([(prompt, fallback) for _, (prompt, fallback, _) in validos], executor)
+
+    mensagens = [None] * len(confrontos)
+    for (i, (_, _, multipla)), texto_ia in zip(validos, textos):
+        mensagens[i] = _montar_choque(texto_ia, multipla)
+    return mensagens
+
+def gerar_choque_formatado(time_vant, time_rival, contexto=None, executor=None):
+    """
+    Alerta de Choque de Estilos com Múltipla.
+    Bloqueia jogadores da Blacklist 'injuries'.
+    """
+    return gerar_choques_formatados([(time_vant, time_rival)], contexto, executor)[0]
+
+# --- POR JOGO (usado no pipeline da Fase 2) ---
+def preparar_pedidos_jogo(partida, choque, contexto, medias):
+    """
+    Pedidos de IA de um jogo, na ordem de envio: Alerta de Choque (se houver) e depois o Bilhete Free.
+    Retorna [(prompt, fallback, montar)], onde montar(texto_ia) devolve a mensagem final.
+    """
+    pedidos = []
+    if choque:
+        try:
+            prompt, fallback, multipla = _preparar_choque(choque[0], choque[1], contexto)
+            pedidos.append((prompt, fallback, partial(_montar_choque, multipla=multipla)))
+        except Exception as e:
+            log.error(f"Erro ao processar choque para {choque[0]} x {choque[1]}: {e}")
+
+    try:
+        preparado = _preparar_bilhete(partida, contexto, medias)
+        if preparado:
+            prompt, fallback, partes = preparado
+            pedidos.append((prompt, fallback, partial(_montar_bilhete, partida, partes=partes)))
+    except Exception as e:
+        log.error(f"Erro ao processar bilhete para {partida['nome_casa']} x {partida['nome_fora']}: {e}")
+    return pedidos
+
+def gerar_mensagens_jogo(pedidos, executor):
+    """Gera os textos de IA de um jogo (em paralelo, no executor do job) e monta as mensagens na ordem."""
+    futuros = [executor.submeter(prompt) for prompt, _, _ in pedidos]
+    return [montar(executor.resultado(futuro, fallback)) for futuro, (_, fallback, montar) in zip(futuros, pedidos)]
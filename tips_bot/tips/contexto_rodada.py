@@ -0,0 +1,101 @@
+from database.database_manager import log, buscar_dados
+from tips.indice_lesoes import normalizar_nome_jogador
+from nba_comum.registro_times import registro_times
+
+def _chave_time(team):
+    """Sigla canônica do time (qualquer variante de nome vira a mesma chave)."""
+    time = registro_times.resolver(team)
+    return time.sigla if time else team
+
+class ContextoRodada:
+    """
+    Rankings (ofensivo/defensivo) e cestinhas de todos os times da rodada em memória.
+    Montado uma vez por job; as funções de estratégia e conteúdo leem daqui em vez de consultar o banco.
+    """
+
+    def __init__(self, ofensivos, defensivos, cestinhas):
+        self._ofensivos = {}
+        self._defensivos = {}
+        self._pontos_por_nome = {}
+        self._cestinhas = {}
+
+        # Linhas agrupadas pela sigla canônica do time
+        for linha in ofensivos:
+            self._ofensivos.setdefault(_chave_time(linha['team']), []).append(linha)
+            self._pontos_por_nome.setdefault(normalizar_nome_jogador(linha['player_name']), linha['avg_points'])
+        for linha in defensivos:
+            self._defensivos.setdefault(_chave_time(linha['team']), []).append(linha)
+        # Variantes de nome do mesmo time caem na mesma chave: reordena cada grupo por rank
+        for grupos in (self._ofensivos, self._defensivos):
+            for linhas in grupos.values():
+                linhas.sort(key=lambda l: l['rank_position'])
+
+        for linha in cestinhas:
+            # Mesma semântica do antigo "LIMIT 1": fica a primeira linha de cada time
+            self._cestinhas.setdefault(str(linha['team_id']), linha)
+
+    def ofensivos(self, team, limite=10):
+        return self._ofensivos.get(_chave_time(team), [])[:limite]
+
+    def defensivos(self, team, limite=10):
+        return self._defensivos.get(_chave_time(team), [])[:limite]
+
+    def destaque_ofensivo(self, team, rank_maximo=5):
+        """Melhor jogador do time no ranking ofensivo, se estiver no Top `rank_maximo` da liga."""
+        return next((l for l in self._ofensivos.get(_chave_time(team), []) if l['rank_position'] <= rank_maximo), None)
+
+    def destaque_defensivo(self, team, rank_maximo=5):
+        return next((l for l in self._defensivos.get(_chave_time(team), []) if l['rank_position'] <= rank_maximo), None)
+
+    def presenca_nos_tops(self, team):
+        """(tem_defesa, tem_ataque): algum jogador no Top 8 defensivo / Top 5 ofensivo."""
+        tem_defesa = self.destaque_defensivo(team, rank_maximo=8) is not None
+        tem_ataque = self.destaque_ofensivo(team, rank_maximo=5) is not None
+        return tem_defesa, tem_ataque
+
+    def cestinha(self, team_id):
+        return self._cestinhas.get(str(team_id))
+
+    def pontos_ofensivos(self, player_name):
+        """avg_points do jogador no ranking ofensivo (busca por nome, sem diferenciar maiúsculas)."""
+        return self._pontos_por_nome.get(normalizar_nome_jogador(player_name))
+
+def carregar_contexto(nomes_times, ids_times=()):
+    """Carrega o contexto para os times informados com uma query por tabela."""
+    # Busca por todas as variantes de nome de cada time (o ranking da ESPN nem sempre usa o shortDisplayName)
+    resolvidos, faltando = registro_times.resolver_varios({n for n in nomes_times if n})
+    for nome in faltando:
+        log.error(f"❌ Time não reconhecido no registro: '{nome}'. Verifique nba_comum/registro_times.py.")
+    nomes_times = sorted({v for t in resolvidos.values() for v in t.nomes} | set(faltando))
+    ids_times = sorted({str(i) for i in ids_times if i})
+
+    defensivos = buscar_dados(
+        "SELECT player_name, team, avg_steals, avg_blocks, rank_position FROM league_defensive_rankings "
+        "WHERE team = ANY(%s) ORDER BY team, rank_position ASC",
+        (nomes_times,)
+    )
+
+    # Inclui no ofensivo os defensores da rodada, para achar a média de pontos deles pelo nome
+    nomes_defensores = sorted({l['player_name'].lower() for l in defensivos})
+    ofensivos = buscar_dados(
+        "SELECT player_name, team, avg_points, rank_position FROM league_offensive_rankings "
+        "WHERE team = ANY(%s) OR LOWER(player_name) = ANY(%s) ORDER BY team, rank_position ASC",
+        (nomes_times, nomes_defensores)
+    )
+
+    cestinhas = []
+    if ids_times:
+        cestinhas = buscar_dados(
+            "SELECT team_id, player_name, last_3_avg FROM team_top_scorers WHERE team_id = ANY(%s)",
+            (ids_times,)
+        )
+
+    return ContextoRodada(ofensivos, defensivos, cestinhas)
+
+def carregar_contexto_rodada(jogos):
+    """Contexto de todos os times da rodada (formato de jogos de buscar_jogos_nba)."""
+    nomes = [n for j in jogos for n in (j['nome_casa'], j['nome_fora'])]
+    ids = [i for j in jogos for i in (j.get('id_casa'), j.get('id_fora'))]
+    contexto = carregar_contexto(nomes, ids)
+    log.info(f"📦 Contexto da rodada carregado para {len(set(nomes))} times.")
+    return contexto
@@ -1,5 +1,83 @@
-from database.database_manager import log, executar_query, buscar_dados
+from database.database_manager import (
+    log, buscar_dados, carregar_via_staging, SQL_TABELA_VERSOES, sql_publicar_versao
+)
 from endpoints.api_handler import get_league_rankings, get_all_injured_players
+from tips.indice_lesoes import indice_lesoes
+from tips.feed_lesoes import feed_lesoes, resumir_mudancas, MudancaLesao
+
+# Sincronização por diferença: compara a lista raspada (staging) com a blacklist gravada,
+# aplica só os INSERT/UPDATE/DELETE necessários e devolve as mudanças para o feed.
+# Tudo na mesma transação; a versão só é publicada se algo mudou (hora sem mudança = zero escrita).
+SQL_SINCRONIZA_INJURIES = [
+    """
+        CREATE TEMP TABLE {staging}_mudancas ON COMMIT DROP AS
+        SELECT
+            CASE
+                WHEN atual.player_name IS NULL THEN 'adicionado'
+                WHEN novo.player_name IS NULL THEN 'liberado'
+                WHEN atual.status IS DISTINCT FROM novo.status THEN 'status_alterado'
+                ELSE 'detalhes_alterados'
+            END AS tipo,
+            COALESCE(novo.player_name, atual.player_name) AS player_name,
+            atual.status AS status_anterior,
+            novo.status,
+            COALESCE(novo.details, atual.details) AS details
+        FROM {staging} novo
+        FULL OUTER JOIN injuries atual ON atual.player_name = novo.player_name
+        WHERE atual.player_name IS NULL
+           OR novo.player_name IS NULL
+           OR atual.status IS DISTINCT FROM novo.status
+           OR atual.details IS DISTINCT FROM novo.details;
+    """,
+    """
+        DELETE FROM injuries i USING {staging}_mudancas m
+        WHERE m.tipo = 'liberado' AND i.player_name = m.player_name;
+    """,
+    """
+        UPDATE injuries i SET status = m.status, details = m.details
+        FROM {staging}_mudancas m
+        WHERE m.tipo IN ('status_alterado', 'detalhes_alterados') AND i.player_name = m.player_name;
+    """,
+    """
+        INSERT INTO injuries (player_name, status, details)
+        SELECT player_name, status, details FROM {staging}_mudancas WHERE tipo = 'adicionado';
+    """,
+    SQL_TABELA_VERSOES,
+    sql_publicar_versao("injuries", somente_se="SELECT 1 FROM {staging}_mudancas"),
+    "SELECT tipo, player_name, status_anterior, status, details FROM {staging}_mudancas ORDER BY tipo, player_name;",
+]
+
+# A carga traz a liga inteira: quem não veio (deixou de ser qualificado, foi dispensado) sai da tabela
+SQL_REMOVE_FORA_DO_RANKING = """
+    DELETE FROM {tabela} r
+    WHERE NOT EXISTS (SELECT 1 FROM {{staging}} s WHERE s.player_name = r.player_name);
+"""
+
+SQL_MERGE_OFENSIVO = ["""
+    INSERT INTO league_offensive_rankings (player_id, player_name, team, team_abbreviation, avg_points, three_point_pct, rank_position)
+    SELECT player_id, player_name, team, team_abbreviation, avg_points, three_point_pct, rank_position FROM {staging}
+    ON CONFLICT (player_name) DO UPDATE SET 
+        player_id = EXCLUDED.player_id,
+        team = EXCLUDED.team,
+        team_abbreviation = EXCLUDED.team_abbreviation,
+        avg_points = EXCLUDED.avg_points, 
+        three_point_pct = EXCLUDED.three_point_pct,
+        rank_position = EXCLUDED.rank_position, 
+        last_updated = CURRENT_TIMESTAMP;
+""", SQL_REMOVE_FORA_DO_RANKING.format(tabela="league_offensive_rankings")]
+
+SQL_MERGE_DEFENSIVO = ["""
+    INSERT INTO league_defensive_rankings (player_id, player_name, team, team_abbreviation, avg_steals, avg_blocks, rank_position)
+    SELECT player_id, player_name, team, team_abbreviation, avg_steals, avg_blocks, rank_position FROM {staging}
+    ON CONFLICT (player_name) DO UPDATE SET 
+        player_id = EXCLUDED.player_id,
+        team = EXCLUDED.team,
+        team_abbreviation = EXCLUDED.team_abbreviation,
+        avg_steals = EXCLUDED.avg_steals, 
+        avg_blocks = EXCLUDED.avg_blocks, 
+        rank_position = EXCLUDED.rank_position, 
+        last_updated = CURRENT_TIMESTAMP;
+""", SQL_REMOVE_FORA_DO_RANKING.format(tabela="league_defensive_rankings")]
 
 def realizar_upsert_nba():
     """
@@ -14,27 +92,23 @@ def realizar_upsert_nba():
     lesionados = get_all_injured_players()
     
     if lesionados:
-        # Limpa para garantir apenas status atual
-        executar_query("TRUNCATE TABLE injuries;")
-        
-        count_injuries_loop = 0
-        for item in lesionados:
-            # Inserção baseada em NOME (Primary Key agora é player_name)
-            sql_injury = """
-                INSERT INTO injuries (player_name, status, details) 
-                VALUES (%s, %s, %s)
-                ON CONFLICT (player_name) DO UPDATE SET 
-                    status = EXCLUDED.status, 
-                    details = EXCLUDED.details,
-                    updated_at = CURRENT_TIMESTAMP;
-            """
-            executar_query(sql_injury, (
-                item['player_name'], 
-                item['status'], 
-                item['details']
-            ))
-            count_injuries_loop += 1
-        log.info(f"✅ Tabela 'injuries' atualizada com {count_injuries_loop} jogadores.")
+        # Primary Key é player_name: se o nome repetir, vale a última ocorrência
+        por_nome = {item['player_name']: (item['player_name'], item['status'], item['details']) for item in lesionados}
+
+        # Quem lê nunca vê a blacklist pela metade: as mudanças entram num único commit
+        resultado = carregar_via_staging(
+            "injuries", ("player_name", "status", "details"), list(por_nome.values()), SQL_SINCRONIZA_INJURIES
+        )
+        if resultado is None:
+            log.error("❌ Falha ao sincronizar 'injuries'. A blacklist anterior foi mantida.")
+        elif not resultado[-2]:
+            log.info(f"✅ Tabela 'injuries' sem mudanças ({len(por_nome)} jogadores conferidos).")
+        else:
+            versao = resultado[-2][0]['version']
+            mudancas = [MudancaLesao(**linha) for linha in resultado[-1]]
+            indice_lesoes.publicar(por_nome.keys(), versao)
+            log.info(f"✅ Tabela 'injuries' sincronizada (versão {versao}): {resumir_mudancas(mudancas)}.")
+            feed_lesoes.publicar(mudancas)
     else:
         log.warning("⚠️ Scraping não retornou dados (Lista vazia).")
 
@@ -60,7 +134,7 @@ def realizar_upsert_nba():
         log.error(f"Erro auditoria: {e}")
 
     # =========================================================================
-    # 2. ATUALIZAÇÃO DOS RANKINGS (Top 50)
+    # 2. ATUALIZAÇÃO DOS RANKINGS (liga inteira, páginas em paralelo)
     # =========================================================================
     log.info("📊 Sincronizando estatísticas de desempenho...")
     atletas = get_league_rankings()
@@ -69,8 +143,9 @@ def realizar_upsert_nba():
         log.warning("⚠️ Nenhum dado de ranking recebido.")
         return
 
-    count_updated = 0
-    for i, item in enumerate(atletas):
+    ofensivos = {}
+    defensivos = {}
+    for item in atletas:
         atleta = item.get('athlete', {})
         pid = atleta.get('id')
         nome = atleta.get('displayName')
@@ -83,33 +158,30 @@ def realizar_upsert_nba():
         off = next((c['totals'] for c in item['categories'] if c['name'] == 'offensive'), [])
         if off:
             ppg, t_pct = float(off[0]), float(off[6])
-            sql_off = """
-                INSERT INTO league_offensive_rankings (player_id, player_name, team, team_abbreviation, avg_points, three_point_pct, rank_position)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (player_name) DO UPDATE SET 
-                    player_id = EXCLUDED.player_id,
-                    avg_points = EXCLUDED.avg_points, 
-                    rank_position = EXCLUDED.rank_position, 
-                    last_updated = CURRENT_TIMESTAMP;
-            """
-            executar_query(sql_off, (pid, nome, equipe, sigla, ppg, t_pct, i+1))
+            ofensivos[nome] = (pid, nome, equipe, sigla, ppg, t_pct)
 
         # --- DADOS DEFENSIVOS ---
         defen = next((c['totals'] for c in item['categories'] if c['name'] == 'defensive'), [])
         if defen:
             stl, blk = float(defen[0]), float(defen[1])
-            sql_def = """
-                INSERT INTO league_defensive_rankings (player_id, player_name, team, team_abbreviation, avg_steals, avg_blocks, rank_position)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (player_name) DO UPDATE SET 
-                    player_id = EXCLUDED.player_id,
-                    avg_steals = EXCLUDED.avg_steals, 
-                    avg_blocks = EXCLUDED.avg_blocks, 
-                    last_updated = CURRENT_TIMESTAMP;
-            """
-            executar_query(sql_def, (pid, nome, equipe, sigla, stl, blk, i+1))
-            
-        count_updated += 1
+            defensivos[nome] = (pid, nome, equipe, sigla, stl, blk)
+
+    # Cada tabela tem o seu ranking: pontos no ofensivo, roubos + tocos no defensivo
+    ordem_off = sorted(ofensivos.values(), key=lambda l: l[4], reverse=True)
+    ordem_def = sorted(defensivos.values(), key=lambda l: l[4] + l[5], reverse=True)
+    linhas_off = {l[1]: l + (i + 1,) for i, l in enumerate(ordem_off)}
+    linhas_def = {l[1]: l + (i + 1,) for i, l in enumerate(ordem_def)}
+    count_updated = len(ofensivos.keys() | defensivos.keys())
+
+    # Uma carga (COPY + merge) por tabela, cada uma na sua transação
+    colunas_off = ("player_id", "player_name", "team", "team_abbreviation", "avg_points", "three_point_pct", "rank_position")
+    colunas_def = ("player_id", "player_name", "team", "team_abbreviation", "avg_steals", "avg_blocks", "rank_position")
+    ok_off = carregar_via_staging("league_offensive_rankings", colunas_off, list(linhas_off.values()), SQL_MERGE_OFENSIVO)
+    ok_def = carregar_via_staging("league_defensive_rankings", colunas_def, list(linhas_def.values()), SQL_MERGE_DEFENSIVO)
+
+    if ok_off is None or ok_def is None:
+        log.error("❌ Falha na carga dos rankings. Os dados anteriores foram mantidos.")
+        return
 
     log.info(f"✅ Rankings atualizados ({count_updated} atletas).")
 
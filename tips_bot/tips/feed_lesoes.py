@@ -0,0 +1,58 @@
+import threading
+from typing import NamedTuple, Optional
+from database.database_manager import log
+
+# Tipos de mudança emitidos pela sincronização da tabela 'injuries'
+ADICIONADO = "adicionado"            # jogador entrou na lista de lesionados
+LIBERADO = "liberado"                # jogador saiu da lista (voltou a jogar)
+STATUS_ALTERADO = "status_alterado"  # ex: Day-To-Day -> Out
+DETALHES_ALTERADOS = "detalhes_alterados"  # mesmo status, nova data de retorno
+
+class MudancaLesao(NamedTuple):
+    tipo: str
+    player_name: str
+    status_anterior: Optional[str]
+    status: Optional[str]
+    details: Optional[str]
+
+class FeedLesoes:
+    """
+    Feed de mudanças da blacklist de lesões.
+    Outros jobs se inscrevem com `inscrever(funcao)` e recebem a lista de MudancaLesao
+    de cada sincronização que alterou alguma coisa (nada é emitido em horas sem mudança).
+    Um assinante com erro não impede os outros de receberem o feed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assinantes = []
+
+    def inscrever(self, funcao):
+        with self._lock:
+            self._assinantes.append(funcao)
+        return funcao
+
+    def cancelar(self, funcao):
+        with self._lock:
+            if funcao in self._assinantes:
+                self._assinantes.remove(funcao)
+
+    def publicar(self, mudancas):
+        if not mudancas:
+            return
+        with self._lock:
+            assinantes = list(self._assinantes)
+        for funcao in assinantes:
+            try:
+                funcao(mudancas)
+            except Exception as e:
+                log.error(f"❌ Erro no assinante do feed de lesões ({getattr(funcao, '__name__', funcao)}): {e}")
+
+def resumir_mudancas(mudancas):
+    """{'adicionado': 3, 'liberado': 1, ...} para logs."""
+    resumo = {}
+    for mudanca in mudancas:
+        resumo[mudanca.tipo] = resumo.get(mudanca.tipo, 0) + 1
+    return resumo
+
+feed_lesoes = FeedLesoes()
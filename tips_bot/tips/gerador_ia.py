@@ -0,0 +1,66 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturoTimeout
+from database.database_manager import log
+from endpoints.logs_bot import propagar_contexto
+
+class ExecutorGeracao:
+    """
+    Dispara os prompts de um job em paralelo (no máximo `limite_simultaneo` em voo)
+    e devolve os textos na ordem pedida.
+
+    O job inteiro tem um orçamento de `orcamento_s` segundos, contado a partir da criação.
+    Prompt que erra ou não fica pronto dentro do prazo recebe o texto de fallback (determinístico).
+    """
+
+    def __init__(self, gerar, limite_simultaneo=4, orcamento_s=60.0):
+        self._gerar = gerar
+        self._executor = ThreadPoolExecutor(max_workers=limite_simultaneo, thread_name_prefix="gemini")
+        self.prazo = time.monotonic() + orcamento_s
+        self._lock = threading.Lock()
+        self._metricas = {"enviados": 0, "gerados": 0, "fallback_erro": 0, "fallback_prazo": 0}
+
+    def _contar(self, nome):
+        with self._lock:
+            self._metricas[nome] += 1
+
+    def submeter(self, prompt):
+        self._contar("enviados")
+        return self._executor.submit(propagar_contexto(self._gerar), prompt)
+
+    def resultado(self, futuro, fallback):
+        """Espera o texto até o prazo do job; se não der, devolve o fallback."""
+        restante = max(0.0, self.prazo - time.monotonic())
+        try:
+            texto = futuro.result(timeout=restante)
+            self._contar("gerados")
+            return texto
+        except FuturoTimeout:
+            futuro.cancel()
+            self._contar("fallback_prazo")
+            log.warning("⏱️ IA não respondeu dentro do prazo do job. Usando texto padrão.")
+            return fallback
+        except Exception as e:
+            self._contar("fallback_erro")
+            log.error(f"Erro IA: {e}. Usando texto padrão.")
+            return fallback
+
+    def gerar_todos(self, pedidos):
+        """pedidos: [(prompt, fallback), ...] -> [texto, ...] na mesma ordem."""
+        futuros = [self.submeter(prompt) for prompt, _ in pedidos]
+        return [self.resultado(futuro, fallback) for futuro, (_, fallback) in zip(futuros, pedidos)]
+
+    def metricas(self):
+        with self._lock:
+            return dict(self._metricas)
+
+    def encerrar(self):
+        # Não espera chamadas atrasadas: o job segue com os fallbacks
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.encerrar()
+        return False
@@ -0,0 +1,60 @@
+import threading
+import unicodedata
+from database.database_manager import log, buscar_dados, ler_versao_snapshot, transacao
+
+def normalizar_nome_jogador(nome):
+    """'  Nikola  JOKIĆ ' -> 'nikola jokic' (sem acento, minúsculo, espaços únicos)."""
+    sem_acento = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sem_acento.casefold().split())
+
+class IndiceLesoes:
+    """
+    Blacklist de lesionados em memória (hash set de nomes normalizados).
+    Consultas não tocam o banco: o índice só é recarregado por sincronizar(),
+    e apenas quando a versão publicada por realizar_upsert_nba mudou.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nomes = frozenset()
+        self._versao = None
+        self._carregado = False
+
+    def sincronizar(self):
+        """
+        Confere a versão no banco (1 query) e recarrega a tabela 'injuries' se houver snapshot novo.
+        Se a leitura falhar, mantém o snapshot e a versão anteriores (um índice vazio liberaria todo mundo).
+        """
+        try:
+            # Dentro de uma transação a falha vira ErroTransacao, em vez do [] de buscar_dados
+            with transacao():
+                versao = ler_versao_snapshot("injuries")
+                with self._lock:
+                    if self._carregado and versao is not None and versao == self._versao:
+                        return
+                linhas = buscar_dados("SELECT player_name FROM injuries")
+        except Exception as e:
+            log.error(f"❌ Falha ao ler as lesões do banco ({e}). Mantendo o índice anterior (versão {self._versao}).")
+            return
+
+        with self._lock:
+            self._nomes = frozenset(normalizar_nome_jogador(l['player_name']) for l in linhas)
+            self._versao = versao
+            self._carregado = True
+        log.info(f"🚑 Índice de lesões carregado: {len(self._nomes)} jogadores (versão {versao}).")
+
+    def publicar(self, nomes, versao):
+        """Usado pela própria carga no mesmo processo: troca o snapshot sem reler o banco."""
+        with self._lock:
+            self._nomes = frozenset(normalizar_nome_jogador(n) for n in nomes)
+            self._versao = versao
+            self._carregado = True
+
+    def contem(self, player_name):
+        if not player_name:
+            return False
+        if not self._carregado:
+            self.sincronizar()
+        return normalizar_nome_jogador(player_name) in self._nomes
+
+indice_lesoes = IndiceLesoes()
@@ -0,0 +1,136 @@
+import queue
+import threading
+import time
+from database.database_manager import log
+from endpoints.logs_bot import propagar_contexto
+
+_FIM = object()
+
+class Estagio:
+    """
+    Um estágio do pipeline: `funcao(item) -> item_seguinte`, rodando em `workers` threads.
+    Com `ordenado=True` os itens são processados na ordem de entrada (use com 1 worker, ex: envio).
+    Item None (jogo sem conteúdo ou que deu erro antes) passa adiante sem chamar a função.
+    """
+
+    def __init__(self, nome, funcao, workers=1, ordenado=False):
+        self.nome = nome
+        self.funcao = funcao
+        self.workers = 1 if ordenado else workers
+        self.ordenado = ordenado
+
+class Pipeline:
+    """
+    Executa os estágios ao mesmo tempo, ligados por filas limitadas (produtor/consumidor):
+    enquanto um jogo está na entrega, o próximo já está na geração e outro na análise.
+    O tempo total tende ao do estágio mais lento, não à soma de todos.
+    """
+
+    def __init__(self, estagios, tamanho_fila=4):
+        self.estagios = estagios
+        self.tamanho_fila = tamanho_fila
+        self._lock = threading.Lock()
+        self._tempos = {}
+        self.duracao_s = 0.0
+
+    def _registrar(self, estagio, duracao, erro=False):
+        with self._lock:
+            t = self._tempos[estagio.nome]
+            t["itens"] += 1
+            t["erros"] += int(erro)
+            t["ocupado_s"] += duracao
+            t["max_s"] = max(t["max_s"], duracao)
+
+    def _processar(self, estagio, seq, item):
+        if item is None:
+            return None
+        inicio = time.perf_counter()
+        try:
+            resultado = estagio.funcao(item)
+            self._registrar(estagio, time.perf_counter() - inicio)
+            return resultado
+        except Exception as e:
+            self._registrar(estagio, time.perf_counter() - inicio, erro=True)
+            log.error(f"❌ Erro no estágio '{estagio.nome}' (item {seq}): {e}")
+            return None
+
+    def _worker(self, estagio, entrada, saida, restantes):
+        proximo, pendentes = 0, {}
+        while True:
+            pacote = entrada.get()
+            if pacote is _FIM:
+                break
+            seq, item = pacote
+
+            if not estagio.ordenado:
+                saida.put((seq, self._processar(estagio, seq, item)))
+                continue
+
+            # Reordenação: segura os que chegaram adiantados até a vez deles
+            pendentes[seq] = item
+            while proximo in pendentes:
+                saida.put((proximo, self._processar(estagio, proximo, pendentes.pop(proximo))))
+                proximo += 1
+
+        # O último worker do estágio avisa o estágio seguinte
+        with self._lock:
+            restantes[estagio.nome] -= 1
+            ultimo = restantes[estagio.nome] == 0
+        if ultimo:
+            for _ in range(self._workers_seguintes(estagio)):
+                saida.put(_FIM)
+
+    def _workers_seguintes(self, estagio):
+        i = self.estagios.index(estagio)
+        return self.estagios[i + 1].workers if i + 1 < len(self.estagios) else 1
+
+    def executar(self, itens):
+        """Passa `itens` por todos os estágios e retorna a saída do último, na ordem de entrada."""
+        itens = list(itens)
+        self._tempos = {e.nome: {"itens": 0, "erros": 0, "ocupado_s": 0.0, "max_s": 0.0} for e in self.estagios}
+        filas = [queue.Queue(maxsize=self.tamanho_fila) for _ in self.estagios] + [queue.Queue()]
+        restantes = {e.nome: e.workers for e in self.estagios}
+
+        inicio = time.perf_counter()
+        threads = []
+        for i, estagio in enumerate(self.estagios):
+            for n in range(estagio.workers):
+                t = threading.Thread(target=propagar_contexto(self._worker), args=(estagio, filas[i], filas[i + 1], restantes),
+                                     name=f"pipeline-{estagio.nome}-{n}", daemon=True)
+                t.start()
+                threads.append(t)
+
+        for seq, item in enumerate(itens):
+            filas[0].put((seq, item))
+        for _ in range(self.estagios[0].workers):
+            filas[0].put(_FIM)
+
+        resultados = [None] * len(itens)
+        while True:
+            pacote = filas[-1].get()
+            if pacote is _FIM:
+                break
+            seq, item = pacote
+            resultados[seq] = item
+
+        for t in threads:
+            t.join()
+        self.duracao_s = time.perf_counter() - inicio
+        return resultados
+
+    def metricas(self):
+        """Tempo por estágio (ocupado = soma do tempo de trabalho das threads daquele estágio)."""
+        with self._lock:
+            dados = {nome: dict(t) for nome, t in self._tempos.items()}
+        for t in dados.values():
+            t["medio_s"] = round(t["ocupado_s"] / t["itens"], 3) if t["itens"] else 0.0
+            t["ocupado_s"] = round(t["ocupado_s"], 3)
+            t["max_s"] = round(t["max_s"], 3)
+        dados["total_s"] = round(self.duracao_s, 3)
+        return dados
+
+    def resumo(self):
+        m = self.metricas()
+        partes = [f"{nome}: {t['itens']} itens, {t['ocupado_s']}s ocupado (máx {t['max_s']}s)"
+                  for nome, t in m.items() if nome != "total_s"]
+        return f"⏱️ Pipeline em {m['total_s']}s | " + " | ".join(partes)
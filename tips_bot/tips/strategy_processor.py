@@ -1,22 +1,17 @@
-from database.database_manager import log, buscar_dados
-from endpoints.api_handler import get_team_schedule
+from database.database_manager import log
+from endpoints.api_handler import get_team_schedule, get_team_schedules
+from tips.contexto_rodada import carregar_contexto
 
-def verificar_presenca_nos_tops(team_name):
+def verificar_presenca_nos_tops(team_name, contexto=None):
     """Verifica rankings defensivos (Top 8) e ofensivos (Top 5)."""
-    sql_def = "SELECT COUNT(*) as total FROM league_defensive_rankings WHERE team = %s AND rank_position <= 8"
-    res_def = buscar_dados(sql_def, (team_name,))
-    tem_defesa = res_def[0]['total'] > 0 if res_def else False
+    contexto = contexto or carregar_contexto([team_name])
+    return contexto.presenca_nos_tops(team_name)
 
-    sql_off = "SELECT COUNT(*) as total FROM league_offensive_rankings WHERE team = %s AND rank_position <= 5"
-    res_off = buscar_dados(sql_off, (team_name,))
-    tem_ataque = res_off[0]['total'] > 0 if res_off else False
-
-    return tem_defesa, tem_ataque
-
-def analisar_confronto_estilos(time_a_nome, time_b_nome):
+def analisar_confronto_estilos(time_a_nome, time_b_nome, contexto=None):
     """Lógica do Choque de Estilos."""
-    a_def, a_atk = verificar_presenca_nos_tops(time_a_nome)
-    b_def, b_atk = verificar_presenca_nos_tops(time_b_nome)
+    contexto = contexto or carregar_contexto([time_a_nome, time_b_nome])
+    a_def, a_atk = verificar_presenca_nos_tops(time_a_nome, contexto)
+    b_def, b_atk = verificar_presenca_nos_tops(time_b_nome, contexto)
 
     if (a_def and a_atk) and not (b_def or b_atk):
         return True, time_a_nome
@@ -25,9 +20,10 @@ def analisar_confronto_estilos(time_a_nome, time_b_nome):
 
     return False, None
 
-def calcular_media_pontos_equipe(team_id):
-    """Busca últimos 3 placares e retorna a média."""
-    eventos = get_team_schedule(team_id)
+def calcular_media_pontos_equipe(team_id, eventos=None):
+    """Busca últimos 3 placares e retorna a média (use `eventos` se o calendário já foi baixado)."""
+    if eventos is None:
+        eventos = get_team_schedule(team_id)
     placares = []
 
     for event in eventos:
@@ -39,4 +35,9 @@ def calcular_media_pontos_equipe(team_id):
                     if score: placares.append(int(score))
 
     ultimos_3 = placares[-3:] if len(placares) >= 3 else placares
-    return sum(ultimos_3) / len(ultimos_3) if ultimos_3 else 0.0
\ No newline at end of file
+    return sum(ultimos_3) / len(ultimos_3) if ultimos_3 else 0.0
+
+def calcular_medias_pontos_equipes(team_ids):
+    """Média dos últimos 3 placares de vários times, com os calendários baixados em paralelo."""
+    schedules = get_team_schedules(team_ids)
+    return {team_id: calcular_media_pontos_equipe(team_id, eventos) for team_id, eventos in schedules.items()}